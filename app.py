@@ -1,24 +1,41 @@
 import streamlit as st
-import pdfplumber
-import io
 import json
+import copy
 import pandas as pd
-import re
-from typing import List, Dict
+from typing import List, Dict, Optional, Callable, Tuple, Iterable, BinaryIO
 from openai import OpenAI
+import httpx
 from io import BytesIO
-from docx import Document
-from docx.shared import Pt, RGBColor, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 import zipfile
 import os
+import hashlib
+import sqlite3
+import threading
+import time
+import random
+import zlib
+import multiprocessing
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED, CancelledError
 from dotenv import load_dotenv
 from difflib import SequenceMatcher
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # GUI 백엔드 사용 안 함
 import numpy as np
+from scipy import sparse
 import seaborn as sns
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from openai_scheduler import QuotaExceededError, RateLimitScheduler, create_chat_completion_with_retry
+from pdf_worker import read_pdf_text, extract_pdf_text_worker
+from text_similarity import (
+    calculate_similarity, calculate_clean_similarity, normalize_essay_text, prepare_essay_features,
+    MinHashLSHIndex, shingle_jaccard, winnow_fingerprints, UnionFind,
+    locate_shared_passages, highlight_shared_passages_html, PASSAGE_MIN_LENGTH, PASSAGE_MAX_SOURCES
+)
+from feedback_report import parse_feedback, create_feedback_report, render_report_worker
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
@@ -28,6 +45,97 @@ load_dotenv()
 # ============================================
 # API Key는 .env 파일에서 로드됩니다 (보안을 위해)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# OpenAI 호환 엔드포인트 주소 (비어 있으면 기본 OpenAI 주소 사용, 로컬 테스트 서버 연결용)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "") or None
+
+# 동시에 진행할 AI 평가 요청 수 (기본값 8)
+MAX_CONCURRENT_EVALUATIONS = int(os.getenv("MAX_CONCURRENT_EVALUATIONS", "8"))
+
+# AI 평가 모델 설정 (프롬프트를 수정하면 PROMPT_VERSION을 올려 캐시를 무효화합니다)
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_TEMPERATURE = 0.3
+PROMPT_VERSION = "1"
+
+# 표절 검사 설정 (문자 n-gram, MinHash, LSH, winnowing 설정은 text_similarity.py)
+# LSH 후보 중 shingle Jaccard 유사도가 이 값보다 낮은 에세이는 정확한 유사도 계산을 생략
+PLAGIARISM_MIN_JACCARD = 0.02
+
+# 이전 평가 에세이 지문(winnowing) 저장소 설정
+FINGERPRINT_STORE_FILE = os.getenv("FINGERPRINT_STORE_FILE", "plagiarism_fingerprints.sqlite3")
+# 이 수보다 많은 에세이에 들어 있는 지문은 흔한 표현으로 보고 검색에서 제외 (검색 속도 유지)
+FINGERPRINT_COMMON_LIMIT = int(os.getenv("FINGERPRINT_COMMON_LIMIT", "100"))
+# 현재 에세이 지문 중 이전 에세이(또는 참고 자료)에도 있는 지문의 비율이 이 값 이상이면 표절 의심으로 표시
+# (문자열 유사도(ratio)와 다른 척도이므로 30%/50% 기준과 따로 판단)
+FINGERPRINT_COVERAGE_THRESHOLD = float(os.getenv("FINGERPRINT_COVERAGE_THRESHOLD", "0.5"))
+
+# 참고 자료(교재, 모범 에세이 등) 라이브러리: 폴더의 .txt/.pdf 파일을 지문 색인(디스크의 numpy 배열)으로 만들어
+# 메모리에 올리지 않고(memory-map) 검색
+REFERENCE_LIBRARY_DIR = os.getenv("REFERENCE_LIBRARY_DIR", "reference_library")
+REFERENCE_INDEX_DIR = os.getenv("REFERENCE_INDEX_DIR", "reference_index")
+# 이 수보다 많은 참고 자료에 들어 있는 지문은 흔한 표현으로 보고 색인에서 제외
+REFERENCE_COMMON_LIMIT = int(os.getenv("REFERENCE_COMMON_LIMIT", "50"))
+
+# 전체 학생 간 표절 대조 설정: shingle Jaccard 유사도 상위 후보만 SequenceMatcher로 정확히 다시 계산
+COHORT_CANDIDATES_PER_ESSAY = 3
+COHORT_MIN_JACCARD = 0.05
+# 히트맵 이미지는 이 인원 이하일 때만 그림 (그 이상은 CSV로 확인)
+COHORT_HEATMAP_MAX_ESSAYS = 60
+
+# 평가 결과 캐시 설정 (디스크 SQLite 파일, 용량 초과 시 오래 사용하지 않은 항목부터 삭제)
+GRADING_CACHE_FILE = os.getenv("GRADING_CACHE_FILE", "grading_cache.sqlite3")
+GRADING_CACHE_MAX_BYTES = int(float(os.getenv("GRADING_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+# PDF 텍스트 추출 설정 (프로세스 수는 기본적으로 CPU 코어 수, 파일당 제한 시간은 초 단위)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0")) or (os.cpu_count() or 1)
+# 피드백 보고서(DOCX) 생성 프로세스 수 (0이면 CPU 코어 수)
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "0")) or (os.cpu_count() or 1)
+PDF_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "120"))
+# 작업 프로세스가 제한 시간 신호로도 멈추지 않을 때 결과를 기다리는 최대 시간 (초, 0이면 제한 시간의 2배)
+# 이 시간이 지나면 해당 파일을 실패로 기록하고 작업 프로세스를 다시 시작
+PDF_EXTRACT_DEADLINE_SECONDS = float(os.getenv("PDF_EXTRACT_DEADLINE_SECONDS", "0")) or PDF_EXTRACT_TIMEOUT_SECONDS * 2
+# 작업 프로세스 시작 방식: 여러 스레드가 도는 서버 프로세스를 fork하지 않도록 forkserver 사용 (지원하지 않는 OS는 spawn)
+PROCESS_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# 업로드 파일 임시 저장 위치 (비어 있으면 시스템 임시 폴더) 및 세션당 업로드 용량 한도 (MB)
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", "") or None
+SESSION_UPLOAD_LIMIT_BYTES = int(float(os.getenv("SESSION_UPLOAD_LIMIT_MB", "500")) * 1024 * 1024)
+# 이 앱이 만든 임시 파일의 이름 앞부분 (서버 시작 시 오래된 파일만 골라 지우기 위해 사용)
+SPOOL_FILE_PREFIX = "essay-eval-"
+# 서버가 비정상 종료되어 남은 임시 파일(업로드 PDF, 보고서 ZIP)을 지우는 기준 (시간)
+SPOOL_FILE_MAX_AGE_HOURS = float(os.getenv("SPOOL_FILE_MAX_AGE_HOURS", "24"))
+
+# 추출된 PDF 텍스트 캐시 설정 (PDF 내용의 SHA-256 기준, 용량 초과 시 오래 사용하지 않은 항목부터 삭제)
+PDF_TEXT_CACHE_FILE = os.getenv("PDF_TEXT_CACHE_FILE", "pdf_text_cache.sqlite3")
+PDF_TEXT_CACHE_MAX_BYTES = int(float(os.getenv("PDF_TEXT_CACHE_MAX_MB", "500")) * 1024 * 1024)
+
+# OpenAI HTTP 연결 풀 설정 (모든 세션이 공유하는 클라이언트에 적용)
+OPENAI_POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", "32"))
+OPENAI_KEEPALIVE_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "60"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "120"))
+
+# OpenAI 사용량 한도 설정 (계정의 분당 요청 수/토큰 수, 응답 헤더를 받으면 자동 갱신)
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "6"))
+# 평가 1건의 응답(피드백) 토큰 수 추정치
+OPENAI_OUTPUT_TOKEN_ESTIMATE = 2000
+
+# 평가 작업 체크포인트 저장소 (에세이마다 평가 상태와 결과를 저장하여 중단된 평가를 이어서 진행)
+EVALUATION_JOB_STORE_FILE = os.getenv("EVALUATION_JOB_STORE_FILE", "evaluation_jobs.sqlite3")
+# 백그라운드 평가: 동시에 처리하는 작업 수(모든 사용자가 공유)와 대기열 확인 주기 (초)
+BACKGROUND_WORKER_COUNT = int(os.getenv("BACKGROUND_WORKER_COUNT", "2"))
+BACKGROUND_POLL_INTERVAL_SECONDS = float(os.getenv("BACKGROUND_POLL_INTERVAL_SECONDS", "2"))
+# 처리 중인 작업의 임대 시간 (초): 작업 스레드가 이 시간 동안 갱신(heartbeat)하지 않으면 다른 작업 스레드가 다시 가져감
+BACKGROUND_LEASE_SECONDS = float(os.getenv("BACKGROUND_LEASE_SECONDS", "120"))
+# 백그라운드 작업 처리 방식: 기본은 별도의 작업 프로세스(python grading_worker.py)가 대기열을 처리하고,
+# "true"이면 작업 프로세스 없이 Streamlit 서버 프로세스 안의 작업 스레드가 처리 (단일 서버용 대체 방식)
+BACKGROUND_IN_PROCESS_WORKERS = os.getenv("BACKGROUND_IN_PROCESS_WORKERS", "false").lower() == "true"
+# 대기열에 없는 평가 작업(완료, 실패, 중단)을 마지막 진행 후 보관하는 기간 (일)
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "30"))
+
+# 대량 평가(Batch API) 상태 조회 주기 (초)
+BATCH_POLL_INTERVAL_SECONDS = float(os.getenv("BATCH_POLL_INTERVAL_SECONDS", "30"))
 
 # 관리자 계정 정보 (환경 변수에서 로드, 없으면 기본값 사용)
 ADMIN_ID = os.getenv("ADMIN_ID", "ally365")
@@ -78,11 +186,15 @@ DEFAULT_CRITERIA = [
 if 'evaluation_criteria' not in st.session_state:
     st.session_state.evaluation_criteria = DEFAULT_CRITERIA.copy()
 if 'uploaded_pdfs' not in st.session_state:
-    st.session_state.uploaded_pdfs = []
+    st.session_state.uploaded_pdfs = []  # 업로드된 PDF 파일명 목록 (파일 내용은 보관하지 않음)
 if 'extracted_texts' not in st.session_state:
     st.session_state.extracted_texts = []
+if 'extraction_errors' not in st.session_state:
+    st.session_state.extraction_errors = []  # 텍스트 추출에 실패하여 평가에서 제외된 파일 [{filename, error}]
 if 'evaluation_results' not in st.session_state:
     st.session_state.evaluation_results = []
+if 'evaluation_essays' not in st.session_state:
+    st.session_state.evaluation_essays = []  # 현재 평가 결과와 같은 순서의 에세이 [{filename, text}] (전체 학생 간 표절 대조용)
 if 'is_logged_in' not in st.session_state:
     st.session_state.is_logged_in = False
 if 'logged_in_user' not in st.session_state:
@@ -97,6 +209,20 @@ if 'evaluation_title' not in st.session_state:
     st.session_state.evaluation_title = ""
 if 'evaluated_essays' not in st.session_state:
     st.session_state.evaluated_essays = []
+if 'plagiarism_index' not in st.session_state:
+    st.session_state.plagiarism_index = MinHashLSHIndex()  # 표절 검사용 LSH 색인 (evaluated_essays와 자동 동기화)
+if 'cohort_similarity' not in st.session_state:
+    st.session_state.cohort_similarity = None  # 전체 학생 간 표절 대조 결과 {"filenames": [...], "matrix": Jaccard 행렬}
+if 'bulk_batch_job' not in st.session_state:
+    st.session_state.bulk_batch_job = None  # 진행 중인 대량 평가 배치 {batch_id, essays, criteria, fingerprint_scope}
+if 'last_cache_hits' not in st.session_state:
+    st.session_state.last_cache_hits = 0  # 최근 평가에서 캐시를 사용한 에세이 수
+if 'reports_zip' not in st.session_state:
+    st.session_state.reports_zip = None  # 전체 피드백 보고서 ZIP {key: 결과/기준/평가 정보 해시, path: ZIP 임시 파일 경로}
+if 'student_reports' not in st.session_state:
+    st.session_state.student_reports = {}  # 학생별 피드백 보고서 {평가 결과 순번: {key: 결과/기준/평가 정보 해시, data: DOCX 바이트}}
+if 'collusion_groups' not in st.session_state:
+    st.session_state.collusion_groups = []  # 서로 유사한 에세이 그룹 (평가가 끝날 때마다 갱신)
 # 평가 기준 템플릿 파일 경로
 CRITERIA_TEMPLATES_FILE = "saved_criteria_templates.json"
 
@@ -138,74 +264,397 @@ if 'show_accumulated' not in st.session_state:
 def extract_text_from_pdf(pdf_file) -> str:
     """PDF 파일에서 텍스트를 추출합니다."""
     try:
-        text = ""
-        with pdfplumber.open(io.BytesIO(pdf_file.read())) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n\n"
+        # 업로드 파일 객체를 그대로 열어 내용을 한 번 더 복사하지 않음
+        pdf_file.seek(0)
+        text, _ = read_pdf_text(pdf_file)
         return text
     except Exception as e:
         st.error(f"PDF 텍스트 추출 중 오류 발생: {str(e)}")
         return ""
 
-def calculate_similarity(text1: str, text2: str) -> float:
-    """두 텍스트 간의 유사도를 계산합니다 (0.0 ~ 1.0)."""
-    # 공백과 줄바꿈 제거하여 비교
-    text1_clean = re.sub(r'\s+', '', text1)
-    text2_clean = re.sub(r'\s+', '', text2)
+def spool_upload_to_tempfile(uploaded_file) -> Tuple[str, str]:
+    """업로드된 파일을 조각 단위로 임시 파일에 옮겨 쓰고, (임시 파일 경로, 내용의 SHA-256)을 반환합니다."""
+    content_hash = hashlib.sha256()
+    uploaded_file.seek(0)
+    with tempfile.NamedTemporaryFile(prefix=SPOOL_FILE_PREFIX, suffix=".pdf", dir=UPLOAD_SPOOL_DIR, delete=False) as spooled:
+        while True:
+            chunk = uploaded_file.read(1024 * 1024)
+            if not chunk:
+                break
+            content_hash.update(chunk)
+            spooled.write(chunk)
+    uploaded_file.seek(0)
+    return spooled.name, content_hash.hexdigest()
+
+@st.cache_resource(show_spinner=False)
+def cleanup_stale_spool_files() -> int:
+    """서버 프로세스마다 한 번, 임시 폴더에서 SPOOL_FILE_MAX_AGE_HOURS보다 오래된 이 앱의 임시 파일을 지웁니다.
     
-    if not text1_clean or not text2_clean:
-        return 0.0
+    비정상 종료로 지우지 못한 업로드 PDF와 보고서 ZIP만 대상으로 하며(SPOOL_FILE_PREFIX로 시작하는 .pdf/.zip),
+    다른 프로세스가 먼저 지운 파일은 건너뛰므로 여러 번 실행해도 안전합니다. 지운 파일 수를 반환합니다.
+    """
+    spool_dir = UPLOAD_SPOOL_DIR or tempfile.gettempdir()
+    cutoff = time.time() - SPOOL_FILE_MAX_AGE_HOURS * 3600
+    removed = 0
+    try:
+        entries = list(os.scandir(spool_dir))
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.name.startswith(SPOOL_FILE_PREFIX) or not entry.name.endswith(('.pdf', '.zip')):
+            continue
+        try:
+            if entry.is_file(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass  # 그사이 다른 프로세스가 지웠거나 접근할 수 없는 파일
+    return removed
+
+def get_process_pool_context():
+    """프로세스 풀에 사용할 multiprocessing 컨텍스트를 반환합니다.
     
-    # SequenceMatcher를 사용하여 유사도 계산
-    similarity = SequenceMatcher(None, text1_clean, text2_clean).ratio()
-    return similarity
+    작업 프로세스는 시작할 때 이 스크립트를 __mp_main__으로 다시 실행하므로(화면 코드는 실행되지 않음),
+    forkserver가 무거운 라이브러리를 미리 불러 두어 작업 프로세스가 import 없이 바로 시작되도록 합니다.
+    """
+    context = multiprocessing.get_context(PROCESS_START_METHOD)
+    if PROCESS_START_METHOD == "forkserver":
+        context.set_forkserver_preload([
+            "__main__", "pdf_worker", "feedback_report", "streamlit", "pandas", "matplotlib.pyplot",
+            "seaborn", "scipy.sparse", "openai", "docx"
+        ])
+    return context
 
-def check_plagiarism(current_text: str, evaluated_essays: List[Dict]) -> Dict:
-    """현재 에세이와 이전 평가된 에세이들의 유사도를 검사합니다."""
-    if not evaluated_essays:
-        return {
-            "max_similarity": 0.0,
-            "similar_essay": None,
-            "plagiarism_detected": False,
-            "similarity_percentage": 0.0
+def terminate_process_pool(executor: ProcessPoolExecutor):
+    """응답하지 않는 작업 프로세스가 있는 프로세스 풀을 닫고, 작업 프로세스를 강제로 종료합니다."""
+    # ProcessPoolExecutor는 작업 프로세스를 종료하는 공개 API가 없으므로(Python 3.14 이전) 내부 프로세스 목록 사용
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+def connect_pdf_text_cache() -> sqlite3.Connection:
+    """추출된 PDF 텍스트 캐시 DB에 연결하고, 테이블이 없으면 생성합니다."""
+    conn = sqlite3.connect(PDF_TEXT_CACHE_FILE, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_text_cache (
+            cache_key TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            page_count INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            last_access REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pdf_text_cache_access ON pdf_text_cache(last_access)")
+    return conn
+
+def load_cached_pdf_texts(content_hashes: List[str]) -> Dict[str, Tuple[str, int]]:
+    """PDF 내용 해시 목록 중 캐시에 있는 항목의 {해시: (텍스트, 페이지 수)}를 반환합니다."""
+    if not content_hashes:
+        return {}
+    try:
+        conn = connect_pdf_text_cache()
+        try:
+            cached = {}
+            unique_hashes = list(set(content_hashes))
+            # SQLite 변수 개수 제한을 넘지 않도록 나누어 조회
+            for start in range(0, len(unique_hashes), 500):
+                chunk = unique_hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT cache_key, text, page_count FROM pdf_text_cache WHERE cache_key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, text, page_count in rows:
+                    cached[key] = (text, page_count)
+            if cached:
+                now = time.time()
+                with conn:
+                    conn.executemany(
+                        "UPDATE pdf_text_cache SET last_access = ? WHERE cache_key = ?",
+                        [(now, key) for key in cached]
+                    )
+            return cached
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+
+def save_cached_pdf_text(content_hash: str, text: str, page_count: int):
+    """추출된 PDF 텍스트를 캐시에 저장하고, 용량을 초과하면 오래 사용하지 않은 항목부터 삭제합니다."""
+    try:
+        conn = connect_pdf_text_cache()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pdf_text_cache (cache_key, text, page_count, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (content_hash, text, page_count, len(text.encode('utf-8')), time.time())
+                )
+                evict_least_recently_used(conn, "pdf_text_cache", PDF_TEXT_CACHE_MAX_BYTES)
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        # 캐시 저장 실패는 텍스트 추출 결과에 영향을 주지 않음
+        pass
+
+def extract_spooled_pdfs(spooled_pdfs: Iterable[Tuple[str, Optional[str], str]], total: int, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> List[Dict]:
+    """임시 파일로 옮겨진 PDF들의 텍스트를 프로세스 풀에서 동시에 추출하고, 입력 순서대로 반환합니다.
+    
+    spooled_pdfs는 (파일명, 임시 파일 경로, 내용의 SHA-256)을 하나씩 내놓는 반복자로,
+    파일이 준비되는 대로 바로 추출 작업에 넘겨집니다. 임시 파일로 옮기지 못한 파일은
+    (파일명, None, 오류 내용)으로 전달되어 오류 결과로 기록됩니다. 캐시에 있는 파일은 다시 파싱하지 않으며,
+    임시 파일은 추출이 끝나는 대로 삭제됩니다.
+    progress_callback(완료 개수, 전체 개수, 파일명)은 파일 하나가 끝날 때마다 호출됩니다.
+    추출에 실패한 파일은 text가 비어 있고 error에 오류 내용이 들어 있습니다.
+    작업 프로세스가 PDF_EXTRACT_DEADLINE_SECONDS 안에 결과를 돌려주지 않으면 그 파일은 실패로 기록하고,
+    작업 프로세스를 종료한 뒤 남은 파일을 새 프로세스 풀에서 추출합니다.
+    """
+    results: List[Optional[Dict]] = []
+    filenames: List[str] = []
+    spooled_paths: Dict[int, str] = {}
+    completed = 0
+    
+    def record_result(idx: int, text: str, page_count: int, error: Optional[str] = None):
+        nonlocal completed
+        results[idx] = {
+            "filename": filenames[idx],
+            "text": text,
+            "page_count": page_count,
+            "error": error
         }
+        completed += 1
+        if progress_callback:
+            progress_callback(completed, total, filenames[idx])
     
-    max_similarity = 0.0
-    similar_essay = None
+    def remove_spooled(idx: int):
+        try:
+            os.remove(spooled_paths.pop(idx))
+        except (KeyError, OSError):
+            pass
     
-    for essay in evaluated_essays:
-        similarity = calculate_similarity(current_text, essay.get('text', ''))
-        if similarity > max_similarity:
-            max_similarity = similarity
-            similar_essay = essay.get('filename', '알 수 없음')
+    def collect(future, idx: int, content_hash: str):
+        # 추출에 실패한 파일은 빈 텍스트 대신 오류로 기록하여 평가 대상에서 빠지도록 함
+        error = None
+        try:
+            text, page_count = future.result()
+            save_cached_pdf_text(content_hash, text, page_count)
+        except TimeoutError as e:
+            text, page_count, error = "", 0, f"⏱️ 텍스트 추출 시간 초과: {str(e)}"
+        except Exception as e:
+            text, page_count, error = "", 0, f"텍스트 추출 중 오류 발생: {str(e)}"
+        remove_spooled(idx)
+        record_result(idx, text, page_count, error)
     
-    similarity_percentage = max_similarity * 100
+    def submit(idx: int, content_hash: str):
+        try:
+            futures[executor.submit(extract_pdf_text_worker, spooled_paths[idx], PDF_EXTRACT_TIMEOUT_SECONDS)] = (idx, content_hash)
+        except Exception as e:
+            # 작업 프로세스가 비정상 종료되어 풀을 더 쓸 수 없는 경우
+            remove_spooled(idx)
+            record_result(idx, "", 0, f"텍스트 추출 중 오류 발생: {str(e)}")
     
-    return {
-        "max_similarity": max_similarity,
-        "similar_essay": similar_essay,
-        "plagiarism_detected": similarity_percentage > 30.0,
-        "similarity_percentage": similarity_percentage
-    }
+    def find_overdue() -> List:
+        # 실행 중 표시는 풀의 대기열로 넘어간 다음 작업에도 붙으므로,
+        # 먼저 실행 중이 된 작업부터 작업 프로세스 수만큼만 실제로 실행 중인 작업으로 봄
+        now = time.monotonic()
+        for future in futures:
+            if future.running():
+                started_at.setdefault(future, now)
+        executing = sorted(
+            (future for future in futures if future in started_at),
+            key=lambda future: (started_at[future], futures[future][0])
+        )[:worker_count]
+        return [future for future in executing if now - started_at[future] > PDF_EXTRACT_DEADLINE_SECONDS]
+    
+    futures: Dict = {}
+    # 작업이 실행 중으로 확인된 시각 (결과를 기다리는 최대 시간 계산용)
+    started_at: Dict = {}
+    worker_count = max(1, min(PDF_EXTRACT_WORKERS, total or 1))
+    executor = ProcessPoolExecutor(max_workers=worker_count, mp_context=get_process_pool_context())
+    try:
+        for idx, (filename, spooled_path, content_hash) in enumerate(spooled_pdfs):
+            filenames.append(filename)
+            results.append(None)
+            if spooled_path is None:
+                record_result(idx, "", 0, content_hash)
+                continue
+            spooled_paths[idx] = spooled_path
+            
+            # 캐시에 있는 파일은 바로 결과로 사용
+            cached = load_cached_pdf_texts([content_hash]).get(content_hash)
+            if cached:
+                remove_spooled(idx)
+                record_result(idx, *cached)
+            else:
+                submit(idx, content_hash)
+            
+            # 다음 파일을 준비하는 동안 끝난 작업은 바로 정리
+            for future in [f for f in futures if f.done()]:
+                collect(future, *futures.pop(future))
+        
+        while futures:
+            done, _ = wait(list(futures), timeout=min(1.0, PDF_EXTRACT_DEADLINE_SECONDS), return_when=FIRST_COMPLETED)
+            for future in done:
+                collect(future, *futures.pop(future))
+            
+            overdue = find_overdue()
+            if not overdue:
+                continue
+            # 제한 시간 신호로도 멈추지 않은 파일은 실패로 기록하고, 작업 프로세스를 풀과 함께 종료
+            for future in overdue:
+                idx, _ = futures.pop(future)
+                remove_spooled(idx)
+                record_result(idx, "", 0, f"⏱️ 텍스트 추출 시간 초과: 작업 프로세스가 {PDF_EXTRACT_DEADLINE_SECONDS:.0f}초 안에 응답하지 않았습니다.")
+            for future in [f for f in futures if f.done()]:
+                collect(future, *futures.pop(future))
+            unfinished = list(futures.values())
+            futures.clear()
+            started_at.clear()
+            terminate_process_pool(executor)
+            
+            # 끝나지 않은 나머지 파일은 새 풀에서 다시 추출
+            executor = ProcessPoolExecutor(max_workers=worker_count, mp_context=get_process_pool_context())
+            for idx, content_hash in unfinished:
+                submit(idx, content_hash)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        # 오류로 중단된 경우 남은 임시 파일 정리
+        for idx in list(spooled_paths):
+            remove_spooled(idx)
+    
+    return results
+
+def extract_texts_in_parallel(pdf_files: List, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> List[Dict]:
+    """업로드된 여러 PDF 파일의 텍스트를 동시에 추출하고, 업로드 순서대로 반환합니다."""
+    def spool_uploads():
+        for pdf_file in pdf_files:
+            # 업로드 파일을 임시 파일로 옮겨 작업 프로세스에는 경로만 전달 (메모리 복사 방지)
+            spooled_path, content_hash = spool_upload_to_tempfile(pdf_file)
+            yield pdf_file.name, spooled_path, content_hash
+    
+    return extract_spooled_pdfs(spool_uploads(), len(pdf_files), progress_callback)
 
-def evaluate_essay_with_ai(essay_text: str, criteria: List[Dict], api_key: str) -> Dict:
-    """OpenAI API를 사용하여 에세이를 평가합니다."""
+def decode_zip_member_name(info: zipfile.ZipInfo) -> str:
+    """ZIP 항목 이름을 복원합니다. UTF-8 표시가 없는 항목은 한국어 Windows 압축(CP949)으로 간주합니다."""
+    if info.flag_bits & 0x800:
+        return info.filename
     try:
-        client = OpenAI(api_key=api_key)
+        return info.filename.encode('cp437').decode('cp949')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+def list_zip_pdf_members(zip_archive: zipfile.ZipFile) -> List[Tuple[zipfile.ZipInfo, str]]:
+    """ZIP 안의 PDF 항목과 학생별 파일명(결과의 filename으로 사용)을 반환합니다.
+    
+    파일명은 기본적으로 PDF 파일 이름을 사용하고, LMS 내보내기처럼 학생별 폴더 안에
+    같은 이름의 파일이 들어 있는 경우에는 상위 폴더 이름을 학생명으로 사용합니다.
+    """
+    members = []
+    for info in zip_archive.infolist():
+        member_path = decode_zip_member_name(info).replace('\\', '/')
+        parts = [part for part in member_path.split('/') if part]
+        if info.is_dir() or not parts or not parts[-1].lower().endswith('.pdf'):
+            continue
+        # macOS 메타데이터와 숨김 파일 제외
+        if parts[0] == '__MACOSX' or any(part.startswith('.') for part in parts):
+            continue
+        members.append((info, parts))
+    
+    basename_counts = {}
+    for _, parts in members:
+        basename_counts[parts[-1]] = basename_counts.get(parts[-1], 0) + 1
+    
+    named_members = []
+    used_names = set()
+    for info, parts in members:
+        filename = parts[-1]
+        if basename_counts[filename] > 1 and len(parts) > 1:
+            filename = f"{parts[-2]}.pdf"
+        # 그래도 이름이 겹치면 폴더 경로 전체로 구분
+        if filename in used_names:
+            filename = "_".join(parts[:-1] + [parts[-1]])
+        used_names.add(filename)
+        named_members.append((info, filename))
+    return named_members
+
+def extract_texts_from_zip(zip_file, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> List[Dict]:
+    """ZIP 파일 안의 PDF를 하나씩 임시 파일로 풀어 바로 추출 작업에 넘기고, 결과를 반환합니다.
+    
+    압축 전체를 메모리에 풀지 않고 항목 단위로 조각씩 읽어 옮깁니다.
+    """
+    zip_file.seek(0)
+    with zipfile.ZipFile(zip_file) as zip_archive:
+        members = list_zip_pdf_members(zip_archive)
         
-        # 평가 기준을 문자열로 변환
-        criteria_text = ""
-        for idx, criterion in enumerate(criteria, 1):
-            description = criterion.get('description', '')
-            criteria_text += f"{idx}. {criterion['name']}"
-            if description:
-                criteria_text += f" ({description})"
-            criteria_text += f": 최저점 {criterion['min_score']}점, 최고점 {criterion['max_score']}점\n"
+        def spool_members():
+            for info, filename in members:
+                content_hash = hashlib.sha256()
+                spooled = tempfile.NamedTemporaryFile(prefix=SPOOL_FILE_PREFIX, suffix=".pdf", dir=UPLOAD_SPOOL_DIR, delete=False)
+                try:
+                    with spooled, zip_archive.open(info) as member:
+                        while True:
+                            chunk = member.read(1024 * 1024)
+                            if not chunk:
+                                break
+                            content_hash.update(chunk)
+                            spooled.write(chunk)
+                except (RuntimeError, NotImplementedError, zipfile.BadZipFile, zlib.error, EOFError) as e:
+                    # 암호가 걸렸거나 손상된 항목은 그 파일만 오류로 기록하고 나머지 파일은 계속 추출
+                    os.remove(spooled.name)
+                    yield filename, None, f"압축 해제 중 오류 발생 (암호가 걸렸거나 손상된 파일): {str(e)}"
+                    continue
+                yield filename, spooled.name, content_hash.hexdigest()
         
-        # 프롬프트 작성
-        system_prompt = """너는 전문 에세이 채점관이야. 사용자가 설정한 평가 기준과 배점을 바탕으로 업로드된 에세이를 분석해서 점수를 매기고 상세한 피드백을 제공해야 해.
+        return extract_spooled_pdfs(spool_members(), len(members), progress_callback)
+
+def store_extraction_results(results: List[Dict]):
+    """추출 결과를 세션에 저장합니다. 추출에 실패한 파일은 평가할 에세이에서 빼고 오류 목록에만 남깁니다."""
+    st.session_state.extracted_texts = [
+        {"filename": result['filename'], "text": result['text'], "page_count": result['page_count']}
+        for result in results if not result['error']
+    ]
+    st.session_state.extraction_errors = [
+        {"filename": result['filename'], "error": result['error']}
+        for result in results if result['error']
+    ]
+
+@st.cache_resource(show_spinner=False)
+def get_openai_client(api_key: str, base_url: Optional[str] = None) -> OpenAI:
+    """API Key와 엔드포인트별로 프로세스 전체에서 공유하는 OpenAI 클라이언트를 반환합니다.
+    
+    클라이언트를 재사용하여 HTTP 연결 풀, TLS 세션, keep-alive 연결을
+    모든 세션과 모든 에세이 평가에서 함께 사용합니다.
+    """
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=OPENAI_POOL_SIZE,
+            max_keepalive_connections=OPENAI_POOL_SIZE,
+            keepalive_expiry=OPENAI_KEEPALIVE_SECONDS
+        ),
+        timeout=httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+    )
+    # 재시도는 RateLimitScheduler 기반의 create_chat_completion_with_retry에서 처리
+    return OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limit_scheduler(api_key: str) -> RateLimitScheduler:
+    """API Key별로 프로세스 전체에서 공유하는 사용량 스케줄러를 반환합니다."""
+    return RateLimitScheduler(OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT)
+
+def build_evaluation_messages(essay_text: str, criteria: List[Dict]) -> List[Dict]:
+    """평가 기준과 에세이로 AI 평가 요청 메시지(system/user 프롬프트)를 만듭니다."""
+    # 평가 기준을 문자열로 변환
+    criteria_text = ""
+    for idx, criterion in enumerate(criteria, 1):
+        description = criterion.get('description', '')
+        criteria_text += f"{idx}. {criterion['name']}"
+        if description:
+            criteria_text += f" ({description})"
+        criteria_text += f": 최저점 {criterion['min_score']}점, 최고점 {criterion['max_score']}점\n"
+    
+    # 프롬프트 작성
+    system_prompt = """너는 전문 에세이 채점관이야. 사용자가 설정한 평가 기준과 배점을 바탕으로 업로드된 에세이를 분석해서 점수를 매기고 상세한 피드백을 제공해야 해.
 
 평가할 때는:
 1. 각 평가 기준 항목별로 정확하고 공정한 점수를 매겨야 해
@@ -243,7 +692,7 @@ def evaluate_essay_with_ai(essay_text: str, criteria: List[Dict], api_key: str)
     "feedback": "상세한 피드백 내용 (각 항목별 평가와 종합 평가를 포함한 친절하고 구체적인 한글 피드백)"
 }"""
 
-        user_prompt = f"""다음은 평가 기준과 배점이야:
+    user_prompt = f"""다음은 평가 기준과 배점이야:
 
 {criteria_text}
 
@@ -262,81 +711,157 @@ def evaluate_essay_with_ai(essay_text: str, criteria: List[Dict], api_key: str)
 4. 전체적인 종합 평가도 포함해줘
 
 반드시 학생의 글에서 실제로 사용된 문장이나 표현을 예시로 들어야 하며, 추상적인 설명보다는 구체적인 인용과 예시를 통해 설명해줘. JSON 형식으로 결과를 반환해줘."""
+    
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.3
-        )
+def validate_evaluation_scores(result: Dict, criteria: List[Dict]) -> Dict:
+    """AI 응답의 점수를 평가 기준 범위로 보정하고 가중치를 반영한 총점을 계산합니다."""
+    # 점수 검증 및 총점 계산 (가중치 반영)
+    total_score = 0.0
+    validated_scores = {}
+    
+    for criterion in criteria:
+        criterion_name = criterion['name']
+        score = result.get('scores', {}).get(criterion_name, 0.0)
+        weight = criterion.get('weight', 1.0)  # 가중치 (기본값 1.0)
+        
+        # 점수가 범위 내에 있는지 확인
+        if score < criterion['min_score']:
+            score = criterion['min_score']
+        elif score > criterion['max_score']:
+            score = criterion['max_score']
         
-        # JSON 응답 파싱
+        validated_scores[criterion_name] = float(score)
+        # 가중치를 적용한 점수를 총점에 더함
+        total_score += float(score) * float(weight)
+    
+    return {
+        "scores": validated_scores,
+        "total_score": total_score,
+        "feedback": result.get('feedback', '피드백을 생성할 수 없습니다.')
+    }
+
+def evaluate_essay_with_ai(essay_text: str, criteria: List[Dict], api_key: str, base_url: Optional[str] = None) -> Dict:
+    """OpenAI API를 사용하여 에세이를 평가합니다.
+    
+    오류는 화면에 직접 표시하지 않고 호출한 쪽으로 전달합니다.
+    (화면이 없는 백그라운드 작업 프로세스에서도 작업의 오류로 기록되도록)
+    """
+    client = get_openai_client(api_key, base_url or OPENAI_BASE_URL)
+    
+    response = create_chat_completion_with_retry(
+        client,
+        get_rate_limit_scheduler(api_key),
+        messages=build_evaluation_messages(essay_text, criteria),
+        max_retries=OPENAI_MAX_RETRIES,
+        output_tokens=OPENAI_OUTPUT_TOKEN_ESTIMATE,
+        model=OPENAI_MODEL,
+        response_format={"type": "json_object"},
+        temperature=OPENAI_TEMPERATURE
+    )
+    
+    # JSON 응답 파싱
+    try:
         result = json.loads(response.choices[0].message.content)
+    except json.JSONDecodeError:
+        raise ValueError("AI 응답을 파싱하는 중 오류가 발생했습니다.")
+    
+    # 점수 검증 및 총점 계산 (가중치 반영)
+    return validate_evaluation_scores(result, criteria)
+
+def new_pruning_stats() -> Dict[str, int]:
+    """check_plagiarism의 단계별 가지치기 횟수를 기록할 빈 통계를 만듭니다."""
+    return {
+        "candidates": 0,       # LSH 후보 쌍
+        "pruned_length": 0,    # 1단계: 길이 비율 상한
+        "pruned_jaccard": 0,   # 2단계: shingle Jaccard 사전 필터
+        "pruned_quick": 0,     # 3단계: quick_ratio 상한
+        "exact": 0             # 정확한 ratio 계산
+    }
+
+def check_plagiarism(current_text: str, evaluated_essays: List[Dict], lsh_index: Optional[MinHashLSHIndex] = None, pruning_stats: Optional[Dict[str, int]] = None, current_features: Optional[Dict] = None) -> Dict:
+    """현재 에세이와 이전 평가된 에세이들의 유사도를 검사합니다.
+    
+    MinHash LSH 색인으로 유사 후보를 먼저 고른 뒤, 후보를 shingle Jaccard 유사도가 높은 순으로
+    단계별로 걸러 냅니다. 값싼 상한(길이 비율, quick_ratio)으로도 현재 최대 유사도를 넘을 수 없는 후보와
+    shingle을 거의 공유하지 않는 후보는 건너뛰고, 나머지만 정확한 유사도(ratio)를 계산합니다.
+    lsh_index를 넘기면 이전 호출에서 만든 색인을 이어서 사용하고,
+    pruning_stats(new_pruning_stats())를 넘기면 단계별 가지치기 횟수가 누적됩니다.
+    current_features(prepare_essay_features()로 준비한 현재 에세이 항목)를 넘기면 공백 제거와 shingle 계산을 다시 하지 않습니다.
+    """
+    if not evaluated_essays:
+        return {
+            "max_similarity": 0.0,
+            "similar_essay": None,
+            "plagiarism_detected": False,
+            "similarity_percentage": 0.0
+        }
+    
+    if lsh_index is None:
+        lsh_index = MinHashLSHIndex()
+    lsh_index.sync(evaluated_essays)
+    if pruning_stats is None:
+        pruning_stats = new_pruning_stats()
+    
+    if current_features is None:
+        current_features = prepare_essay_features({"text": current_text})
+    current_clean = current_features['clean']
+    current_shingles = current_features['shingles']
+    candidates = [
+        (shingle_jaccard(current_shingles, evaluated_essays[essay_idx]['shingles']), essay_idx)
+        for essay_idx in lsh_index.query_shingles(current_shingles)
+    ]
+    # 유사할 가능성이 높은 후보부터 계산해야 이후 후보가 상한 비교로 많이 걸러짐
+    candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+    
+    max_similarity = 0.0
+    similar_essay = None
+    # 표절 의심 구간은 유사도(ratio)와 관계없이 shingle을 충분히 공유하는 후보에서 찾음 (Jaccard 높은 순)
+    passage_sources = [evaluated_essays[essay_idx] for jaccard, essay_idx in candidates if jaccard >= PLAGIARISM_MIN_JACCARD]
+    
+    for jaccard, essay_idx in candidates:
+        pruning_stats['candidates'] += 1
+        essay = evaluated_essays[essay_idx]
+        essay_clean = essay['clean']
         
-        # 점수 검증 및 총점 계산 (가중치 반영)
-        total_score = 0.0
-        validated_scores = {}
+        # 1단계: ratio는 2 * min(길이) / (길이 합)을 넘을 수 없음 (real_quick_ratio와 같은 상한)
+        total_length = len(current_clean) + essay['clean_length']
+        if total_length == 0 or 2.0 * min(len(current_clean), essay['clean_length']) / total_length <= max_similarity:
+            pruning_stats['pruned_length'] += 1
+            continue
         
-        for criterion in criteria:
-            criterion_name = criterion['name']
-            score = result.get('scores', {}).get(criterion_name, 0.0)
-            weight = criterion.get('weight', 1.0)  # 가중치 (기본값 1.0)
-            
-            # 점수가 범위 내에 있는지 확인
-            if score < criterion['min_score']:
-                score = criterion['min_score']
-            elif score > criterion['max_score']:
-                score = criterion['max_score']
-            
-            validated_scores[criterion_name] = float(score)
-            # 가중치를 적용한 점수를 총점에 더함
-            total_score += float(score) * float(weight)
+        # 2단계: 5글자 shingle을 거의 공유하지 않으면 긴 일치 구간이 없으므로 표절 후보에서 제외
+        if jaccard < PLAGIARISM_MIN_JACCARD:
+            pruning_stats['pruned_jaccard'] += 1
+            continue
         
-        return {
-            "scores": validated_scores,
-            "total_score": total_score,
-            "feedback": result.get('feedback', '피드백을 생성할 수 없습니다.')
-        }
+        # 3단계: 문자 빈도만으로 계산한 상한 (calculate_clean_similarity와 같은 인자 순서)
+        matcher = SequenceMatcher(None, current_clean, essay_clean)
+        if matcher.quick_ratio() <= max_similarity:
+            pruning_stats['pruned_quick'] += 1
+            continue
         
-    except json.JSONDecodeError:
-        st.error("AI 응답을 파싱하는 중 오류가 발생했습니다.")
-        return None
-    except Exception as e:
-        error_str = str(e)
-        # OpenAI API 429 에러 (Rate Limit 또는 잔액 부족) 처리
-        if "429" in error_str or "rate limit" in error_str.lower() or "insufficient_quota" in error_str.lower():
-            st.error("""
-            ⚠️ **OpenAI API 사용량 초과 또는 잔액 부족**
-            
-            다음을 확인해주세요:
-            1. OpenAI 계정에 충분한 크레딧이 있는지 확인
-            2. API 사용량 한도를 초과하지 않았는지 확인
-            3. 잠시 후 다시 시도해주세요
-            
-            OpenAI 대시보드에서 계정 상태를 확인하실 수 있습니다: https://platform.openai.com/usage
-            """)
-        else:
-            st.error(f"AI 평가 중 오류 발생: {str(e)}")
-        return None
-
-def calculate_similarity(text1: str, text2: str) -> float:
-    """두 텍스트 간의 유사도를 계산합니다 (0.0 ~ 1.0)."""
-    # 공백과 줄바꿈 제거하여 비교
-    text1_clean = re.sub(r'\s+', '', text1)
-    text2_clean = re.sub(r'\s+', '', text2)
+        pruning_stats['exact'] += 1
+        similarity = matcher.ratio()
+        if similarity > max_similarity:
+            max_similarity = similarity
+            similar_essay = essay.get('filename', '알 수 없음')
     
-    if not text1_clean or not text2_clean:
-        return 0.0
+    similarity_percentage = max_similarity * 100
     
-    # SequenceMatcher를 사용하여 유사도 계산
-    similarity = SequenceMatcher(None, text1_clean, text2_clean).ratio()
-    return similarity
+    return {
+        "max_similarity": max_similarity,
+        "similar_essay": similar_essay,
+        "plagiarism_detected": similarity_percentage > 30.0,
+        "similarity_percentage": similarity_percentage,
+        "shared_passages": locate_shared_passages(current_text, passage_sources)
+    }
 
-def check_plagiarism(current_text: str, evaluated_essays: List[Dict]) -> Dict:
-    """현재 에세이와 이전 평가된 에세이들의 유사도를 검사합니다."""
+def check_plagiarism_full_scan(current_text: str, evaluated_essays: List[Dict]) -> Dict:
+    """모든 이전 에세이와 SequenceMatcher로 직접 비교하는 기존 방식의 표절 검사입니다. (성능 비교용)"""
     if not evaluated_essays:
         return {
             "max_similarity": 0.0,
@@ -363,17 +888,664 @@ def check_plagiarism(current_text: str, evaluated_essays: List[Dict]) -> Dict:
         "similarity_percentage": similarity_percentage
     }
 
-def evaluate_essay_with_plagiarism_check(essay_text: str, filename: str, criteria: List[Dict], api_key: str, evaluated_essays: List[Dict]) -> Dict:
-    """표절 검사를 포함한 에세이 평가를 수행합니다."""
-    # 표절 검사 수행
-    plagiarism_result = check_plagiarism(essay_text, evaluated_essays)
+def generate_benchmark_essays(num_essays: int, essay_chars: int, copy_ratio: float, seed: int = 0) -> List[Dict]:
+    """표절 검사 성능 비교용 가상 에세이를 만듭니다. copy_ratio 비율의 에세이는 앞선 에세이의 절반을 베낍니다."""
+    rng = random.Random(seed)
+    syllables = [chr(code) for code in range(0xAC00, 0xAC00 + 400)]
+    words = ["".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))) for _ in range(3000)]
     
-    # AI 평가 수행
-    evaluation_result = evaluate_essay_with_ai(essay_text, criteria, api_key)
+    essays = []
+    for idx in range(num_essays):
+        text = ""
+        while len(text) < essay_chars:
+            text += rng.choice(words) + " "
+        if essays and rng.random() < copy_ratio:
+            source = rng.choice(essays)['text']
+            half = len(text) // 2
+            text = source[:half] + text[half:]
+        essays.append({"filename": f"학생{idx + 1}.pdf", "text": text})
+    return essays
+
+def benchmark_plagiarism_check(num_essays: int = 200, essay_chars: int = 1500, copy_ratio: float = 0.1, seed: int = 0) -> Dict:
+    """기존 전체 비교 방식과 MinHash LSH 방식의 표절 검사 시간을 비교하고, 단계별 가지치기 횟수를 함께 반환합니다.
+    
+    에세이를 순서대로 추가하면서 매번 앞선 에세이들과 비교하는 평가 루프를 그대로 재현합니다.
+    """
+    essays = generate_benchmark_essays(num_essays, essay_chars, copy_ratio, seed)
+    
+    start = time.perf_counter()
+    full_scan_results = []
+    for idx, essay in enumerate(essays):
+        full_scan_results.append(check_plagiarism_full_scan(essay['text'], essays[:idx]))
+    full_scan_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    lsh_index = MinHashLSHIndex()
+    pruning_stats = new_pruning_stats()
+    lsh_results = []
+    evaluated = []
+    for essay in essays:
+        lsh_results.append(check_plagiarism(essay['text'], evaluated, lsh_index, pruning_stats, prepare_essay_features(essay)))
+        evaluated.append(essay)
+    lsh_seconds = time.perf_counter() - start
+    
+    # 표절(30% 초과) 판정이 두 방식에서 일치하는지 확인
+    flagged_full = sum(1 for result in full_scan_results if result['plagiarism_detected'])
+    flagged_both = sum(
+        1 for full, lsh in zip(full_scan_results, lsh_results)
+        if full['plagiarism_detected'] and lsh['plagiarism_detected']
+    )
+    
+    return {
+        "num_essays": num_essays,
+        "full_scan_seconds": full_scan_seconds,
+        "lsh_seconds": lsh_seconds,
+        "speedup": full_scan_seconds / lsh_seconds if lsh_seconds > 0 else float('inf'),
+        "flagged_full_scan": flagged_full,
+        "flagged_lsh": sum(1 for result in lsh_results if result['plagiarism_detected']),
+        "flagged_both": flagged_both,
+        "full_scan_pairs": num_essays * (num_essays - 1) // 2,
+        "pruning_stats": pruning_stats
+    }
+
+def connect_fingerprint_store() -> sqlite3.Connection:
+    """에세이 지문 저장소 DB에 연결하고, 테이블이 없으면 생성합니다."""
+    conn = sqlite3.connect(FINGERPRINT_STORE_FILE, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS fingerprint_essays (
+            essay_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_key TEXT NOT NULL UNIQUE,
+            filename TEXT NOT NULL,
+            scope TEXT NOT NULL,
+            fingerprint_count INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """)
+    # 평가한 사용자와 평가 실행 ID 열 추가 (이전 버전에서 만든 DB도 그대로 사용)
+    essay_columns = {row[1] for row in conn.execute("PRAGMA table_info(fingerprint_essays)")}
+    for column in ("owner", "run_id"):
+        if column not in essay_columns:
+            conn.execute(f"ALTER TABLE fingerprint_essays ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+    # 지문 -> 에세이 역색인
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            fingerprint INTEGER NOT NULL,
+            essay_id INTEGER NOT NULL,
+            PRIMARY KEY (fingerprint, essay_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fingerprints_essay ON fingerprints(essay_id)")
+    # 지문별로 포함된 에세이 수 (흔한 지문 제외용)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS fingerprint_counts (
+            fingerprint INTEGER PRIMARY KEY,
+            essay_count INTEGER NOT NULL
+        )
+    """)
+    return conn
+
+def make_fingerprint_scope(owner: str, run_id: str, label: str) -> str:
+    """지문 저장소에서 에세이를 구분하는 평가 단위(사용자, 평가 실행 ID, 평가 이름)를 하나의 문자열로 만듭니다."""
+    return f"{owner}::{run_id}::{label}"
+
+def split_fingerprint_scope(scope: str) -> Tuple[str, str, str]:
+    """make_fingerprint_scope로 만든 평가 단위를 (사용자, 평가 실행 ID, 평가 이름)으로 나눕니다.
+    
+    사용자와 실행 ID가 없던 이전 버전의 평가 단위(평가 이름만 있음)는 사용자와 실행 ID를 빈 문자열로 돌려줍니다.
+    """
+    parts = scope.split("::", 2)
+    if len(parts) < 3:
+        return "", "", scope
+    return parts[0], parts[1], parts[2]
+
+def register_essay_fingerprints(text: str, filename: str, scope: str):
+    """평가가 끝난 에세이의 지문을 저장소에 등록합니다. 같은 평가 실행의 같은 파일은 새 지문으로 교체됩니다."""
+    fingerprints = winnow_fingerprints(normalize_essay_text(text))
+    if not fingerprints:
+        return
+    owner, run_id, label = split_fingerprint_scope(scope)
+    source_key = f"{scope}::{filename}"
+    try:
+        conn = connect_fingerprint_store()
+        try:
+            with conn:
+                row = conn.execute("SELECT essay_id FROM fingerprint_essays WHERE source_key = ?", (source_key,)).fetchone()
+                if row:
+                    conn.execute("""
+                        UPDATE fingerprint_counts SET essay_count = essay_count - 1
+                        WHERE fingerprint IN (SELECT fingerprint FROM fingerprints WHERE essay_id = ?)
+                    """, (row[0],))
+                    conn.execute("DELETE FROM fingerprints WHERE essay_id = ?", (row[0],))
+                    conn.execute("DELETE FROM fingerprint_essays WHERE essay_id = ?", (row[0],))
+                essay_id = conn.execute(
+                    "INSERT INTO fingerprint_essays (source_key, filename, scope, owner, run_id, fingerprint_count, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (source_key, filename, label, owner, run_id, len(fingerprints), time.time())
+                ).lastrowid
+                conn.executemany(
+                    "INSERT OR IGNORE INTO fingerprints (fingerprint, essay_id) VALUES (?, ?)",
+                    [(fingerprint, essay_id) for fingerprint in fingerprints]
+                )
+                conn.executemany(
+                    "INSERT INTO fingerprint_counts (fingerprint, essay_count) VALUES (?, 1) "
+                    "ON CONFLICT(fingerprint) DO UPDATE SET essay_count = essay_count + 1",
+                    [(fingerprint,) for fingerprint in fingerprints]
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        # 지문 등록 실패는 평가 결과에 영향을 주지 않음
+        pass
+
+def find_fingerprint_matches(text: str, filename: str, scope: str, limit: int = 5) -> List[Dict]:
+    """지문 저장소에서 현재 에세이와 지문을 많이 공유하는 이전 에세이를 찾습니다.
+    
+    coverage는 현재 에세이의 지문 중 이전 에세이에도 있는 지문의 비율(0.0 ~ 1.0)입니다.
+    같은 사용자가 같은 평가에서 평가한 같은 파일(다시 평가하는 경우)과 FINGERPRINT_COMMON_LIMIT개보다 많은
+    에세이에 들어 있는 흔한 지문은 제외합니다.
+    같은 평가 실행의 에세이는 세션 비교 목록(evaluated_essays)으로 비교하므로 제외합니다. 그래서 미리 계산하는
+    표절 검사가 앞선 에세이의 지문 등록보다 먼저 실행되어도 결과가 달라지지 않습니다.
+    """
+    fingerprints = winnow_fingerprints(normalize_essay_text(text))
+    if not fingerprints:
+        return []
+    owner, run_id, label = split_fingerprint_scope(scope)
+    try:
+        conn = connect_fingerprint_store()
+        try:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS query_fingerprints (fingerprint INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM query_fingerprints")
+            conn.executemany("INSERT OR IGNORE INTO query_fingerprints (fingerprint) VALUES (?)", [(fingerprint,) for fingerprint in fingerprints])
+            # CROSS JOIN으로 조인 순서를 고정하여 현재 에세이의 지문에서 역색인을 따라가도록 함
+            rows = conn.execute("""
+                SELECT e.filename, e.scope, COUNT(*) AS shared
+                FROM query_fingerprints q
+                CROSS JOIN fingerprint_counts c
+                CROSS JOIN fingerprints f
+                CROSS JOIN fingerprint_essays e
+                WHERE c.fingerprint = q.fingerprint AND c.essay_count <= ?
+                  AND f.fingerprint = q.fingerprint
+                  AND e.essay_id = f.essay_id
+                  AND e.source_key != ?
+                  AND NOT (e.owner = ? AND e.scope = ? AND e.filename = ?)
+                  AND (? = '' OR e.run_id != ?)
+                GROUP BY f.essay_id
+                ORDER BY shared DESC
+                LIMIT ?
+            """, (FINGERPRINT_COMMON_LIMIT, f"{scope}::{filename}", owner, label, filename, run_id, run_id, limit)).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return []
+    
+    return [
+        {
+            "filename": match_filename,
+            "scope": match_scope,
+            "shared_fingerprints": shared,
+            "coverage": shared / len(fingerprints)
+        }
+        for match_filename, match_scope, shared in rows
+    ]
+
+def list_reference_documents() -> List[str]:
+    """참고 자료 폴더의 .txt/.pdf 파일 경로(폴더 기준 상대 경로)를 정렬하여 반환합니다."""
+    if not os.path.isdir(REFERENCE_LIBRARY_DIR):
+        return []
+    documents = []
+    for root, _, files in os.walk(REFERENCE_LIBRARY_DIR):
+        for name in files:
+            if name.lower().endswith(('.txt', '.pdf')):
+                documents.append(os.path.relpath(os.path.join(root, name), REFERENCE_LIBRARY_DIR))
+    return sorted(documents)
+
+def read_reference_document(relative_path: str) -> str:
+    """참고 자료 파일 하나의 텍스트를 읽습니다. (PDF는 extract_text_from_pdf 사용)"""
+    path = os.path.join(REFERENCE_LIBRARY_DIR, relative_path)
+    if relative_path.lower().endswith('.pdf'):
+        with open(path, 'rb') as f:
+            return extract_text_from_pdf(f)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        # 한글 Windows에서 만든 텍스트 파일
+        return raw.decode('cp949', errors='replace')
+
+def build_reference_index(progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Dict:
+    """참고 자료 폴더 전체를 지문 색인으로 만들어 REFERENCE_INDEX_DIR에 저장합니다.
+    
+    색인은 (지문, 문서 번호) 쌍을 지문 순으로 정렬한 두 개의 .npy 배열과 문서 목록(documents.json)입니다.
+    추출한 문서 텍스트도 내용 해시 이름(texts/<SHA-256>.txt)으로 함께 저장하여, 표절 의심 구간을 찾을 때
+    원본 PDF를 다시 파싱하지 않습니다.
+    새 색인을 임시 폴더에 모두 쓴 뒤 기존 색인과 바꾸므로, 만드는 동안에도 기존 색인으로 검사할 수 있습니다.
+    progress_callback(처리한 개수, 전체 개수, 파일명)은 문서를 하나 읽을 때마다 호출됩니다.
+    """
+    staging_dir = f"{REFERENCE_INDEX_DIR}.building"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(os.path.join(staging_dir, "texts"))
+    
+    relative_paths = list_reference_documents()
+    documents = []
+    fingerprint_chunks = []
+    doc_id_chunks = []
+    for doc_idx, relative_path in enumerate(relative_paths):
+        text = read_reference_document(relative_path)
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        with open(os.path.join(staging_dir, "texts", f"{text_hash}.txt"), 'w', encoding='utf-8') as f:
+            f.write(text)
+        fingerprints = np.fromiter(winnow_fingerprints(normalize_essay_text(text)), dtype=np.uint32)
+        documents.append({"path": relative_path, "text_hash": text_hash, "fingerprint_count": int(fingerprints.size)})
+        fingerprint_chunks.append(fingerprints)
+        doc_id_chunks.append(np.full(fingerprints.size, doc_idx, dtype=np.uint32))
+        if progress_callback:
+            progress_callback(doc_idx + 1, len(relative_paths), relative_path)
     
-    if not evaluation_result:
+    hashes = np.concatenate(fingerprint_chunks) if fingerprint_chunks else np.empty(0, dtype=np.uint32)
+    doc_ids = np.concatenate(doc_id_chunks) if doc_id_chunks else np.empty(0, dtype=np.uint32)
+    order = np.argsort(hashes, kind='stable')
+    hashes, doc_ids = hashes[order], doc_ids[order]
+    
+    # 너무 많은 문서에 나오는 지문 제거
+    _, counts = np.unique(hashes, return_counts=True)
+    common = np.repeat(counts > REFERENCE_COMMON_LIMIT, counts)
+    hashes, doc_ids = hashes[~common], doc_ids[~common]
+    
+    np.save(os.path.join(staging_dir, "hashes.npy"), hashes)
+    np.save(os.path.join(staging_dir, "doc_ids.npy"), doc_ids)
+    manifest = {
+        "built_at": time.time(),
+        "documents": documents,
+        "fingerprints": int(hashes.size),
+        "common_fingerprints_removed": int((counts > REFERENCE_COMMON_LIMIT).sum())
+    }
+    with open(os.path.join(staging_dir, "documents.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    
+    previous_dir = f"{REFERENCE_INDEX_DIR}.previous"
+    shutil.rmtree(previous_dir, ignore_errors=True)
+    if os.path.isdir(REFERENCE_INDEX_DIR):
+        os.replace(REFERENCE_INDEX_DIR, previous_dir)
+    os.replace(staging_dir, REFERENCE_INDEX_DIR)
+    shutil.rmtree(previous_dir, ignore_errors=True)
+    return manifest
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_reference_index(built_at: float) -> Dict:
+    """디스크의 참고 자료 색인을 memory-map으로 엽니다.
+    
+    built_at이 바뀌면 새로 열고, 가장 최근 색인 하나만 남겨 이전 색인의 memory-map은 놓아 줍니다.
+    """
+    with open(os.path.join(REFERENCE_INDEX_DIR, "documents.json"), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return {
+        "hashes": np.load(os.path.join(REFERENCE_INDEX_DIR, "hashes.npy"), mmap_mode='r'),
+        "doc_ids": np.load(os.path.join(REFERENCE_INDEX_DIR, "doc_ids.npy"), mmap_mode='r'),
+        "manifest": manifest
+    }
+
+def get_reference_index() -> Optional[Dict]:
+    """현재 참고 자료 색인을 반환합니다. 색인을 아직 만들지 않았으면 None을 반환합니다."""
+    manifest_path = os.path.join(REFERENCE_INDEX_DIR, "documents.json")
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            built_at = json.load(f)['built_at']
+        return load_reference_index(built_at)
+    except (OSError, ValueError, KeyError):
+        return None
+
+def read_indexed_reference_text(text_hash: str) -> str:
+    """색인을 만들 때 저장해 둔 참고 자료 텍스트를 읽습니다. (원본 파일을 다시 읽거나 파싱하지 않음)"""
+    with open(os.path.join(REFERENCE_INDEX_DIR, "texts", f"{text_hash}.txt"), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def find_reference_matches(text: str, limit: int = 5) -> List[Dict]:
+    """참고 자료 색인에서 현재 에세이와 지문을 많이 공유하는 문서를 찾습니다.
+    
+    coverage는 현재 에세이의 지문 중 참고 자료에도 있는 지문의 비율(0.0 ~ 1.0)입니다.
+    정렬된 색인 배열에서 이진 탐색하므로 필요한 부분만 디스크에서 읽습니다.
+    """
+    reference_index = get_reference_index()
+    if reference_index is None or reference_index['hashes'].size == 0:
+        return []
+    fingerprints = np.array(sorted(winnow_fingerprints(normalize_essay_text(text))), dtype=np.uint32)
+    if fingerprints.size == 0:
+        return []
+    
+    hashes, doc_ids = reference_index['hashes'], reference_index['doc_ids']
+    starts = np.searchsorted(hashes, fingerprints, side='left')
+    ends = np.searchsorted(hashes, fingerprints, side='right')
+    matched_ranges = [(start, end) for start, end in zip(starts, ends) if end > start]
+    if not matched_ranges:
+        return []
+    matched_doc_ids = np.concatenate([doc_ids[start:end] for start, end in matched_ranges])
+    
+    documents = reference_index['manifest']['documents']
+    match_ids, shared_counts = np.unique(matched_doc_ids, return_counts=True)
+    top = np.argsort(-shared_counts, kind='stable')[:limit]
+    return [
+        {
+            "filename": documents[int(match_ids[idx])]['path'],
+            "text_hash": documents[int(match_ids[idx])].get('text_hash'),
+            "shared_fingerprints": int(shared_counts[idx]),
+            "coverage": int(shared_counts[idx]) / fingerprints.size
+        }
+        for idx in top
+    ]
+
+def record_fingerprint_coverage(plagiarism_result: Dict, coverage: float, source: str):
+    """지문 공유 비율이 지금까지 기록된 값보다 높으면 표절 검사 결과에 따로 기록합니다.
+    
+    지문 공유 비율은 문자열 유사도(similarity_percentage)를 덮어쓰지 않고 fingerprint_coverage에 저장하며,
+    FINGERPRINT_COVERAGE_THRESHOLD 이상이면 표절 의심(plagiarism_detected)으로 표시합니다.
+    """
+    if coverage <= plagiarism_result.get('fingerprint_coverage', 0.0):
+        return
+    plagiarism_result['fingerprint_coverage'] = coverage
+    plagiarism_result['coverage_source'] = source
+    if coverage >= FINGERPRINT_COVERAGE_THRESHOLD:
+        plagiarism_result['plagiarism_detected'] = True
+
+def check_plagiarism_with_history(current_text: str, filename: str, evaluated_essays: List[Dict], lsh_index: Optional[MinHashLSHIndex] = None, fingerprint_scope: Optional[str] = None, current_features: Optional[Dict] = None) -> Dict:
+    """현재 세션의 에세이와 비교한 뒤, fingerprint_scope가 있으면 지문 저장소의 이전 에세이와도 비교합니다.
+    참고 자료 색인이 있으면 참고 자료와도 비교합니다. current_features는 check_plagiarism으로 전달됩니다."""
+    plagiarism_result = check_plagiarism(current_text, evaluated_essays, lsh_index, current_features=current_features)
+    
+    if fingerprint_scope is not None:
+        historical_matches = find_fingerprint_matches(current_text, filename, fingerprint_scope)
+        plagiarism_result['historical_matches'] = historical_matches
+        if historical_matches:
+            top_match = historical_matches[0]
+            record_fingerprint_coverage(plagiarism_result, top_match['coverage'], f"{top_match['filename']} ({top_match['scope']})")
+    
+    reference_matches = find_reference_matches(current_text)
+    if reference_matches:
+        plagiarism_result['reference_matches'] = reference_matches
+        top_match = reference_matches[0]
+        # 지문을 공유하는 참고 자료(지문 공유 비율 높은 순)는 유사도와 관계없이 겹치는 구간을 찾음
+        reference_sources = []
+        for match in reference_matches[:PASSAGE_MAX_SOURCES]:
+            if not match['text_hash']:
+                continue
+            try:
+                reference_sources.append({"filename": f"{match['filename']} (참고 자료)", "text": read_indexed_reference_text(match['text_hash'])})
+            except OSError:
+                pass  # 텍스트를 저장하기 전에 만든 색인이거나 그사이 색인이 다시 만들어진 경우 구간 표시만 생략
+        if reference_sources:
+            plagiarism_result['shared_passages'] = sorted(
+                plagiarism_result.get('shared_passages', []) + locate_shared_passages(current_text, reference_sources),
+                key=lambda passage: (passage['start'], -passage['length'])
+            )
+        record_fingerprint_coverage(plagiarism_result, top_match['coverage'], f"{top_match['filename']} (참고 자료)")
+    return plagiarism_result
+
+def record_evaluated_essay(text: str, filename: str, evaluated_essays: List[Dict], fingerprint_scope: Optional[str] = None, essay_features: Optional[Dict] = None):
+    """평가 완료된 에세이를 이후 표절 검사 대상에 추가합니다. (세션 목록과 지문 저장소)
+    essay_features(이미 준비한 같은 에세이의 항목)를 넘기면 다시 계산하지 않고 그대로 추가합니다."""
+    if essay_features is None:
+        essay_features = prepare_essay_features({
+            "filename": filename,
+            "text": text
+        })
+    evaluated_essays.append(essay_features)
+    if fingerprint_scope is not None:
+        register_essay_fingerprints(text, filename, fingerprint_scope)
+
+def build_shingle_matrix(shingle_sets: List[np.ndarray]) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """에세이별 shingle 해시 배열을 (에세이 수 x 전체 shingle 수) 0/1 희소 행렬로 만듭니다.
+    
+    반환값: (희소 행렬, 에세이별 shingle 개수)
+    """
+    shingle_counts = np.array([hashes.size for hashes in shingle_sets], dtype=np.int64)
+    if shingle_counts.sum() == 0:
+        return sparse.csr_matrix((len(shingle_sets), 0), dtype=np.float32), shingle_counts
+    
+    # 전체 코호트에서 같은 shingle 해시는 같은 열 번호를 갖도록 변환
+    _, columns = np.unique(np.concatenate(shingle_sets), return_inverse=True)
+    rows = np.repeat(np.arange(len(shingle_sets)), shingle_counts)
+    data = np.ones(columns.size, dtype=np.float32)
+    matrix = sparse.csr_matrix((data, (rows, columns)), shape=(len(shingle_sets), int(columns.max()) + 1))
+    return matrix, shingle_counts
+
+def compute_cohort_similarity_matrix(essays: List[Dict]) -> np.ndarray:
+    """모든 에세이 쌍의 shingle Jaccard 유사도 행렬(0.0 ~ 1.0, 대각선은 0)을 한 번의 희소 행렬 곱으로 계산합니다."""
+    matrix, shingle_counts = build_shingle_matrix([prepare_essay_features(essay)['shingles'] for essay in essays])
+    # 교집합 크기 = X · Xᵀ, 합집합 크기 = |A| + |B| - 교집합
+    intersection = (matrix @ matrix.T).toarray()
+    union = shingle_counts[:, None] + shingle_counts[None, :] - intersection
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jaccard = np.where(union > 0, intersection / union, 0.0)
+    np.fill_diagonal(jaccard, 0.0)
+    return jaccard
+
+def check_cohort_plagiarism(essays: List[Dict]) -> Tuple[List[Dict], np.ndarray]:
+    """평가 순서와 관계없이 모든 에세이를 서로 대조하는 표절 검사입니다.
+    
+    Jaccard 유사도 행렬에서 에세이마다 상위 COHORT_CANDIDATES_PER_ESSAY개 후보를 고르고,
+    후보 쌍에 대해서만 calculate_clean_similarity로 기존 검사와 같은 기준의 유사도를 계산합니다.
+    반환값: (에세이별 표절 검사 결과 목록, Jaccard 유사도 행렬)
+    """
+    jaccard = compute_cohort_similarity_matrix(essays)
+    results = [{
+        "max_similarity": 0.0,
+        "similar_essay": None,
+        "plagiarism_detected": False,
+        "similarity_percentage": 0.0
+    } for _ in essays]
+    if len(essays) < 2:
+        return results, jaccard
+    
+    top_k = min(COHORT_CANDIDATES_PER_ESSAY, len(essays) - 1)
+    candidates = np.argpartition(-jaccard, top_k - 1, axis=1)[:, :top_k]
+    # 양쪽 에세이에서 모두 후보로 뽑힌 쌍은 한 번만 계산
+    pair_similarities = {}
+    for i, row in enumerate(candidates):
+        for j in row:
+            if jaccard[i, j] < COHORT_MIN_JACCARD:
+                continue
+            pair = (min(i, int(j)), max(i, int(j)))
+            if pair not in pair_similarities:
+                pair_similarities[pair] = calculate_clean_similarity(essays[pair[0]]['clean'], essays[pair[1]]['clean'])
+    
+    passage_sources = [[] for _ in essays]  # 에세이별 후보 (Jaccard 유사도, 상대 에세이 번호)
+    for (i, j), similarity in pair_similarities.items():
+        for current, other in ((i, j), (j, i)):
+            passage_sources[current].append((jaccard[i, j], other))
+            if similarity > results[current]['max_similarity']:
+                results[current].update({
+                    "max_similarity": similarity,
+                    "similar_essay": essays[other].get('filename', '알 수 없음'),
+                    "plagiarism_detected": similarity * 100 > 30.0,
+                    "similarity_percentage": similarity * 100
+                })
+    
+    # 표절 의심 구간은 유사도(ratio)와 관계없이 후보 쌍에서 찾음 (Jaccard 높은 순)
+    for current, sources in enumerate(passage_sources):
+        sources.sort(key=lambda source: -source[0])
+        results[current]['shared_passages'] = locate_shared_passages(essays[current]['text'], [essays[other] for _, other in sources])
+    return results, jaccard
+
+def find_collusion_groups(evaluated_essays: List[Dict], lsh_index: Optional[MinHashLSHIndex] = None, threshold: float = 0.3) -> List[Dict]:
+    """서로 유사한 에세이들을 연결 요소(그룹)로 묶어, 한 출처를 여러 학생이 함께 베낀 경우를 찾습니다.
+    
+    LSH 버킷을 공유하는 후보 쌍만 유사도를 계산하고, threshold를 넘는 쌍을 union-find로 합칩니다.
+    후보 쌍 수에 거의 비례하는 시간에 끝나므로 평가가 끝날 때마다 실행할 수 있습니다.
+    반환값: 그룹 목록 (members, size, pair_count, mean_similarity, max_similarity), 큰 그룹부터 정렬
+    """
+    if len(evaluated_essays) < 2:
+        return []
+    if lsh_index is None:
+        lsh_index = MinHashLSHIndex()
+    lsh_index.sync(evaluated_essays)
+    
+    candidate_pairs = set()
+    for band_buckets in lsh_index.buckets:
+        for members in band_buckets.values():
+            for position, essay_idx in enumerate(members):
+                for other_idx in members[position + 1:]:
+                    candidate_pairs.add((min(essay_idx, other_idx), max(essay_idx, other_idx)))
+    
+    groups = UnionFind(len(evaluated_essays))
+    edges = []
+    for essay_idx, other_idx in candidate_pairs:
+        essay, other = evaluated_essays[essay_idx], evaluated_essays[other_idx]
+        if shingle_jaccard(essay['shingles'], other['shingles']) < PLAGIARISM_MIN_JACCARD:
+            continue
+        similarity = calculate_clean_similarity(essay['clean'], other['clean'])
+        if similarity > threshold:
+            groups.union(essay_idx, other_idx)
+            edges.append((essay_idx, other_idx, similarity))
+    
+    edges_by_root: Dict[int, List[float]] = {}
+    for essay_idx, _, similarity in edges:
+        edges_by_root.setdefault(groups.find(essay_idx), []).append(similarity)
+    members_by_root: Dict[int, List[str]] = {}
+    for essay_idx, essay in enumerate(evaluated_essays):
+        root = groups.find(essay_idx)
+        if root in edges_by_root:
+            members_by_root.setdefault(root, []).append(essay.get('filename', '알 수 없음'))
+    
+    collusion_groups = [
+        {
+            "members": members_by_root[root],
+            "size": len(members_by_root[root]),
+            "pair_count": len(similarities),
+            "mean_similarity": sum(similarities) / len(similarities),
+            "max_similarity": max(similarities)
+        }
+        for root, similarities in edges_by_root.items()
+    ]
+    collusion_groups.sort(key=lambda group: (-group['size'], -group['max_similarity']))
+    return collusion_groups
+
+# 평가 결과 캐시 쓰기 잠금 (여러 스레드가 동시에 용량 정리를 하지 않도록)
+grading_cache_lock = threading.Lock()
+
+def evict_least_recently_used(conn: sqlite3.Connection, table: str, max_bytes: int):
+    """캐시 테이블(cache_key, size, last_access 열)의 전체 용량이 max_bytes 이하가 되도록
+    오래 사용하지 않은 항목부터 삭제합니다."""
+    total_size = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+    if total_size <= max_bytes:
+        return
+    expired_keys = []
+    for key, entry_size in conn.execute(f"SELECT cache_key, size FROM {table} ORDER BY last_access ASC"):
+        if total_size <= max_bytes:
+            break
+        expired_keys.append((key,))
+        total_size -= entry_size
+    conn.executemany(f"DELETE FROM {table} WHERE cache_key = ?", expired_keys)
+
+def connect_grading_cache() -> sqlite3.Connection:
+    """평가 결과 캐시 DB에 연결하고, 테이블이 없으면 생성합니다."""
+    conn = sqlite3.connect(GRADING_CACHE_FILE, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS grading_cache (
+            cache_key TEXT PRIMARY KEY,
+            result TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            last_access REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_grading_cache_access ON grading_cache(last_access)")
+    return conn
+
+def make_grading_cache_key(essay_text: str, criteria: List[Dict]) -> str:
+    """에세이 본문, 평가 기준, 모델 설정, 프롬프트 버전으로 캐시 키를 만듭니다."""
+    # 평가 기준은 프롬프트와 총점 계산에 쓰이는 값만 정규화하여 사용
+    normalized_criteria = [
+        {
+            "name": str(criterion['name']).strip(),
+            "description": str(criterion.get('description', '')).strip(),
+            "min_score": float(criterion['min_score']),
+            "max_score": float(criterion['max_score']),
+            "weight": float(criterion.get('weight', 1.0))
+        }
+        for criterion in criteria
+    ]
+    key_source = json.dumps({
+        "essay": essay_text,
+        "criteria": normalized_criteria,
+        "model": OPENAI_MODEL,
+        "temperature": OPENAI_TEMPERATURE,
+        "prompt_version": PROMPT_VERSION
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+def load_cached_evaluation(cache_key: str) -> Optional[Dict]:
+    """캐시된 평가 결과를 반환합니다. 없으면 None을 반환합니다."""
+    try:
+        conn = connect_grading_cache()
+        try:
+            row = conn.execute("SELECT result FROM grading_cache WHERE cache_key = ?", (cache_key,)).fetchone()
+            if row is None:
+                return None
+            with conn:
+                conn.execute("UPDATE grading_cache SET last_access = ? WHERE cache_key = ?", (time.time(), cache_key))
+            return json.loads(row[0])
+        finally:
+            conn.close()
+    except (sqlite3.Error, json.JSONDecodeError):
         return None
+
+def save_cached_evaluation(cache_key: str, evaluation_result: Dict):
+    """평가 결과를 캐시에 저장하고, 용량을 초과하면 오래 사용하지 않은 항목부터 삭제합니다."""
+    payload = json.dumps(evaluation_result, ensure_ascii=False)
+    size = len(payload.encode('utf-8'))
+    try:
+        with grading_cache_lock:
+            conn = connect_grading_cache()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO grading_cache (cache_key, result, size, last_access) VALUES (?, ?, ?, ?)",
+                        (cache_key, payload, size, time.time())
+                    )
+                    evict_least_recently_used(conn, "grading_cache", GRADING_CACHE_MAX_BYTES)
+            finally:
+                conn.close()
+    except sqlite3.Error:
+        # 캐시 저장 실패는 평가 결과에 영향을 주지 않음
+        pass
+
+def get_grading_cache_stats() -> Dict:
+    """캐시된 평가 결과 개수와 전체 용량(바이트)을 반환합니다."""
+    try:
+        conn = connect_grading_cache()
+        try:
+            count, total_size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM grading_cache").fetchone()
+        finally:
+            conn.close()
+        return {"entries": count, "bytes": total_size}
+    except sqlite3.Error:
+        return {"entries": 0, "bytes": 0}
+
+def purge_grading_cache() -> int:
+    """평가 결과 캐시를 모두 삭제하고, 삭제된 항목 수를 반환합니다."""
+    with grading_cache_lock:
+        conn = connect_grading_cache()
+        try:
+            with conn:
+                deleted = conn.execute("DELETE FROM grading_cache").rowcount
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+    return deleted
+
+def evaluate_essay_with_cache(essay_text: str, criteria: List[Dict], api_key: str) -> Dict:
+    """평가 결과 캐시를 먼저 확인하고, 캐시에 없을 때만 AI 평가를 수행합니다."""
+    cache_key = make_grading_cache_key(essay_text, criteria)
+    cached_result = load_cached_evaluation(cache_key)
+    if cached_result is not None:
+        cached_result['cached'] = True
+        return cached_result
     
+    evaluation_result = evaluate_essay_with_ai(essay_text, criteria, api_key)
+    if evaluation_result:
+        save_cached_evaluation(cache_key, evaluation_result)
+    return evaluation_result
+
+def apply_plagiarism_check(evaluation_result: Dict, plagiarism_result: Dict, criteria: List[Dict]) -> Dict:
+    """표절 검사 결과를 AI 평가 결과의 "윤리와 성실성" 점수와 피드백에 반영합니다."""
     # 평가기준 4번(윤리와 성실성)에 표절 검사 결과 반영
     ethics_criterion_name = "윤리와 성실성"
     
@@ -401,6 +1573,11 @@ def evaluate_essay_with_plagiarism_check(essay_text: str, filename: str, criteri
             plagiarism_message = f"⚠️ 표절 검사 결과: {similarity_percentage:.1f}% 유사도로 감지되어 10점으로 조정되었습니다."
             if plagiarism_result['similar_essay']:
                 plagiarism_message += f" (유사 에세이: {plagiarism_result['similar_essay']})"
+        elif plagiarism_result.get('fingerprint_coverage', 0.0) >= FINGERPRINT_COVERAGE_THRESHOLD:
+            # 문자열 유사도는 정상 범위지만 이전 에세이나 참고 자료와 지문을 많이 공유: 10점
+            coverage_percentage = plagiarism_result['fingerprint_coverage'] * 100
+            adjusted_score = 10.0
+            plagiarism_message = f"⚠️ 표절 검사 결과: 지문 공유 비율 {coverage_percentage:.1f}%로 감지되어 10점으로 조정되었습니다. (유사도 {similarity_percentage:.1f}%, 지문 공유 대상: {plagiarism_result['coverage_source']})"
         else:
             # 30% 이하: 원래 점수 유지
             adjusted_score = original_score
@@ -425,11 +1602,718 @@ def evaluate_essay_with_plagiarism_check(essay_text: str, filename: str, criteri
         else:
             evaluation_result['feedback'] += f"\n\n【표절 검사 결과】\n{plagiarism_message}"
         
-        # 표절 검사 정보 저장
+        # 표절 검사 정보 저장 (다시 반영할 때 되돌릴 수 있도록 AI가 준 원래 점수도 함께 보관)
+        plagiarism_result['original_ethics_score'] = original_score
         evaluation_result['plagiarism_check'] = plagiarism_result
     
     return evaluation_result
 
+def reapply_plagiarism_check(evaluation_result: Dict, plagiarism_result: Dict, criteria: List[Dict]) -> Dict:
+    """이미 표절 검사가 반영된 평가 결과에 새 표절 검사 결과를 반영합니다.
+    
+    이전에 조정한 "윤리와 성실성" 점수와 피드백의 【표절 검사 결과】 문구를 되돌린 뒤 apply_plagiarism_check를 다시 적용합니다.
+    """
+    previous_result = evaluation_result.get('plagiarism_check')
+    if previous_result:
+        if 'original_ethics_score' in previous_result:
+            evaluation_result['scores']["윤리와 성실성"] = previous_result['original_ethics_score']
+        evaluation_result['feedback'] = evaluation_result['feedback'].split("\n\n【표절 검사 결과】\n")[0]
+    return apply_plagiarism_check(evaluation_result, plagiarism_result, criteria)
+
+def build_evaluation_record(extracted: Dict, evaluation_result: Optional[Dict], criteria: List[Dict], error_message: str = "평가 중 오류가 발생했습니다.") -> Dict:
+    """평가 결과를 st.session_state.evaluation_results에 저장할 형태로 변환합니다."""
+    if evaluation_result:
+        result = {
+            "filename": extracted['filename'],
+            "scores": evaluation_result["scores"],
+            "total_score": evaluation_result["total_score"],
+            "feedback": evaluation_result["feedback"]
+        }
+        # 표절 검사 정보가 있으면 추가
+        if 'plagiarism_check' in evaluation_result:
+            result['plagiarism_check'] = evaluation_result['plagiarism_check']
+        # 캐시에서 가져온 결과인지 표시
+        if evaluation_result.get('cached'):
+            result['cached'] = True
+        return result
+    
+    # 오류 발생 시 기본값
+    return {
+        "filename": extracted['filename'],
+        "scores": {criterion["name"]: 0.0 for criterion in criteria},
+        "total_score": 0.0,
+        "feedback": error_message
+    }
+
+def finalize_evaluation(extracted: Dict, evaluation_result: Optional[Dict], criteria: List[Dict], evaluated_essays: List[Dict], lsh_index: Optional[MinHashLSHIndex] = None, fingerprint_scope: Optional[str] = None, plagiarism_result: Optional[Dict] = None, essay_features: Optional[Dict] = None) -> Dict:
+    """AI 평가 결과에 표절 검사를 반영하고, 결과 레코드를 만듭니다.
+    
+    plagiarism_result를 넘기면 (AI 평가와 동시에 미리 계산한) 그 결과를 사용하고, 없으면 여기서 검사합니다.
+    평가에 성공한 에세이는 이후 에세이의 표절 검사를 위해 evaluated_essays에 추가되고,
+    fingerprint_scope(평가 제목)가 있으면 지문 저장소에도 등록됩니다.
+    essay_features(prepare_essay_features()로 준비한 이 에세이의 항목)를 넘기면 표절 검사와 비교 목록 추가에 그대로 사용합니다.
+    """
+    if evaluation_result:
+        if essay_features is None:
+            essay_features = prepare_essay_features({"filename": extracted['filename'], "text": extracted['text']})
+        if plagiarism_result is None:
+            plagiarism_result = check_plagiarism_with_history(extracted['text'], extracted['filename'], evaluated_essays, lsh_index, fingerprint_scope, essay_features)
+        evaluation_result = apply_plagiarism_check(evaluation_result, plagiarism_result, criteria)
+        # 평가 완료된 에세이를 저장 (표절 검사용)
+        record_evaluated_essay(extracted['text'], extracted['filename'], evaluated_essays, fingerprint_scope, essay_features)
+    return build_evaluation_record(extracted, evaluation_result, criteria)
+
+def evaluate_essays_concurrently(
+    extracted_texts: List[Dict],
+    criteria: List[Dict],
+    api_key: str,
+    evaluated_essays: List[Dict],
+    max_in_flight: int = MAX_CONCURRENT_EVALUATIONS,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    lsh_index: Optional[MinHashLSHIndex] = None,
+    fingerprint_scope: Optional[str] = None,
+    status_callback: Optional[Callable[[int, str, Optional[Dict]], None]] = None
+) -> List[Dict]:
+    """여러 에세이의 AI 평가를 동시에 요청하고, 입력 순서대로 결과를 반환합니다.
+    
+    AI 평가 요청은 최대 max_in_flight개까지 스레드 풀에서 동시에 진행됩니다.
+    표절 검사와 결과 확정은 입력 순서대로 진행되므로, 각 에세이는 기존과 동일하게
+    앞서 평가가 끝난 에세이들(evaluated_essays)과 비교됩니다.
+    표절 검사는 별도의 작업 스레드에서 AI 요청이 진행되는 동안 입력 순서대로 미리 계산합니다.
+    앞선 에세이의 AI 평가가 실패하면 미리 계산한 결과(실패한 에세이도 비교 대상에 포함)를 버리고
+    결과 확정 시점에 실제 evaluated_essays와 다시 비교합니다.
+    지문 저장소 검색은 다른 평가 실행의 에세이만 대상으로 하므로, 앞선 에세이의 지문이 등록되기 전에
+    미리 계산해도 결과가 같습니다.
+    progress_callback(완료 개수, 전체 개수, 파일명)은 요청이 끝날 때마다 호출됩니다.
+    status_callback(에세이 번호, 상태, 결과 레코드)은 요청을 시작할 때("running")와
+    결과를 확정할 때("done" 또는 "failed")마다 호출됩니다. (평가 작업 체크포인트 저장용)
+    잔액 부족(insufficient_quota)이 감지되면 남은 요청을 취소하고 배치를 중단합니다.
+    """
+    total = len(extracted_texts)
+    results: List[Optional[Dict]] = [None] * total
+    if total == 0:
+        return []
+    
+    # 작업 스레드에서도 st.error 등이 현재 세션에 표시되도록 실행 컨텍스트 전달
+    script_ctx = get_script_run_ctx()
+    
+    def attach_script_ctx():
+        if script_ctx is not None:
+            add_script_run_ctx(None, script_ctx)
+    
+    ai_results = {}
+    # 평가 요청이 실패한 에세이의 오류 메시지 (결과 레코드의 피드백에 기록)
+    errors = {}
+    stopped_indices = set()
+    quota_exceeded = False
+    previous_all_succeeded = True
+    next_idx = 0
+    completed = 0
+    
+    # 미리 계산하는 표절 검사용 비교 목록: 지금까지의 evaluated_essays + 앞선 입력 에세이 전체
+    speculative_essays = list(evaluated_essays)
+    speculative_index = MinHashLSHIndex()
+    
+    def evaluate_with_status(idx: int, extracted: Dict) -> Optional[Dict]:
+        if status_callback:
+            status_callback(idx, "running", None)
+        return evaluate_essay_with_cache(extracted['text'], criteria, api_key)
+    
+    def precheck_plagiarism(extracted: Dict) -> Tuple[Dict, Dict]:
+        # 공백 제거와 shingle은 한 번만 계산하여 표절 검사, 비교 목록, 결과 확정(finalize_evaluation)에 함께 사용
+        essay_features = prepare_essay_features({
+            "filename": extracted['filename'],
+            "text": extracted['text']
+        })
+        plagiarism_result = check_plagiarism_with_history(extracted['text'], extracted['filename'], speculative_essays, speculative_index, fingerprint_scope, essay_features)
+        speculative_essays.append(essay_features)
+        return plagiarism_result, essay_features
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, total)), initializer=attach_script_ctx) as executor, \
+            ThreadPoolExecutor(max_workers=1, initializer=attach_script_ctx) as plagiarism_executor:
+        futures = {
+            executor.submit(evaluate_with_status, idx, extracted): idx
+            for idx, extracted in enumerate(extracted_texts)
+        }
+        # 작업 스레드가 하나이므로 입력 순서대로 실행됨
+        plagiarism_futures = [plagiarism_executor.submit(precheck_plagiarism, extracted) for extracted in extracted_texts]
+        
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                ai_results[idx] = future.result()
+            except CancelledError:
+                ai_results[idx] = None
+                stopped_indices.add(idx)
+            except QuotaExceededError:
+                ai_results[idx] = None
+                stopped_indices.add(idx)
+                if not quota_exceeded:
+                    quota_exceeded = True
+                    # 아직 시작하지 않은 요청은 모두 취소
+                    for pending in futures:
+                        pending.cancel()
+                    for pending in plagiarism_futures:
+                        pending.cancel()
+                    st.error("""
+                    ⚠️ **OpenAI API 잔액 부족으로 평가를 중단했습니다**
+                    
+                    OpenAI 계정에 크레딧을 충전한 뒤 다시 평가해주세요.
+                    이미 완료된 평가 결과는 그대로 유지됩니다.
+                    
+                    OpenAI 대시보드에서 계정 상태를 확인하실 수 있습니다: https://platform.openai.com/usage
+                    """)
+            except Exception as e:
+                error_str = str(e)
+                # OpenAI API 429 에러 (재시도 후에도 Rate Limit) 처리
+                if "429" in error_str or "rate limit" in error_str.lower():
+                    st.error("""
+                    ⚠️ **OpenAI API 사용량 초과**
+                    
+                    다음을 확인해주세요:
+                    1. API 사용량 한도를 초과하지 않았는지 확인
+                    2. 잠시 후 다시 시도해주세요
+                    
+                    OpenAI 대시보드에서 계정 상태를 확인하실 수 있습니다: https://platform.openai.com/usage
+                    """)
+                else:
+                    st.error(f"AI 평가 중 오류 발생: {error_str}")
+                ai_results[idx] = None
+                errors[idx] = error_str
+            completed += 1
+            
+            # 앞선 에세이가 모두 끝난 경우에만 순서대로 표절 검사 및 결과 확정
+            while next_idx in ai_results:
+                extracted = extracted_texts[next_idx]
+                evaluation_result = ai_results.pop(next_idx)
+                if next_idx in stopped_indices:
+                    results[next_idx] = build_evaluation_record(extracted, None, criteria, error_message="OpenAI API 잔액 부족으로 평가가 중단되었습니다.")
+                else:
+                    plagiarism_result = None
+                    essay_features = None
+                    plagiarism_future = plagiarism_futures[next_idx]
+                    if evaluation_result and previous_all_succeeded and not plagiarism_future.cancelled():
+                        plagiarism_result, essay_features = plagiarism_future.result()
+                    if next_idx in errors:
+                        results[next_idx] = build_evaluation_record(extracted, None, criteria, error_message=f"평가 중 오류가 발생했습니다: {errors.pop(next_idx)}")
+                    else:
+                        results[next_idx] = finalize_evaluation(extracted, evaluation_result, criteria, evaluated_essays, lsh_index, fingerprint_scope, plagiarism_result, essay_features)
+                if status_callback:
+                    status_callback(next_idx, "done" if evaluation_result else "failed", results[next_idx])
+                if not evaluation_result and previous_all_succeeded:
+                    previous_all_succeeded = False
+                    # 이후 에세이의 미리 계산한 결과는 사용하지 않으므로 아직 시작하지 않은 검사는 취소
+                    for pending in plagiarism_futures[next_idx + 1:]:
+                        pending.cancel()
+                next_idx += 1
+            
+            if progress_callback:
+                progress_callback(completed, total, extracted_texts[idx]['filename'])
+    
+    return results
+
+# ============================================
+# 평가 작업 체크포인트 (중단된 평가 이어서 하기)
+# ============================================
+def connect_job_store() -> sqlite3.Connection:
+    """평가 작업 저장소 DB에 연결하고, 테이블이 없으면 생성합니다."""
+    conn = sqlite3.connect(EVALUATION_JOB_STORE_FILE, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS evaluation_jobs (
+            job_id TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            title TEXT NOT NULL,
+            criteria TEXT NOT NULL,
+            fingerprint_scope TEXT,
+            created_at REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS job_essays (
+            job_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            text TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (job_id, position)
+        )
+    """)
+    # 백그라운드 대기열 열 추가 (이전 버전에서 만든 DB도 그대로 사용)
+    job_columns = {row[1] for row in conn.execute("PRAGMA table_info(evaluation_jobs)")}
+    for column, column_type in (("queue_status", "TEXT"), ("max_in_flight", "INTEGER"), ("queue_error", "TEXT"), ("finished_at", "REAL"), ("claimed_by", "TEXT"), ("claimed_at", "REAL")):
+        if column not in job_columns:
+            conn.execute(f"ALTER TABLE evaluation_jobs ADD COLUMN {column} {column_type}")
+    return conn
+
+def delete_expired_jobs(conn: sqlite3.Connection):
+    """대기열에 없는 평가 작업 중 마지막 진행(에세이 상태 갱신, 완료 시각) 후 JOB_RETENTION_DAYS가 지난 작업을 삭제합니다."""
+    cutoff = time.time() - JOB_RETENTION_DAYS * 86400
+    expired_jobs = conn.execute("""
+        SELECT j.job_id
+        FROM evaluation_jobs j
+        LEFT JOIN job_essays e ON e.job_id = j.job_id
+        WHERE COALESCE(j.queue_status, '') NOT IN ('queued', 'running')
+        GROUP BY j.job_id
+        HAVING MAX(j.created_at, COALESCE(j.finished_at, 0), COALESCE(MAX(e.updated_at), 0)) < ?
+    """, (cutoff,)).fetchall()
+    conn.executemany("DELETE FROM job_essays WHERE job_id = ?", expired_jobs)
+    conn.executemany("DELETE FROM evaluation_jobs WHERE job_id = ?", expired_jobs)
+
+def create_evaluation_job(extracted_texts: List[Dict], criteria: List[Dict], owner: str, title: str, fingerprint_scope: Optional[str] = None) -> str:
+    """평가할 에세이 전체를 "pending" 상태로 저장한 새 평가 작업을 만들고 작업 ID를 반환합니다.
+    보관 기간이 지난 작업도 함께 정리합니다."""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    conn = connect_job_store()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO evaluation_jobs (job_id, owner, title, criteria, fingerprint_scope, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, owner, title, json.dumps(criteria, ensure_ascii=False), fingerprint_scope, now)
+            )
+            conn.executemany(
+                "INSERT INTO job_essays (job_id, position, filename, text, status, result, updated_at) VALUES (?, ?, ?, ?, 'pending', NULL, ?)",
+                [(job_id, position, extracted['filename'], extracted['text'], now) for position, extracted in enumerate(extracted_texts)]
+            )
+            delete_expired_jobs(conn)
+    finally:
+        conn.close()
+    return job_id
+
+def update_job_essay(job_id: str, position: int, status: str, result: Optional[Dict] = None):
+    """평가 작업의 에세이 하나의 상태(pending/running/done/failed)와 결과를 바로 저장합니다."""
+    conn = connect_job_store()
+    try:
+        with conn:
+            if result is None:
+                conn.execute(
+                    "UPDATE job_essays SET status = ?, updated_at = ? WHERE job_id = ? AND position = ?",
+                    (status, time.time(), job_id, position)
+                )
+            else:
+                conn.execute(
+                    "UPDATE job_essays SET status = ?, result = ?, updated_at = ? WHERE job_id = ? AND position = ?",
+                    (status, json.dumps(result, ensure_ascii=False), time.time(), job_id, position)
+                )
+    finally:
+        conn.close()
+
+def load_evaluation_job(job_id: str) -> Optional[Dict]:
+    """저장된 평가 작업과 에세이별 상태, 결과를 불러옵니다."""
+    conn = connect_job_store()
+    try:
+        job_row = conn.execute(
+            "SELECT owner, title, criteria, fingerprint_scope, created_at FROM evaluation_jobs WHERE job_id = ?",
+            (job_id,)
+        ).fetchone()
+        if job_row is None:
+            return None
+        essay_rows = conn.execute(
+            "SELECT filename, text, status, result FROM job_essays WHERE job_id = ? ORDER BY position",
+            (job_id,)
+        ).fetchall()
+    finally:
+        conn.close()
+    owner, title, criteria, fingerprint_scope, created_at = job_row
+    return {
+        "job_id": job_id,
+        "owner": owner,
+        "title": title,
+        "criteria": json.loads(criteria),
+        "fingerprint_scope": fingerprint_scope,
+        "created_at": created_at,
+        "essays": [
+            {
+                "filename": filename,
+                "text": text,
+                "status": status,
+                "result": json.loads(result) if result else None
+            }
+            for filename, text, status, result in essay_rows
+        ]
+    }
+
+def list_unfinished_jobs(owner: str) -> List[Dict]:
+    """완료되지 않은 에세이가 남아 있는 평가 작업 목록(최근 작업부터)을 반환합니다.
+    백그라운드 대기열에서 기다리거나 처리 중인 작업은 제외합니다."""
+    conn = connect_job_store()
+    try:
+        rows = conn.execute("""
+            SELECT j.job_id, j.title, j.created_at,
+                   SUM(e.status = 'done') AS done_count, COUNT(*) AS total_count
+            FROM evaluation_jobs j
+            JOIN job_essays e ON e.job_id = j.job_id
+            WHERE j.owner = ? AND COALESCE(j.queue_status, '') NOT IN ('queued', 'running')
+            GROUP BY j.job_id
+            HAVING done_count < total_count
+            ORDER BY j.created_at DESC
+        """, (owner,)).fetchall()
+    finally:
+        conn.close()
+    return [
+        {"job_id": job_id, "title": title, "created_at": created_at, "done_count": done_count, "total_count": total_count}
+        for job_id, title, created_at, done_count, total_count in rows
+    ]
+
+def delete_evaluation_job(job_id: str):
+    """평가 작업과 에세이별 기록을 삭제합니다."""
+    conn = connect_job_store()
+    try:
+        with conn:
+            conn.execute("DELETE FROM job_essays WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM evaluation_jobs WHERE job_id = ?", (job_id,))
+    finally:
+        conn.close()
+
+def run_evaluation_job(
+    job: Dict,
+    api_key: str,
+    evaluated_essays: List[Dict],
+    max_in_flight: int = MAX_CONCURRENT_EVALUATIONS,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    lsh_index: Optional[MinHashLSHIndex] = None
+) -> List[Dict]:
+    """평가 작업에서 완료("done")되지 않은 에세이만 평가하고, 전체 결과를 작업의 에세이 순서대로 반환합니다.
+    
+    에세이마다 결과가 확정되는 즉시 작업 저장소에 기록되므로, 중간에 중단되어도 다시 호출하면
+    남은 에세이부터 이어서 평가합니다. 이미 완료된 에세이는 표절 검사 비교 대상에 포함됩니다.
+    """
+    essays = job['essays']
+    results: List[Optional[Dict]] = [essay['result'] if essay['status'] == 'done' else None for essay in essays]
+    
+    # 이전 실행에서 완료된 에세이를 표절 검사 대상에 추가 (같은 세션에서 이미 추가된 에세이는 제외)
+    known_filenames = {essay['filename'] for essay in evaluated_essays}
+    for essay in essays:
+        if essay['status'] == 'done' and essay['filename'] not in known_filenames:
+            record_evaluated_essay(essay['text'], essay['filename'], evaluated_essays)
+    
+    unfinished_positions = [position for position, essay in enumerate(essays) if essay['status'] != 'done']
+    
+    def save_status(idx: int, status: str, record: Optional[Dict]):
+        update_job_essay(job['job_id'], unfinished_positions[idx], status, record)
+    
+    new_results = evaluate_essays_concurrently(
+        [{"filename": essays[position]['filename'], "text": essays[position]['text']} for position in unfinished_positions],
+        job['criteria'],
+        api_key,
+        evaluated_essays,
+        max_in_flight=max_in_flight,
+        progress_callback=progress_callback,
+        lsh_index=lsh_index,
+        fingerprint_scope=job['fingerprint_scope'],
+        status_callback=save_status
+    )
+    for position, result in zip(unfinished_positions, new_results):
+        results[position] = result
+    return results
+
+def enqueue_evaluation_job(job_id: str, max_in_flight: int = MAX_CONCURRENT_EVALUATIONS):
+    """평가 작업을 백그라운드 대기열에 넣습니다."""
+    conn = connect_job_store()
+    try:
+        with conn:
+            conn.execute(
+                "UPDATE evaluation_jobs SET queue_status = 'queued', max_in_flight = ?, queue_error = NULL, finished_at = NULL WHERE job_id = ?",
+                (max_in_flight, job_id)
+            )
+    finally:
+        conn.close()
+
+def claim_next_queued_job(worker_id: str) -> Optional[Tuple[str, int]]:
+    """대기열에서 가장 먼저 들어온 작업을 worker_id의 "running" 작업으로 바꾸고 (작업 ID, 동시 평가 개수)를 반환합니다.
+    
+    처리 중이지만 임대 시간(BACKGROUND_LEASE_SECONDS) 동안 갱신되지 않은 작업(서버가 중단된 경우)도
+    대기 중인 작업과 함께 다시 가져갑니다. (완료된 에세이는 유지)
+    """
+    now = time.time()
+    conn = connect_job_store()
+    try:
+        # 여러 작업 스레드가 같은 작업을 가져가지 않도록 쓰기 잠금을 먼저 잡음
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("""
+            SELECT job_id, max_in_flight FROM evaluation_jobs
+            WHERE queue_status = 'queued'
+               OR (queue_status = 'running' AND COALESCE(claimed_at, 0) < ?)
+            ORDER BY created_at LIMIT 1
+        """, (now - BACKGROUND_LEASE_SECONDS,)).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE evaluation_jobs SET queue_status = 'running', claimed_by = ?, claimed_at = ? WHERE job_id = ?",
+                (worker_id, now, row[0])
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return row[0], row[1] or MAX_CONCURRENT_EVALUATIONS
+
+def renew_job_lease(job_id: str, worker_id: str) -> bool:
+    """처리 중인 작업의 임대 시간을 갱신합니다. 다른 작업 스레드가 이미 가져간 작업이면 False를 반환합니다."""
+    conn = connect_job_store()
+    try:
+        with conn:
+            updated = conn.execute(
+                "UPDATE evaluation_jobs SET claimed_at = ? WHERE job_id = ? AND queue_status = 'running' AND claimed_by = ?",
+                (time.time(), job_id, worker_id)
+            ).rowcount
+    finally:
+        conn.close()
+    return updated > 0
+
+def finish_queued_job(job_id: str, worker_id: str, error: Optional[str] = None):
+    """백그라운드 작업을 끝난 상태로 기록합니다. (임대가 만료되어 다른 작업 스레드가 가져간 작업은 그대로 둠)"""
+    conn = connect_job_store()
+    try:
+        with conn:
+            conn.execute(
+                "UPDATE evaluation_jobs SET queue_status = ?, queue_error = ?, finished_at = ?, claimed_by = NULL, claimed_at = NULL "
+                "WHERE job_id = ? AND claimed_by = ?",
+                ("failed" if error else "finished", error, time.time(), job_id, worker_id)
+            )
+    finally:
+        conn.close()
+
+def keep_job_lease(job_id: str, worker_id: str, stop_event: threading.Event):
+    """작업이 끝날 때까지 임대 시간의 1/4마다 임대를 갱신합니다. (heartbeat 스레드)"""
+    while not stop_event.wait(BACKGROUND_LEASE_SECONDS / 4):
+        try:
+            if not renew_job_lease(job_id, worker_id):
+                return
+        except sqlite3.Error:
+            pass  # 일시적인 잠금 등은 다음 주기에 다시 시도
+
+def list_background_jobs(owner: str, limit: int = 10) -> List[Dict]:
+    """사용자의 백그라운드 평가 작업(대기, 처리 중, 최근 완료) 목록과 진행 상황을 반환합니다."""
+    conn = connect_job_store()
+    try:
+        rows = conn.execute("""
+            SELECT j.job_id, j.title, j.created_at, j.queue_status, j.queue_error,
+                   SUM(e.status = 'done') AS done_count, SUM(e.status = 'failed') AS failed_count, COUNT(*) AS total_count,
+                   (SELECT COUNT(*) FROM evaluation_jobs q WHERE q.queue_status = 'queued' AND q.created_at < j.created_at) AS queue_position
+            FROM evaluation_jobs j
+            JOIN job_essays e ON e.job_id = j.job_id
+            WHERE j.owner = ? AND j.queue_status IS NOT NULL
+            GROUP BY j.job_id
+            ORDER BY j.created_at DESC
+            LIMIT ?
+        """, (owner, limit)).fetchall()
+    finally:
+        conn.close()
+    return [
+        {
+            "job_id": job_id,
+            "title": title,
+            "created_at": created_at,
+            "queue_status": queue_status,
+            "queue_error": queue_error,
+            "done_count": done_count,
+            "failed_count": failed_count,
+            "total_count": total_count,
+            "queue_position": queue_position
+        }
+        for job_id, title, created_at, queue_status, queue_error, done_count, failed_count, total_count, queue_position in rows
+    ]
+
+def dismiss_background_job(job_id: str):
+    """결과를 불러온 백그라운드 작업을 목록에서 숨깁니다. (미완료 에세이가 있으면 '중단된 평가 작업'에 남음)"""
+    conn = connect_job_store()
+    try:
+        with conn:
+            conn.execute("UPDATE evaluation_jobs SET queue_status = NULL WHERE job_id = ? AND queue_status NOT IN ('queued', 'running')", (job_id,))
+    finally:
+        conn.close()
+
+def process_next_queued_job(worker_id: str, api_key: str) -> bool:
+    """대기열에서 작업 하나를 가져와 평가하고 결과를 기록합니다. 처리할 작업이 없으면 False를 반환합니다.
+    
+    평가에 실패한 에세이가 있으면 실패 개수와 첫 번째 오류 메시지를 작업의 오류(queue_error)로 기록합니다.
+    """
+    try:
+        claimed = claim_next_queued_job(worker_id)
+    except sqlite3.Error:
+        claimed = None
+    if claimed is None:
+        return False
+    
+    job_id, max_in_flight = claimed
+    stop_event = threading.Event()
+    heartbeat = threading.Thread(target=keep_job_lease, args=(job_id, worker_id, stop_event), daemon=True)
+    heartbeat.start()
+    try:
+        # 작업마다 별도의 비교 목록을 사용 (작업 안의 에세이끼리 표절 검사)
+        run_evaluation_job(load_evaluation_job(job_id), api_key, [], max_in_flight=max_in_flight)
+        failed_essays = [essay for essay in load_evaluation_job(job_id)['essays'] if essay['status'] != 'done']
+        error = None
+        if failed_essays:
+            first_result = failed_essays[0]['result']
+            error = f"{len(failed_essays)}개 에세이 평가 실패 ({failed_essays[0]['filename']}: {first_result['feedback'] if first_result else '결과 없음'})"
+    except Exception as e:
+        error = str(e)
+    finally:
+        stop_event.set()
+        heartbeat.join()
+    try:
+        finish_queued_job(job_id, worker_id, error)
+    except sqlite3.Error:
+        pass  # 기록하지 못한 작업은 임대가 만료되면 다시 처리됨
+    return True
+
+def run_background_worker(api_key: str):
+    """대기열의 평가 작업을 하나씩 가져와 처리하는 작업 스레드의 본체입니다. (프로세스 종료 시까지 실행)"""
+    # 프로세스와 스레드마다 다른 ID (임대한 작업 스레드 구분용)
+    worker_id = f"{os.getpid()}-{threading.current_thread().name}-{uuid.uuid4().hex[:8]}"
+    while True:
+        if not process_next_queued_job(worker_id, api_key):
+            time.sleep(BACKGROUND_POLL_INTERVAL_SECONDS)
+
+@st.cache_resource(show_spinner=False)
+def start_background_workers(api_key: str) -> List[threading.Thread]:
+    """서버 프로세스마다 한 번만 백그라운드 작업 스레드를 시작합니다. 모든 사용자의 작업이 이 스레드들을 공유합니다.
+    중단된 서버에서 처리 중이던 작업은 임대가 만료되면 작업 스레드가 다시 가져갑니다.
+    별도의 작업 프로세스(grading_worker.py)를 실행하지 않는 경우(BACKGROUND_IN_PROCESS_WORKERS)에만 사용합니다."""
+    workers = []
+    for worker_idx in range(max(1, BACKGROUND_WORKER_COUNT)):
+        worker = threading.Thread(target=run_background_worker, args=(api_key,), name=f"grading-worker-{worker_idx}", daemon=True)
+        worker.start()
+        workers.append(worker)
+    return workers
+
+def load_job_into_session(job_id: str):
+    """완료된 평가 작업의 에세이, 평가 기준, 결과를 현재 세션으로 불러옵니다."""
+    job = load_evaluation_job(job_id)
+    st.session_state.extracted_texts = [{"filename": essay['filename'], "text": essay['text']} for essay in job['essays']]
+    st.session_state.extraction_errors = []
+    st.session_state.evaluation_criteria = job['criteria']
+    st.session_state.evaluation_results = [
+        essay['result'] if essay['result'] else build_evaluation_record(essay, None, job['criteria'])
+        for essay in job['essays']
+    ]
+    st.session_state.evaluation_essays = list(st.session_state.extracted_texts)
+    st.session_state.cohort_similarity = None
+    # 이후 표절 검사와 공모 그룹 분석을 위해 평가가 끝난 에세이를 세션 비교 목록에 추가
+    known_filenames = {essay['filename'] for essay in st.session_state.evaluated_essays}
+    for essay in job['essays']:
+        if essay['status'] == 'done' and essay['filename'] not in known_filenames:
+            record_evaluated_essay(essay['text'], essay['filename'], st.session_state.evaluated_essays)
+    st.session_state.last_cache_hits = sum(1 for result in st.session_state.evaluation_results if result.get('cached'))
+    st.session_state.collusion_groups = find_collusion_groups(st.session_state.evaluated_essays, st.session_state.plagiarism_index)
+
+# ============================================
+# 대량 평가 (OpenAI Batch API)
+# ============================================
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+def create_batch_input_file(extracted_texts: List[Dict], criteria: List[Dict]) -> bytes:
+    """실시간 평가와 동일한 프롬프트로 Batch API 입력 JSONL 파일을 만듭니다."""
+    lines = []
+    for idx, extracted in enumerate(extracted_texts):
+        request = {
+            "custom_id": f"essay-{idx}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": OPENAI_MODEL,
+                "messages": build_evaluation_messages(extracted['text'], criteria),
+                "response_format": {"type": "json_object"},
+                "temperature": OPENAI_TEMPERATURE
+            }
+        }
+        lines.append(json.dumps(request, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+@st.cache_resource(show_spinner=False)
+def get_batch_status_registry() -> Dict:
+    """백그라운드 폴링 스레드가 갱신하는 배치 상태 저장소 {batch_id: 상태 정보}를 반환합니다."""
+    return {}
+
+def record_batch_status(registry: Dict, batch) -> Dict:
+    """Batch 객체에서 화면 표시와 결과 수집에 필요한 정보만 저장합니다."""
+    request_counts = getattr(batch, 'request_counts', None)
+    status = {
+        "status": batch.status,
+        "completed": request_counts.completed if request_counts else 0,
+        "failed": request_counts.failed if request_counts else 0,
+        "total": request_counts.total if request_counts else 0,
+        "output_file_id": batch.output_file_id,
+        "error_file_id": batch.error_file_id,
+        "updated_at": time.time()
+    }
+    registry[batch.id] = status
+    return status
+
+def poll_grading_batch(client: OpenAI, batch_id: str, registry: Dict):
+    """배치가 끝날 때까지 주기적으로 상태를 조회하여 registry에 기록합니다. (백그라운드 스레드)"""
+    while True:
+        try:
+            status = record_batch_status(registry, client.batches.retrieve(batch_id))
+            if status["status"] in BATCH_TERMINAL_STATUSES:
+                return
+        except Exception as e:
+            # 일시적인 조회 실패는 다음 주기에 다시 시도
+            registry.setdefault(batch_id, {})["poll_error"] = str(e)
+        time.sleep(BATCH_POLL_INTERVAL_SECONDS)
+
+def submit_grading_batch(extracted_texts: List[Dict], criteria: List[Dict], api_key: str) -> str:
+    """대량 평가 배치를 제출하고 백그라운드 상태 폴링을 시작합니다. 배치 ID를 반환합니다."""
+    client = get_openai_client(api_key, OPENAI_BASE_URL)
+    input_file = client.files.create(
+        file=("grading_batch.jsonl", create_batch_input_file(extracted_texts, criteria)),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+        metadata={"description": f"essay grading ({len(extracted_texts)} essays)"}
+    )
+    registry = get_batch_status_registry()
+    record_batch_status(registry, batch)
+    threading.Thread(target=poll_grading_batch, args=(client, batch.id, registry), daemon=True).start()
+    return batch.id
+
+def parse_batch_output(content: str, criteria: List[Dict]) -> Dict[str, Optional[Dict]]:
+    """Batch API 출력(JSONL)을 custom_id별 검증된 평가 결과로 변환합니다. 실패한 요청은 None입니다."""
+    parsed = {}
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        custom_id = entry.get('custom_id')
+        response = entry.get('response') or {}
+        if entry.get('error') or response.get('status_code') != 200:
+            parsed[custom_id] = None
+            continue
+        try:
+            message_content = response['body']['choices'][0]['message']['content']
+            parsed[custom_id] = validate_evaluation_scores(json.loads(message_content), criteria)
+        except (KeyError, IndexError, TypeError, json.JSONDecodeError):
+            parsed[custom_id] = None
+    return parsed
+
+def ingest_grading_batch(batch_id: str, extracted_texts: List[Dict], criteria: List[Dict], api_key: str, evaluated_essays: List[Dict], lsh_index: Optional[MinHashLSHIndex] = None, fingerprint_scope: Optional[str] = None) -> List[Dict]:
+    """완료된 배치의 결과를 내려받아 실시간 평가와 같은 검증/표절 검사를 거쳐 결과 목록을 만듭니다."""
+    client = get_openai_client(api_key, OPENAI_BASE_URL)
+    status = record_batch_status(get_batch_status_registry(), client.batches.retrieve(batch_id))
+    
+    parsed = {}
+    if status["output_file_id"]:
+        parsed = parse_batch_output(client.files.content(status["output_file_id"]).text, criteria)
+    
+    results = []
+    for idx, extracted in enumerate(extracted_texts):
+        evaluation_result = parsed.get(f"essay-{idx}")
+        if evaluation_result:
+            # 실시간 평가에서도 재사용할 수 있도록 캐시에 저장
+            save_cached_evaluation(make_grading_cache_key(extracted['text'], criteria), evaluation_result)
+        results.append(finalize_evaluation(extracted, evaluation_result, criteria, evaluated_essays, lsh_index, fingerprint_scope))
+    return results
+
 def check_login(user_id: str, password: str) -> bool:
     """로그인 정보를 확인합니다."""
     # 관리자는 항상 로그인 가능
@@ -445,285 +2329,105 @@ def check_admin_login(user_id: str, password: str) -> bool:
     """관리자 로그인 정보를 확인합니다."""
     return user_id == ADMIN_ID and password == ADMIN_PASSWORD
 
-def parse_feedback(feedback_text: str, criteria: List[Dict]) -> Dict:
-    """피드백 텍스트를 파싱하여 구조화된 데이터로 변환합니다."""
-    feedback_lines = feedback_text.split('\n')
-    feedback_data = {}
-    general_feedback = []
-    
-    current_item = None
-    current_content = []
-    
-    for line in feedback_lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        # 항목명 패턴 찾기: "[항목명] (점수/최고점):" 형식
-        item_pattern = r'\[([^\]]+)\]\s*\(([^)]+)\)\s*:\s*(.+)'
-        match = re.match(item_pattern, line)
-        
-        if match:
-            # 이전 항목 저장
-            if current_item:
-                feedback_data[current_item] = '\n'.join(current_content)
-            
-            # 새 항목 시작
-            current_item = match.group(1)
-            score_info = match.group(2)
-            initial_content = match.group(3)
-            current_content = [initial_content] if initial_content else []
-        elif '종합' in line or '전체적으로' in line or '전체' in line:
-            # 이전 항목 저장
-            if current_item:
-                feedback_data[current_item] = '\n'.join(current_content)
-                current_item = None
-                current_content = []
-            general_feedback.append(line)
-        elif current_item:
-            # 현재 항목의 내용 추가
-            current_content.append(line)
-        else:
-            # 항목명 패턴이 없으면 종합 평가로 처리
-            if feedback_data:
-                general_feedback.append(line)
-    
-    # 마지막 항목 저장
-    if current_item:
-        feedback_data[current_item] = '\n'.join(current_content)
+def make_reports_cache_key(evaluation_results: List[Dict], criteria: List[Dict], evaluation_info: Dict) -> str:
+    """평가 결과, 평가 기준, 평가 정보가 같으면 같은 값이 나오는 보고서 캐시 키를 만듭니다."""
+    payload = json.dumps(
+        {"results": evaluation_results, "criteria": criteria, "info": evaluation_info},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def render_reports_in_parallel(evaluation_results: List[Dict], criteria: List[Dict], evaluation_info: Dict, max_workers: int = REPORT_RENDER_WORKERS) -> Iterable[Tuple[Dict, bytes]]:
+    """학생별 피드백 보고서를 여러 프로세스에서 동시에 만들고, 완성되는 순서대로 (결과, DOCX 바이트)를 내보냅니다."""
+    if max_workers <= 1 or len(evaluation_results) < 2:
+        for result in evaluation_results:
+            yield result, render_report_worker(result, criteria, evaluation_info)
+        return
     
-    # 각 항목별로 잘 작성한 점과 개선할 점 추출
-    structured_feedback = {}
-    for criterion in criteria:
-        criterion_name = criterion['name']
-        item_feedback = feedback_data.get(criterion_name, "")
-        
-        # ✨ 잘 작성한 점 추출
-        good_points = []
-        # ⚠️ 개선할 점 및 오류 추출
-        improvement_points = []
-        # 일반 평가 내용
-        general_item_feedback = []
-        
-        if item_feedback:
-            lines = item_feedback.split('\n')
-            current_section = None
-            good_section_started = False
-            improvement_section_started = False
-            seen_good_points = set()  # 중복 방지용
-            seen_improvement_points = set()  # 중복 방지용
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # ✨ 잘 작성한 점 섹션 시작 감지
-                is_good_section_start = ('✨' in line or ('잘 작성한 점' in line and (':' in line or '：' in line)))
-                # ⚠️ 개선할 점 및 오류 섹션 시작 감지
-                is_improvement_section_start = ('⚠️' in line or (('개선할 점' in line or '오류' in line) and (':' in line or '：' in line)))
-                
-                # ✨ 잘 작성한 점 섹션 시작
-                if is_good_section_start:
-                    # 이미 good 섹션이 시작되었으면 이 줄은 무시 (중복 헤더 방지)
-                    if good_section_started:
-                        continue
-                    # 새 섹션 시작
-                    current_section = 'good'
-                    good_section_started = True
-                    improvement_section_started = False  # 다른 섹션 종료
-                    # ✨ 또는 "잘 작성한 점:" 제거
-                    clean_line = re.sub(r'^[✨\s]*잘\s*작성한\s*점\s*[:：]\s*', '', line, flags=re.IGNORECASE)
-                    clean_line = clean_line.replace('✨', '').strip()
-                    if clean_line and clean_line not in seen_good_points:
-                        good_points.append(clean_line)
-                        seen_good_points.add(clean_line)
-                # ⚠️ 개선할 점 및 오류 섹션 시작
-                elif is_improvement_section_start:
-                    # 이미 improvement 섹션이 시작되었으면 이 줄은 무시 (중복 헤더 방지)
-                    if improvement_section_started:
-                        continue
-                    # 새 섹션 시작
-                    current_section = 'improvement'
-                    improvement_section_started = True
-                    good_section_started = False  # 다른 섹션 종료
-                    # ⚠️ 또는 "개선할 점 및 오류:" 제거
-                    clean_line = re.sub(r'^[⚠️\s]*개선할\s*점\s*(및\s*오류)?\s*[:：]\s*', '', line, flags=re.IGNORECASE)
-                    clean_line = clean_line.replace('⚠️', '').strip()
-                    if clean_line and clean_line not in seen_improvement_points:
-                        improvement_points.append(clean_line)
-                        seen_improvement_points.add(clean_line)
-                # 현재 섹션에 내용 추가
-                elif current_section == 'good' and good_section_started:
-                    # 다른 섹션 시작 신호가 아니고, 중복이 아닌 경우만 추가
-                    if line and not is_improvement_section_start and line not in seen_good_points:
-                        good_points.append(line)
-                        seen_good_points.add(line)
-                elif current_section == 'improvement' and improvement_section_started:
-                    # 다른 섹션 시작 신호가 아니고, 중복이 아닌 경우만 추가
-                    if line and not is_good_section_start and line not in seen_improvement_points:
-                        improvement_points.append(line)
-                        seen_improvement_points.add(line)
-                # 일반 평가 내용 (섹션 시작 전 또는 섹션 외)
-                elif line and not is_good_section_start and not is_improvement_section_start:
-                    # 중복 제거
-                    if line not in general_item_feedback:
-                        general_item_feedback.append(line)
-        
-        structured_feedback[criterion_name] = {
-            'summary': '\n'.join(general_item_feedback) if general_item_feedback else item_feedback,
-            'good_points': '\n'.join(good_points) if good_points else '',
-            'improvement_points': '\n'.join(improvement_points) if improvement_points else ''
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(evaluation_results)),
+        mp_context=get_process_pool_context()
+    ) as executor:
+        futures = {
+            executor.submit(render_report_worker, result, criteria, evaluation_info): result
+            for result in evaluation_results
         }
-    
-    return {
-        'items': structured_feedback,
-        'general': '\n'.join(general_feedback) if general_feedback else ''
-    }
+        for future in as_completed(futures):
+            # 내보낸 보고서는 바로 놓아 주어 전체 보고서가 메모리에 쌓이지 않도록 함
+            yield futures.pop(future), future.result()
 
-def create_feedback_report(result: Dict, criteria: List[Dict], evaluation_info: Dict) -> BytesIO:
-    """학생별 피드백 보고서를 Word 문서로 생성합니다."""
-    doc = Document()
-    
-    # 페이지 방향을 가로(landscape)로 설정
-    section = doc.sections[0]
-    # A4 가로: 너비 11.69인치, 높이 8.27인치
-    section.page_height = Inches(8.27)
-    section.page_width = Inches(11.69)
-    
-    # 제목
-    title = doc.add_heading('에세이 평가 보고서', 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # 평가 정보
-    doc.add_heading('평가 정보', level=1)
-    info_para = doc.add_paragraph()
-    if evaluation_info.get('year'):
-        info_para.add_run(f"평가 년도: {evaluation_info['year']}\n").bold = True
-    if evaluation_info.get('semester'):
-        info_para.add_run(f"학기: {evaluation_info['semester']}\n").bold = True
-    if evaluation_info.get('subject'):
-        info_para.add_run(f"과목명: {evaluation_info['subject']}\n").bold = True
-    if evaluation_info.get('title'):
-        info_para.add_run(f"평가 제목: {evaluation_info['title']}\n").bold = True
-    
-    # 학생 정보
-    student_name = result['filename'].replace('.pdf', '').replace('.PDF', '')
-    doc.add_heading('학생 정보', level=1)
-    student_para = doc.add_paragraph()
-    student_para.add_run(f"학생명: {student_name}\n").bold = True
-    
-    # 점수 요약 (가로형 표)
-    doc.add_heading('점수 요약', level=1)
-    
-    # 점수 테이블 생성 (가로형: 헤더 행 + 데이터 행)
-    table = doc.add_table(rows=2, cols=len(criteria) + 2)  # 평가 기준 열들 + 점수 열 + 총점 열
-    table.style = 'Light Grid Accent 1'
-    
-    # 첫 번째 행: 헤더
-    header_cells = table.rows[0].cells
-    header_cells[0].text = '평가 기준'
-    for idx, criterion in enumerate(criteria, 1):
-        header_cells[idx].text = criterion['name']
-    header_cells[-1].text = '총점'
-    
-    # 헤더 셀 굵게 표시
-    for cell in header_cells:
-        for paragraph in cell.paragraphs:
-            for run in paragraph.runs:
-                run.font.bold = True
+def create_all_reports_zip(evaluation_results: List[Dict], criteria: List[Dict], evaluation_info: Dict, output_file: BinaryIO, max_workers: int = REPORT_RENDER_WORKERS) -> None:
+    """모든 학생의 피드백 보고서를 ZIP 파일로 output_file에 씁니다. (보고서는 완성되는 순서대로 ZIP에 추가)
     
-    # 두 번째 행: 점수 데이터
-    data_cells = table.rows[1].cells
-    data_cells[0].text = '점수'
-    data_cells[0].paragraphs[0].runs[0].font.bold = True
+    DOCX는 이미 압축된 ZIP 파일이므로 다시 압축하지 않고 그대로(ZIP_STORED) 담습니다.
+    """
+    with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_STORED) as zip_file:
+        for result, report_bytes in render_reports_in_parallel(evaluation_results, criteria, evaluation_info, max_workers):
+            student_name = result['filename'].replace('.pdf', '').replace('.PDF', '')
+            zip_file.writestr(f"{student_name}_피드백보고서.docx", report_bytes)
+
+def build_reports_zip_file(evaluation_results: List[Dict], criteria: List[Dict], evaluation_info: Dict) -> str:
+    """전체 피드백 보고서 ZIP을 임시 파일에 바로 써서 만들고, 그 파일 경로를 반환합니다. (ZIP 전체를 메모리에 두지 않음)"""
+    with tempfile.NamedTemporaryFile(prefix=SPOOL_FILE_PREFIX, suffix=".zip", dir=UPLOAD_SPOOL_DIR, delete=False) as spooled:
+        try:
+            create_all_reports_zip(evaluation_results, criteria, evaluation_info, spooled)
+        except Exception:
+            spooled.close()
+            os.remove(spooled.name)
+            raise
+    return spooled.name
+
+def discard_reports_zip():
+    """세션에 보관 중인 전체 피드백 보고서 ZIP 임시 파일을 지웁니다."""
+    reports_zip = st.session_state.reports_zip
+    st.session_state.reports_zip = None
+    if reports_zip and os.path.exists(reports_zip['path']):
+        os.remove(reports_zip['path'])
+
+def generate_benchmark_results(num_students: int, criteria: List[Dict]) -> List[Dict]:
+    """보고서 생성 성능 측정용 가상 평가 결과를 만듭니다. (실제 AI 피드백과 같은 형식)"""
+    results = []
+    for student_idx in range(num_students):
+        scores = {criterion['name']: float(criterion['max_score']) * 0.8 for criterion in criteria}
+        feedback_lines = []
+        for criterion in criteria:
+            feedback_lines.append(f"[{criterion['name']}] ({scores[criterion['name']]:.1f}/{criterion['max_score']:.1f}): {criterion['name']} 항목을 전반적으로 충실하게 작성하였습니다.")
+            feedback_lines.append("✨ 잘 작성한 점: 주장과 근거가 분명하고 문단 구성이 자연스럽습니다.")
+            feedback_lines.append("⚠️ 개선할 점 및 오류: 일부 문장이 길어 의미가 흐려지므로 나누어 쓰면 좋겠습니다.")
+        feedback_lines.append("종합의견: 전체적으로 논리적인 글이며, 문장 다듬기에 조금 더 신경 쓰면 좋겠습니다.")
+        results.append({
+            "filename": f"학생{student_idx + 1}.pdf",
+            "scores": scores,
+            "total_score": sum(scores[criterion['name']] * criterion.get('weight', 1.0) for criterion in criteria),
+            "feedback": "\n".join(feedback_lines)
+        })
+    return results
+
+def benchmark_report_rendering(student_counts: Iterable[int] = (50, 200, 1000), worker_counts: Optional[Iterable[int]] = None) -> List[Dict]:
+    """학생 수와 프로세스 수별로 전체 피드백 보고서 ZIP 생성 시간과 처리량(보고서/초)을 측정합니다."""
+    if worker_counts is None:
+        # 1, 2, 4, ... 코어 수까지
+        cpu_count = os.cpu_count() or 1
+        worker_counts = sorted({min(2 ** power, cpu_count) for power in range(cpu_count.bit_length() + 1)})
+    evaluation_info = {'year': '2025', 'semester': '1학기', 'subject': '성능 측정', 'title': '보고서 생성 성능 비교'}
     
-    # 각 평가 기준별 점수 (가중치 반영)
-    total_score = 0.0
-    total_max = 0.0
-    for idx, criterion in enumerate(criteria, 1):
-        score = result['scores'].get(criterion['name'], 0.0)
-        weight = criterion.get('weight', 1.0)
-        data_cells[idx].text = f"{score:.1f} / {criterion['max_score']:.1f}"
-        total_score += score * weight
-        total_max += criterion['max_score'] * weight
-    
-    # 총점
-    data_cells[-1].text = f"{total_score:.1f} / {total_max:.1f}"
-    data_cells[-1].paragraphs[0].runs[0].font.bold = True
-    
-    # 상세 피드백
-    doc.add_heading('상세 피드백', level=1)
-    
-    # 피드백 텍스트를 파싱하여 구조화된 데이터로 변환
-    parsed_feedback = parse_feedback(result['feedback'], criteria)
-    
-    # 평가 기준별 피드백 표 생성
-    # 종합의견 행을 포함하여 행 수 계산
-    num_rows = len(criteria) + (1 if parsed_feedback['general'] else 0) + 1  # 헤더 + 기준 행 + 종합의견 행(있으면)
-    feedback_table = doc.add_table(rows=num_rows, cols=2)
-    feedback_table.style = 'Light Grid Accent 1'
-    
-    # 열 너비 설정 (평가 기준: 더 줄임, 상세 피드백: 넓게)
-    feedback_table.columns[0].width = Inches(0.75)  # 평가 기준 열 (절반으로 줄임)
-    feedback_table.columns[1].width = Inches(10.94)  # 상세 피드백 열 (넓게)
-    
-    # 헤더
-    header_cells = feedback_table.rows[0].cells
-    header_cells[0].text = '평가 기준'
-    header_cells[1].text = '상세 피드백'
-    for cell in header_cells:
-        for paragraph in cell.paragraphs:
-            for run in paragraph.runs:
-                run.font.bold = True
-    
-    # 각 평가 기준별 피드백 추가
-    row_idx = 1
-    for criterion in criteria:
-        criterion_name = criterion['name']
-        row_cells = feedback_table.rows[row_idx].cells
-        row_cells[0].text = criterion_name
-        
-        # 해당 기준에 대한 구조화된 피드백 가져오기
-        item_feedback = parsed_feedback['items'].get(criterion_name, {})
-        summary = item_feedback.get('summary', '')
-        good_points = item_feedback.get('good_points', '')
-        improvement_points = item_feedback.get('improvement_points', '')
-        
-        # 피드백 내용 구성
-        feedback_content = []
-        if summary:
-            feedback_content.append(f"【평가 요약】\n{summary}")
-        if good_points:
-            feedback_content.append(f"\n✨ 잘 작성한 점:\n{good_points}")
-        if improvement_points:
-            feedback_content.append(f"\n⚠️ 개선할 점 및 오류:\n{improvement_points}")
-        
-        row_cells[1].text = '\n'.join(feedback_content) if feedback_content else "피드백 없음"
-        
-        row_idx += 1
-    
-    # 종합의견 행 추가
-    if parsed_feedback['general']:
-        row_cells = feedback_table.rows[row_idx].cells
-        row_cells[0].text = '종합의견'
-        # 종합의견 셀을 굵게 표시
-        for paragraph in row_cells[0].paragraphs:
-            for run in paragraph.runs:
-                run.font.bold = True
-        
-        # 종합의견 내용
-        row_cells[1].text = parsed_feedback['general']
-        # 종합의견 내용도 굵게 표시
-        for paragraph in row_cells[1].paragraphs:
-            for run in paragraph.runs:
-                run.font.bold = True
-    
-    # 문서를 BytesIO로 저장
-    output = BytesIO()
-    doc.save(output)
-    output.seek(0)
-    return output
+    rows = []
+    for num_students in student_counts:
+        results = generate_benchmark_results(num_students, DEFAULT_CRITERIA)
+        for workers in worker_counts:
+            start = time.perf_counter()
+            with tempfile.TemporaryFile() as output_file:
+                create_all_reports_zip(results, DEFAULT_CRITERIA, evaluation_info, output_file, max_workers=workers)
+            seconds = time.perf_counter() - start
+            rows.append({
+                "students": num_students,
+                "workers": workers,
+                "seconds": seconds,
+                "reports_per_second": num_students / seconds if seconds > 0 else float('inf')
+            })
+    return rows
 
 def admin_mode():
     """관리자 모드 페이지"""
@@ -820,12 +2524,342 @@ def admin_mode():
                 st.success(f"✅ '{new_user_name}' ({new_user_id}) 사용자가 추가되었습니다!")
                 st.rerun()
     
+    st.markdown("---")
+    st.header("🗄️ 평가 결과 캐시")
+    
+    cache_stats = get_grading_cache_stats()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("캐시된 평가 결과", f"{cache_stats['entries']}개")
+    with col2:
+        st.metric("캐시 용량", f"{cache_stats['bytes'] / (1024 * 1024):.1f} MB / {GRADING_CACHE_MAX_BYTES / (1024 * 1024):.0f} MB")
+    
+    st.caption("동일한 에세이, 평가 기준, 모델 설정으로 다시 평가하면 캐시된 결과를 즉시 사용합니다.")
+    
+    if st.button("🧹 캐시 전체 삭제", use_container_width=True, key="purge_grading_cache"):
+        try:
+            deleted = purge_grading_cache()
+            st.success(f"✅ 캐시된 평가 결과 {deleted}개가 삭제되었습니다!")
+        except sqlite3.Error as e:
+            st.error(f"❌ 캐시 삭제 중 오류 발생: {str(e)}")
+    
+    st.markdown("---")
+    st.header("📚 참고 자료 라이브러리")
+    st.caption(f"'{REFERENCE_LIBRARY_DIR}' 폴더의 .txt/.pdf 파일(교재, 모범 에세이 등)을 색인으로 만들어 모든 에세이를 참고 자료와도 대조합니다. 파일을 추가하거나 바꾼 뒤에는 색인을 다시 만들어주세요.")
+    
+    reference_index = get_reference_index()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("폴더의 참고 자료", f"{len(list_reference_documents())}개")
+    with col2:
+        st.metric("색인된 참고 자료", f"{len(reference_index['manifest']['documents']) if reference_index else 0}개")
+    with col3:
+        st.metric("색인 지문 수", f"{reference_index['manifest']['fingerprints'] if reference_index else 0:,}개")
+    if reference_index:
+        st.caption(f"마지막 색인 생성: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(reference_index['manifest']['built_at']))}")
+    
+    if st.button("🔨 참고 자료 색인 만들기", use_container_width=True, key="build_reference_index"):
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        
+        def update_reference_progress(done: int, total: int, relative_path: str):
+            progress_bar.progress(done / total)
+            status_text.text(f"참고 자료 읽는 중: {relative_path} ({done}/{total})")
+        
+        try:
+            manifest = build_reference_index(update_reference_progress)
+            status_text.empty()
+            st.success(f"✅ 참고 자료 {len(manifest['documents'])}개로 색인을 만들었습니다! (지문 {manifest['fingerprints']:,}개)")
+        except OSError as e:
+            st.error(f"❌ 색인 생성 중 오류 발생: {str(e)}")
+    
+    st.markdown("---")
+    st.header("⏱️ 표절 검사 성능 비교")
+    st.caption("가상 에세이로 기존 전체 비교(SequenceMatcher) 방식과 MinHash LSH 방식의 검사 시간을 비교합니다. 기존 방식은 에세이 수의 제곱에 비례하여 느려지므로 수백 개 이상은 수 분이 걸릴 수 있습니다.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        benchmark_essays = st.number_input("에세이 수", min_value=10, max_value=2000, value=100, step=10, key="benchmark_num_essays")
+    with col2:
+        benchmark_chars = st.number_input("에세이 길이 (글자 수)", min_value=200, max_value=10000, value=1500, step=100, key="benchmark_essay_chars")
+    
+    if st.button("▶️ 성능 비교 실행", use_container_width=True, key="run_plagiarism_benchmark"):
+        with st.spinner("표절 검사 성능을 측정하는 중..."):
+            benchmark = benchmark_plagiarism_check(int(benchmark_essays), int(benchmark_chars))
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("기존 전체 비교", f"{benchmark['full_scan_seconds']:.2f}초")
+        with col2:
+            st.metric("MinHash LSH", f"{benchmark['lsh_seconds']:.2f}초")
+        with col3:
+            st.metric("속도 향상", f"{benchmark['speedup']:.1f}배")
+        st.info(
+            f"💡 표절(30% 초과) 판정: 기존 방식 {benchmark['flagged_full_scan']}건, "
+            f"LSH 방식 {benchmark['flagged_lsh']}건, 두 방식 모두 {benchmark['flagged_both']}건"
+        )
+        pruning_stats = benchmark['pruning_stats']
+        st.dataframe(pd.DataFrame([
+            {"단계": "기존 방식 비교 쌍", "쌍 수": benchmark['full_scan_pairs']},
+            {"단계": "LSH 후보 쌍", "쌍 수": pruning_stats['candidates']},
+            {"단계": "1단계 길이 비율 상한으로 제외", "쌍 수": pruning_stats['pruned_length']},
+            {"단계": "2단계 shingle Jaccard로 제외", "쌍 수": pruning_stats['pruned_jaccard']},
+            {"단계": "3단계 quick_ratio 상한으로 제외", "쌍 수": pruning_stats['pruned_quick']},
+            {"단계": "정확한 유사도 계산", "쌍 수": pruning_stats['exact']}
+        ]), use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+    st.header("📄 보고서 생성 성능 비교")
+    st.caption("가상 평가 결과로 전체 피드백 보고서 ZIP을 만들면서 프로세스 수에 따른 처리량을 측정합니다. 1,000명은 수 분이 걸릴 수 있습니다.")
+    
+    report_benchmark_counts = st.multiselect("학생 수", options=[50, 200, 1000], default=[50, 200], key="report_benchmark_counts")
+    if st.button("▶️ 보고서 생성 성능 측정", use_container_width=True, key="run_report_benchmark", disabled=not report_benchmark_counts):
+        with st.spinner("보고서 생성 성능을 측정하는 중..."):
+            report_benchmark = benchmark_report_rendering(sorted(report_benchmark_counts))
+        report_benchmark_df = pd.DataFrame(report_benchmark)
+        st.dataframe(report_benchmark_df.rename(columns={
+            "students": "학생 수",
+            "workers": "프로세스 수",
+            "seconds": "소요 시간 (초)",
+            "reports_per_second": "처리량 (보고서/초)"
+        }).round(2), use_container_width=True, hide_index=True)
+        st.line_chart(report_benchmark_df.pivot(index="workers", columns="students", values="reports_per_second"))
+    
     st.markdown("---")
     if st.button("← 메인으로 돌아가기", use_container_width=True):
         st.session_state.show_admin_mode = False
         st.rerun()
 
+def get_evaluation_info() -> Dict:
+    """피드백 보고서에 들어가는 평가 정보(년도, 학기, 과목명, 평가 제목)를 반환합니다."""
+    return {
+        'year': st.session_state.evaluation_year,
+        'semester': st.session_state.evaluation_semester,
+        'subject': st.session_state.evaluation_subject,
+        'title': st.session_state.evaluation_title
+    }
+
+def get_evaluation_label() -> str:
+    """평가 이름(평가 제목, 없으면 년도/학기/과목)을 반환합니다."""
+    if st.session_state.evaluation_title:
+        return st.session_state.evaluation_title
+    scope = " ".join(filter(None, [
+        st.session_state.evaluation_year,
+        st.session_state.evaluation_semester,
+        st.session_state.evaluation_subject
+    ]))
+    return scope or "제목 없는 평가"
+
+def get_fingerprint_scope(run_id: str) -> str:
+    """지문 저장소에서 에세이를 구분하는 평가 단위(로그인한 사용자, 평가 실행 ID, 평가 이름)를 반환합니다."""
+    return make_fingerprint_scope(st.session_state.logged_in_user, run_id, get_evaluation_label())
+
+def background_jobs_section():
+    """백그라운드 대기열에 등록한 평가 작업의 진행 상황과 결과 불러오기 화면"""
+    try:
+        background_jobs = list_background_jobs(st.session_state.logged_in_user)
+    except sqlite3.Error as e:
+        st.warning(f"⚠️ 백그라운드 평가 작업을 불러오지 못했습니다: {str(e)}")
+        return
+    if not background_jobs:
+        return
+    
+    has_pending_jobs = any(job['queue_status'] in ('queued', 'running') for job in background_jobs)
+    # 서버가 다시 시작된 경우에도 대기 중인 작업이 처리되도록 작업 스레드 시작 (이미 실행 중이면 그대로 사용)
+    if BACKGROUND_IN_PROCESS_WORKERS and OPENAI_API_KEY and has_pending_jobs:
+        start_background_workers(OPENAI_API_KEY)
+    
+    st.subheader("📨 백그라운드 평가 작업")
+    if has_pending_jobs and not BACKGROUND_IN_PROCESS_WORKERS:
+        st.caption("대기 중인 작업은 백그라운드 작업 프로세스(python grading_worker.py)가 처리합니다. 작업이 계속 대기 중이면 관리자에게 작업 프로세스 실행을 요청해주세요.")
+    if st.button("🔄 진행 상황 새로고침", key="refresh_background_jobs"):
+        st.rerun()
+    
+    for job in background_jobs:
+        created_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(job['created_at']))
+        finished_count = job['done_count'] + job['failed_count']
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            if job['queue_status'] == 'queued':
+                st.markdown(f"**{job['title']}** ({created_at}) — ⏳ 대기 중 (앞에 {job['queue_position']}개 작업)")
+            elif job['queue_status'] == 'running':
+                st.markdown(f"**{job['title']}** ({created_at}) — ⚙️ 평가 중 {finished_count}/{job['total_count']}")
+                st.progress(finished_count / job['total_count'])
+            elif job['queue_status'] == 'failed':
+                st.markdown(f"**{job['title']}** ({created_at}) — ❌ 완료 {job['done_count']}/{job['total_count']}개, 오류: {job['queue_error']}")
+            else:
+                failed_info = f", 실패 {job['failed_count']}개" if job['failed_count'] else ""
+                st.markdown(f"**{job['title']}** ({created_at}) — ✅ 완료 {job['done_count']}/{job['total_count']}개{failed_info}")
+        with col2:
+            if job['queue_status'] in ('finished', 'failed'):
+                if st.button("📥 결과 불러오기", key=f"load_background_job_{job['job_id']}", type="primary", use_container_width=True):
+                    load_job_into_session(job['job_id'])
+                    dismiss_background_job(job['job_id'])
+                    st.rerun()
+    
+    st.markdown("---")
+
+def unfinished_jobs_section():
+    """완료되지 않은 평가 작업(연결 끊김, 잔액 부족 등으로 중단)을 보여주고 이어서 평가하는 화면"""
+    try:
+        unfinished_jobs = list_unfinished_jobs(st.session_state.logged_in_user)
+    except sqlite3.Error as e:
+        st.warning(f"⚠️ 평가 작업 기록을 불러오지 못했습니다: {str(e)}")
+        return
+    if not unfinished_jobs:
+        return
+    
+    st.subheader("⏸️ 중단된 평가 작업")
+    st.caption("완료된 에세이의 결과는 저장되어 있습니다. 이어서 평가하면 남은 에세이만 다시 평가합니다.")
+    
+    for job in unfinished_jobs:
+        created_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(job['created_at']))
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            st.markdown(f"**{job['title']}** ({created_at}) — {job['done_count']}/{job['total_count']}개 완료")
+        with col2:
+            if st.button("▶️ 이어서 평가하기", key=f"resume_job_{job['job_id']}", type="primary", use_container_width=True):
+                if not OPENAI_API_KEY:
+                    st.error("⚠️ OpenAI API Key가 설정되지 않았습니다! .env 파일에 OPENAI_API_KEY를 설정해주세요.")
+                    return
+                saved_job = load_evaluation_job(job['job_id'])
+                # 작업에 저장된 에세이와 평가 기준으로 화면 상태 복원
+                st.session_state.extracted_texts = [
+                    {"filename": essay['filename'], "text": essay['text']}
+                    for essay in saved_job['essays']
+                ]
+                st.session_state.extraction_errors = []
+                st.session_state.evaluation_criteria = saved_job['criteria']
+                
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                
+                def update_progress(completed: int, total: int, filename: str):
+                    status_text.text(f"평가 완료: {filename} ({completed}/{total})")
+                    progress_bar.progress(completed / total)
+                
+                st.session_state.cohort_similarity = None
+                st.session_state.evaluation_results = run_evaluation_job(
+                    saved_job,
+                    OPENAI_API_KEY,
+                    st.session_state.evaluated_essays,
+                    max_in_flight=st.session_state.get('max_in_flight', MAX_CONCURRENT_EVALUATIONS),
+                    progress_callback=update_progress,
+                    lsh_index=st.session_state.plagiarism_index
+                )
+                st.session_state.evaluation_essays = list(st.session_state.extracted_texts)
+                st.session_state.last_cache_hits = sum(1 for result in st.session_state.evaluation_results if result.get('cached'))
+                st.session_state.collusion_groups = find_collusion_groups(st.session_state.evaluated_essays, st.session_state.plagiarism_index)
+                progress_bar.empty()
+                st.rerun()
+        with col3:
+            if st.button("🗑️ 작업 삭제", key=f"delete_job_{job['job_id']}", use_container_width=True):
+                delete_evaluation_job(job['job_id'])
+                st.rerun()
+    
+    st.markdown("---")
+
+def bulk_evaluation_section():
+    """대량 평가(Batch API) 제출, 진행 상황 확인, 결과 가져오기 화면"""
+    st.info("💡 대량 평가는 에세이 전체를 OpenAI Batch API로 한 번에 제출합니다. 비용이 저렴한 대신 결과가 나오기까지 최대 24시간이 걸릴 수 있습니다.")
+    
+    bulk_job = st.session_state.bulk_batch_job
+    
+    if not bulk_job:
+        if st.button("📦 대량 평가 제출", type="primary", use_container_width=True):
+            # 유효성 검사
+            if not st.session_state.evaluation_criteria:
+                st.error("⚠️ 평가 기준을 먼저 설정해주세요!")
+            elif not OPENAI_API_KEY:
+                st.error("⚠️ OpenAI API Key가 설정되지 않았습니다! .env 파일에 OPENAI_API_KEY를 설정해주세요.")
+            else:
+                try:
+                    with st.spinner("배치 파일을 업로드하는 중..."):
+                        batch_id = submit_grading_batch(
+                            st.session_state.extracted_texts,
+                            st.session_state.evaluation_criteria,
+                            OPENAI_API_KEY
+                        )
+                    # 결과를 가져올 때 제출 당시의 에세이와 평가 기준을 사용
+                    st.session_state.bulk_batch_job = {
+                        "batch_id": batch_id,
+                        "essays": list(st.session_state.extracted_texts),
+                        "criteria": copy.deepcopy(st.session_state.evaluation_criteria),
+                        "fingerprint_scope": get_fingerprint_scope(batch_id)
+                    }
+                    st.success(f"✅ {len(st.session_state.extracted_texts)}개의 에세이가 대량 평가로 제출되었습니다!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ 대량 평가 제출 중 오류 발생: {str(e)}")
+        return
+    
+    batch_id = bulk_job['batch_id']
+    status = get_batch_status_registry().get(batch_id, {})
+    batch_status = status.get('status', '확인 중')
+    total = status.get('total') or len(bulk_job['essays'])
+    done = status.get('completed', 0) + status.get('failed', 0)
+    
+    st.markdown(f"**배치 ID:** `{batch_id}`")
+    st.markdown(f"**상태:** {batch_status} ({done}/{total})")
+    st.progress(min(done / total, 1.0) if total else 0.0)
+    if status.get('failed'):
+        st.warning(f"⚠️ {status['failed']}개의 요청이 실패했습니다. 실패한 에세이는 0점으로 표시됩니다.")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if st.button("🔄 상태 새로고침", use_container_width=True, key="refresh_bulk_batch"):
+            try:
+                client = get_openai_client(OPENAI_API_KEY, OPENAI_BASE_URL)
+                record_batch_status(get_batch_status_registry(), client.batches.retrieve(batch_id))
+            except Exception as e:
+                st.error(f"❌ 배치 상태 조회 중 오류 발생: {str(e)}")
+            st.rerun()
+    
+    with col2:
+        if batch_status in BATCH_TERMINAL_STATUSES and status.get('output_file_id'):
+            if st.button("📥 결과 가져오기", type="primary", use_container_width=True, key="ingest_bulk_batch"):
+                try:
+                    with st.spinner("평가 결과를 가져오는 중..."):
+                        st.session_state.evaluation_results = ingest_grading_batch(
+                            batch_id,
+                            bulk_job['essays'],
+                            bulk_job['criteria'],
+                            OPENAI_API_KEY,
+                            st.session_state.evaluated_essays,
+                            st.session_state.plagiarism_index,
+                            bulk_job.get('fingerprint_scope') or get_fingerprint_scope(batch_id)
+                        )
+                    st.session_state.evaluation_essays = list(bulk_job['essays'])
+                    st.session_state.cohort_similarity = None
+                    st.session_state.bulk_batch_job = None
+                    st.session_state.last_cache_hits = 0
+                    st.session_state.collusion_groups = find_collusion_groups(st.session_state.evaluated_essays, st.session_state.plagiarism_index)
+                    st.success(f"✅ {len(st.session_state.evaluation_results)}개의 에세이 평가 결과를 가져왔습니다!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ 결과를 가져오는 중 오류 발생: {str(e)}")
+        elif batch_status not in BATCH_TERMINAL_STATUSES:
+            if st.button("⏹️ 배치 취소", use_container_width=True, key="cancel_bulk_batch"):
+                try:
+                    client = get_openai_client(OPENAI_API_KEY, OPENAI_BASE_URL)
+                    record_batch_status(get_batch_status_registry(), client.batches.cancel(batch_id))
+                except Exception as e:
+                    st.error(f"❌ 배치 취소 중 오류 발생: {str(e)}")
+                st.rerun()
+    
+    with col3:
+        if batch_status in BATCH_TERMINAL_STATUSES:
+            if st.button("🗑️ 배치 정보 지우기", use_container_width=True, key="clear_bulk_batch"):
+                st.session_state.bulk_batch_job = None
+                st.rerun()
+    
+    if batch_status in ("failed", "expired", "cancelled") and not status.get('output_file_id'):
+        st.error(f"❌ 배치가 '{batch_status}' 상태로 종료되어 가져올 결과가 없습니다.")
+
 def main():
+    # 이전 실행에서 남은 오래된 임시 파일 정리 (서버 프로세스마다 한 번)
+    cleanup_stale_spool_files()
+    
     # 관리자 모드 체크
     if st.session_state.get('show_admin_mode', False):
         admin_mode()
@@ -881,7 +2915,12 @@ def main():
             st.session_state.evaluation_criteria = DEFAULT_CRITERIA.copy()
             st.session_state.uploaded_pdfs = []
             st.session_state.extracted_texts = []
+            st.session_state.extraction_errors = []
             st.session_state.evaluation_results = []
+            st.session_state.evaluation_essays = []
+            st.session_state.cohort_similarity = None
+            st.session_state.student_reports = {}
+            discard_reports_zip()
             st.rerun()
         
         st.markdown("---")
@@ -910,7 +2949,6 @@ def main():
             
             if selected_template_name and selected_template_name != st.session_state.selected_template:
                 # 선택한 템플릿을 현재 평가 기준으로 복사
-                import copy
                 st.session_state.evaluation_criteria = copy.deepcopy(st.session_state.saved_criteria_templates[selected_template_name])
                 st.session_state.selected_template = selected_template_name
                 # 평가 제목도 업데이트
@@ -1173,7 +3211,6 @@ def main():
             with col2:
                 if st.button("💾 평가 기준 저장", key=save_key, use_container_width=True, type="primary"):
                     # 평가 기준을 딕셔너리 형태로 저장 (깊은 복사)
-                    import copy
                     st.session_state.saved_criteria_templates[st.session_state.evaluation_title] = copy.deepcopy(criteria_list)
                     # 파일에 저장
                     save_criteria_templates(st.session_state.saved_criteria_templates)
@@ -1199,30 +3236,37 @@ def main():
     )
     
     if uploaded_files:
-        st.session_state.uploaded_pdfs = uploaded_files
+        # 파일 객체는 업로더 위젯이 보관하므로 세션에는 파일명만 저장
+        st.session_state.uploaded_pdfs = [pdf_file.name for pdf_file in uploaded_files]
+        
+        # 세션당 업로드 용량 한도 확인
+        total_upload_bytes = sum(pdf_file.size for pdf_file in uploaded_files)
+        upload_over_limit = total_upload_bytes > SESSION_UPLOAD_LIMIT_BYTES
+        if upload_over_limit:
+            st.error(
+                f"⚠️ 업로드한 파일의 전체 용량({total_upload_bytes / (1024 * 1024):.1f} MB)이 "
+                f"세션당 한도({SESSION_UPLOAD_LIMIT_BYTES / (1024 * 1024):.0f} MB)를 초과했습니다. "
+                "파일을 나누어 업로드해주세요."
+            )
         
         # PDF 텍스트 추출
-        if st.button("📄 PDF 텍스트 추출하기", type="primary"):
+        if st.button("📄 PDF 텍스트 추출하기", type="primary", disabled=upload_over_limit):
             st.session_state.extracted_texts = []
+            st.session_state.extraction_errors = []
             
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            for idx, pdf_file in enumerate(uploaded_files):
-                status_text.text(f"처리 중: {pdf_file.name} ({idx+1}/{len(uploaded_files)})")
-                
-                text = extract_text_from_pdf(pdf_file)
-                
-                st.session_state.extracted_texts.append({
-                    "filename": pdf_file.name,
-                    "text": text
-                })
-                
-                progress_bar.progress((idx + 1) / len(uploaded_files))
+            def update_progress(completed: int, total: int, filename: str):
+                status_text.text(f"처리 완료: {filename} ({completed}/{total})")
+                progress_bar.progress(completed / total)
+            
+            # 여러 프로세스에서 동시에 추출 (결과 순서는 업로드 순서 유지)
+            store_extraction_results(extract_texts_in_parallel(uploaded_files, progress_callback=update_progress))
             
             status_text.text("✅ 모든 PDF 파일 처리가 완료되었습니다!")
             progress_bar.empty()
-            st.success(f"{len(uploaded_files)}개의 PDF 파일에서 텍스트를 추출했습니다.")
+            st.success(f"{len(st.session_state.extracted_texts)}개의 PDF 파일에서 텍스트를 추출했습니다.")
             
             # 텍스트 추출 완료 후 업로드된 PDF 리스트 삭제
             st.session_state.uploaded_pdfs = []
@@ -1231,14 +3275,69 @@ def main():
             # 텍스트 추출 완료 후 업로드된 PDF 리스트 삭제
             st.session_state.uploaded_pdfs = []
     
+    # ZIP 파일 일괄 업로드 (LMS에서 내보낸 제출물 압축 파일)
+    uploaded_zip = st.file_uploader(
+        "또는 에세이 PDF가 담긴 ZIP 파일을 업로드하세요",
+        type=['zip'],
+        accept_multiple_files=False,
+        help="LMS에서 내보낸 제출물 ZIP 파일을 그대로 업로드할 수 있습니다. 학생별 폴더에 들어 있는 PDF는 폴더 이름이 학생명으로 사용됩니다."
+    )
+    
+    if uploaded_zip:
+        try:
+            with zipfile.ZipFile(uploaded_zip) as zip_archive:
+                zip_members = list_zip_pdf_members(zip_archive)
+        except zipfile.BadZipFile:
+            zip_members = None
+            st.error("❌ 올바른 ZIP 파일이 아닙니다.")
+        
+        if zip_members is not None:
+            # 압축 해제 후 용량 기준으로 세션당 한도 확인
+            total_member_bytes = sum(info.file_size for info, _ in zip_members)
+            zip_over_limit = total_member_bytes > SESSION_UPLOAD_LIMIT_BYTES
+            st.info(f"💡 ZIP 파일에서 {len(zip_members)}개의 PDF 파일을 찾았습니다. ({total_member_bytes / (1024 * 1024):.1f} MB)")
+            if zip_over_limit:
+                st.error(
+                    f"⚠️ ZIP 안의 PDF 전체 용량이 세션당 한도({SESSION_UPLOAD_LIMIT_BYTES / (1024 * 1024):.0f} MB)를 초과했습니다. "
+                    "파일을 나누어 업로드해주세요."
+                )
+            
+            if st.button("🗜️ ZIP에서 텍스트 추출하기", type="primary", disabled=zip_over_limit or not zip_members):
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                
+                def update_zip_progress(completed: int, total: int, filename: str):
+                    status_text.text(f"처리 완료: {filename} ({completed}/{total})")
+                    progress_bar.progress(completed / total)
+                
+                store_extraction_results(extract_texts_from_zip(uploaded_zip, progress_callback=update_zip_progress))
+                
+                status_text.text("✅ 모든 PDF 파일 처리가 완료되었습니다!")
+                progress_bar.empty()
+                st.success(f"{len(st.session_state.extracted_texts)}개의 PDF 파일에서 텍스트를 추출했습니다.")
+                st.rerun()
+    
+    # 텍스트 추출에 실패한 파일 (빈 에세이로 평가되지 않도록 평가 대상에서 제외)
+    if st.session_state.extraction_errors:
+        st.error(f"❌ {len(st.session_state.extraction_errors)}개의 PDF 파일은 텍스트를 추출하지 못해 평가에서 제외되었습니다.")
+        for failed in st.session_state.extraction_errors:
+            st.caption(f"📄 {failed['filename']}: {failed['error']}")
+    
     st.markdown("---")
     
+    # 백그라운드 평가 작업 진행 상황
+    background_jobs_section()
+    
+    # 중단된 평가 작업 이어서 하기
+    unfinished_jobs_section()
+    
     # 4. 추출된 텍스트 미리보기
     if st.session_state.extracted_texts:
         st.header("4️⃣ 추출된 텍스트 미리보기")
         
         for idx, extracted in enumerate(st.session_state.extracted_texts):
-            with st.expander(f"📄 {extracted['filename']}", expanded=False):
+            page_info = f" ({extracted['page_count']}쪽)" if extracted.get('page_count') else ""
+            with st.expander(f"📄 {extracted['filename']}{page_info}", expanded=False):
                 if extracted['text']:
                     st.text_area(
                         "추출된 텍스트",
@@ -1255,67 +3354,100 @@ def main():
         # 5. 평가하기 버튼
         st.header("5️⃣ 평가 실행")
         
-        if st.button("🔍 평가하기", type="primary", use_container_width=True):
-            # 유효성 검사
-            if not st.session_state.evaluation_criteria:
-                st.error("⚠️ 평가 기준을 먼저 설정해주세요!")
-            elif not OPENAI_API_KEY:
-                st.error("⚠️ OpenAI API Key가 설정되지 않았습니다! .env 파일에 OPENAI_API_KEY를 설정해주세요.")
-            else:
-                # 평가 결과 초기화
-                st.session_state.evaluation_results = []
-                
-                # 진행 상황 표시
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                # 각 학생(PDF)별로 평가 결과 생성
-                for idx, extracted in enumerate(st.session_state.extracted_texts):
-                    status_text.text(f"평가 중: {extracted['filename']} ({idx+1}/{len(st.session_state.extracted_texts)})")
+        evaluation_mode = st.radio(
+            "평가 방식",
+            options=["실시간 평가", "대량 평가 (Batch API)"],
+            horizontal=True,
+            key="evaluation_mode",
+            help="대량 평가는 OpenAI Batch API로 처리되어 비용이 저렴하지만 결과가 나오기까지 시간이 걸립니다."
+        )
+        
+        if evaluation_mode == "대량 평가 (Batch API)":
+            bulk_evaluation_section()
+        else:
+            max_in_flight = st.number_input(
+                "동시 평가 개수",
+                min_value=1,
+                max_value=64,
+                value=max(1, min(MAX_CONCURRENT_EVALUATIONS, 64)),
+                step=1,
+                key="max_in_flight",
+                help="한 번에 동시에 진행할 AI 평가 요청 수입니다. 값이 클수록 빠르지만 API 사용량 제한에 걸릴 수 있습니다."
+            )
+            
+            if st.button("🔍 평가하기", type="primary", use_container_width=True):
+                # 유효성 검사
+                if not st.session_state.evaluation_criteria:
+                    st.error("⚠️ 평가 기준을 먼저 설정해주세요!")
+                elif not OPENAI_API_KEY:
+                    st.error("⚠️ OpenAI API Key가 설정되지 않았습니다! .env 파일에 OPENAI_API_KEY를 설정해주세요.")
+                else:
+                    # 평가 결과 초기화
+                    st.session_state.evaluation_results = []
+                    st.session_state.evaluation_essays = []
+                    st.session_state.cohort_similarity = None
+                    st.session_state.student_reports = {}
                     
-                    # 표절 검사를 포함한 평가 수행
-                    evaluation_result = evaluate_essay_with_plagiarism_check(
-                        extracted['text'],
-                        extracted['filename'],
+                    # 진행 상황 표시
+                    progress_bar = st.progress(0)
+                    status_text = st.empty()
+                    
+                    def update_progress(completed: int, total: int, filename: str):
+                        status_text.text(f"평가 완료: {filename} ({completed}/{total})")
+                        progress_bar.progress(completed / total)
+                    
+                    # 평가 작업으로 저장하여 중간에 중단되어도 이어서 평가할 수 있도록 함
+                    job_id = create_evaluation_job(
+                        st.session_state.extracted_texts,
                         st.session_state.evaluation_criteria,
+                        st.session_state.logged_in_user,
+                        st.session_state.evaluation_title or get_evaluation_label(),
+                        get_fingerprint_scope(uuid.uuid4().hex)
+                    )
+                    
+                    # 각 학생(PDF)별 평가를 동시에 수행 (결과 순서는 업로드 순서 유지)
+                    st.session_state.evaluation_results = run_evaluation_job(
+                        load_evaluation_job(job_id),
                         OPENAI_API_KEY,
-                        st.session_state.evaluated_essays
+                        st.session_state.evaluated_essays,
+                        max_in_flight=max_in_flight,
+                        progress_callback=update_progress,
+                        lsh_index=st.session_state.plagiarism_index
                     )
+                    st.session_state.evaluation_essays = list(st.session_state.extracted_texts)
                     
-                    if evaluation_result:
-                        result = {
-                            "filename": extracted['filename'],
-                            "scores": evaluation_result["scores"],
-                            "total_score": evaluation_result["total_score"],
-                            "feedback": evaluation_result["feedback"]
-                        }
-                        # 표절 검사 정보가 있으면 추가
-                        if 'plagiarism_check' in evaluation_result:
-                            result['plagiarism_check'] = evaluation_result['plagiarism_check']
-                        
-                        st.session_state.evaluation_results.append(result)
-                        
-                        # 평가 완료된 에세이를 저장 (표절 검사용)
-                        st.session_state.evaluated_essays.append({
-                            "filename": extracted['filename'],
-                            "text": extracted['text']
-                        })
-                    else:
-                        # 오류 발생 시 기본값
-                        result = {
-                            "filename": extracted['filename'],
-                            "scores": {criterion["name"]: 0.0 for criterion in st.session_state.evaluation_criteria},
-                            "total_score": 0.0,
-                            "feedback": "평가 중 오류가 발생했습니다."
-                        }
-                        st.session_state.evaluation_results.append(result)
+                    # 캐시 적중 수 기록 (재실행 후에도 표시)
+                    st.session_state.last_cache_hits = sum(1 for result in st.session_state.evaluation_results if result.get('cached'))
                     
-                    progress_bar.progress((idx + 1) / len(st.session_state.extracted_texts))
-                
-                status_text.text("✅ 모든 평가가 완료되었습니다!")
-                progress_bar.empty()
-                st.success(f"✅ {len(st.session_state.extracted_texts)}개의 에세이 평가가 완료되었습니다!")
-                st.rerun()
+                    # 서로 유사한 에세이 그룹 찾기
+                    st.session_state.collusion_groups = find_collusion_groups(st.session_state.evaluated_essays, st.session_state.plagiarism_index)
+                    
+                    status_text.text("✅ 모든 평가가 완료되었습니다!")
+                    progress_bar.empty()
+                    st.success(f"✅ {len(st.session_state.extracted_texts)}개의 에세이 평가가 완료되었습니다!")
+                    st.rerun()
+            
+            if st.button("📨 백그라운드로 평가 요청", use_container_width=True, help="서버에서 평가를 진행합니다. 브라우저를 닫아도 평가가 계속되며, 완료되면 '백그라운드 평가 작업'에서 결과를 불러올 수 있습니다."):
+                if not st.session_state.evaluation_criteria:
+                    st.error("⚠️ 평가 기준을 먼저 설정해주세요!")
+                elif not OPENAI_API_KEY:
+                    st.error("⚠️ OpenAI API Key가 설정되지 않았습니다! .env 파일에 OPENAI_API_KEY를 설정해주세요.")
+                else:
+                    job_id = create_evaluation_job(
+                        st.session_state.extracted_texts,
+                        st.session_state.evaluation_criteria,
+                        st.session_state.logged_in_user,
+                        st.session_state.evaluation_title or get_evaluation_label(),
+                        get_fingerprint_scope(uuid.uuid4().hex)
+                    )
+                    enqueue_evaluation_job(job_id, max_in_flight)
+                    if BACKGROUND_IN_PROCESS_WORKERS:
+                        start_background_workers(OPENAI_API_KEY)
+                    st.success(f"✅ {len(st.session_state.extracted_texts)}개의 에세이 평가를 백그라운드 대기열에 등록했습니다!")
+                    st.rerun()
+        
+        if st.session_state.evaluation_results and st.session_state.last_cache_hits:
+            st.caption(f"⚡ 최근 평가에서 {st.session_state.last_cache_hits}개의 결과를 캐시에서 즉시 불러왔습니다.")
         
         st.markdown("---")
         
@@ -1738,51 +3870,142 @@ def main():
             
             st.markdown("---")
             
-            # 학생별 상세 피드백
-            st.subheader("📝 학생별 상세 피드백")
+            # 공모 의심 그룹 (한 출처를 여러 학생이 함께 베낀 경우)
+            if st.session_state.collusion_groups:
+                st.markdown("### 👥 공모 의심 그룹")
+                st.caption("유사도 30%를 넘는 에세이끼리 연결하여 묶은 그룹입니다. 서로 직접 비교되지 않은 학생도 같은 그룹에 포함될 수 있습니다.")
+                st.dataframe(pd.DataFrame([
+                    {
+                        "그룹": f"그룹 {group_idx}",
+                        "인원": group['size'],
+                        "학생": ", ".join(member.replace('.pdf', '') for member in group['members']),
+                        "유사 쌍 수": group['pair_count'],
+                        "평균 유사도 (%)": round(group['mean_similarity'] * 100, 1),
+                        "최대 유사도 (%)": round(group['max_similarity'] * 100, 1)
+                    }
+                    for group_idx, group in enumerate(st.session_state.collusion_groups, 1)
+                ]), use_container_width=True, hide_index=True)
+                st.markdown("---")
             
-            # 일괄 다운로드 버튼 (상단에 배치)
-            st.markdown("### 📥 피드백 보고서 다운로드")
+            # 전체 학생 간 표절 대조 (평가 순서와 관계없이 모든 에세이 쌍을 비교)
+            st.markdown("### 🔎 전체 학생 간 표절 대조")
+            st.caption("실시간 평가는 먼저 평가된 에세이와만 비교합니다. 여기서는 이번 평가의 모든 에세이 쌍을 한 번에 비교해 결과에 반영합니다.")
             
-            def create_all_reports_zip():
-                """모든 학생의 피드백 보고서를 ZIP 파일로 생성합니다."""
-                zip_buffer = BytesIO()
+            # 이번 평가의 에세이만 결과와 같은 순서로 대조 (파일명이 같은 에세이도 따로 비교)
+            cohort_essays = st.session_state.evaluation_essays
+            if len(cohort_essays) != len(st.session_state.evaluation_results):
+                cohort_essays = []
+            if st.button("🔎 전체 학생 간 표절 대조 실행", use_container_width=True, disabled=len(cohort_essays) < 2):
+                with st.spinner("모든 에세이 쌍의 유사도를 계산 중..."):
+                    cohort_results, cohort_matrix = check_cohort_plagiarism([prepare_essay_features(essay) for essay in cohort_essays])
                 
-                evaluation_info = {
-                    'year': st.session_state.evaluation_year,
-                    'semester': st.session_state.evaluation_semester,
-                    'subject': st.session_state.evaluation_subject,
-                    'title': st.session_state.evaluation_title
-                }
+                updated_count = 0
+                for result, cohort_result in zip(st.session_state.evaluation_results, cohort_results):
+                    previous_result = result.get('plagiarism_check')
+                    # 이전 평가 지문 검사 등으로 이미 더 높은 유사도가 나온 경우는 그대로 유지
+                    if previous_result is None:
+                        continue
+                    if cohort_result['max_similarity'] <= previous_result['max_similarity']:
+                        continue
+                    merged_result = dict(previous_result)
+                    merged_result.update(cohort_result)
+                    reapply_plagiarism_check(result, merged_result, st.session_state.evaluation_criteria)
+                    updated_count += 1
                 
-                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                    for result in st.session_state.evaluation_results:
-                        student_name = result['filename'].replace('.pdf', '').replace('.PDF', '')
-                        report = create_feedback_report(result, st.session_state.evaluation_criteria, evaluation_info)
-                        zip_file.writestr(f"{student_name}_피드백보고서.docx", report.getvalue())
+                st.session_state.cohort_similarity = {
+                    "filenames": [essay['filename'] for essay in cohort_essays],
+                    "matrix": cohort_matrix
+                }
+                st.success(f"✅ {len(cohort_results)}편을 서로 대조했습니다. 표절 검사 결과가 갱신된 학생: {updated_count}명")
+            
+            if st.session_state.cohort_similarity is not None:
+                # 파일명이 같은 에세이는 순번을 붙여 행렬에서 구분
+                cohort_names = []
+                name_counts = {}
+                for filename in st.session_state.cohort_similarity['filenames']:
+                    name = filename.replace('.pdf', '')
+                    name_counts[name] = name_counts.get(name, 0) + 1
+                    cohort_names.append(name if name_counts[name] == 1 else f"{name} ({name_counts[name]})")
+                cohort_df = pd.DataFrame(
+                    np.round(st.session_state.cohort_similarity['matrix'] * 100, 1),
+                    index=cohort_names,
+                    columns=cohort_names
+                )
                 
-                zip_buffer.seek(0)
-                return zip_buffer.getvalue()
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        label="📥 유사도 행렬 CSV 다운로드",
+                        data=cohort_df.to_csv().encode('utf-8-sig'),
+                        file_name=f"표절대조_유사도행렬_{st.session_state.evaluation_title or '평가'}.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
+                with col2:
+                    if len(cohort_names) <= COHORT_HEATMAP_MAX_ESSAYS:
+                        fig, ax = plt.subplots(figsize=(max(6, len(cohort_names) * 0.35), max(5, len(cohort_names) * 0.3)))
+                        sns.heatmap(cohort_df, cmap="Reds", vmin=0, vmax=100, ax=ax, cbar_kws={'label': 'shingle 유사도 (%)'})
+                        ax.set_title('학생 간 에세이 유사도', fontsize=14, fontweight='bold')
+                        plt.tight_layout()
+                        heatmap_buffer = BytesIO()
+                        fig.savefig(heatmap_buffer, format='png', dpi=150)
+                        plt.close(fig)
+                        st.download_button(
+                            label="📥 유사도 히트맵 다운로드",
+                            data=heatmap_buffer.getvalue(),
+                            file_name=f"표절대조_히트맵_{st.session_state.evaluation_title or '평가'}.png",
+                            mime="image/png",
+                            use_container_width=True
+                        )
+                    else:
+                        st.info(f"💡 {COHORT_HEATMAP_MAX_ESSAYS}명을 넘으면 히트맵 대신 CSV로 확인해주세요.")
+                st.caption("행렬 값은 5글자 단위 shingle Jaccard 유사도(%)입니다. 점수 반영에는 상위 후보 쌍의 정밀 유사도를 사용합니다.")
+            
+            st.markdown("---")
             
-            # 일괄 다운로드 버튼
-            all_reports_zip = create_all_reports_zip()
+            # 학생별 상세 피드백
+            st.subheader("📝 학생별 상세 피드백")
+            
+            # 일괄 다운로드 버튼 (상단에 배치)
+            st.markdown("### 📥 피드백 보고서 다운로드")
+            
+            # 일괄 다운로드 버튼 (ZIP은 요청할 때만 만들고, 결과/기준/평가 정보가 바뀔 때까지 재사용)
+            reports_zip_key = make_reports_cache_key(st.session_state.evaluation_results, st.session_state.evaluation_criteria, get_evaluation_info())
             zip_filename = f"전체_피드백보고서_{st.session_state.evaluation_year or 'N/A'}_{st.session_state.evaluation_semester or 'N/A'}.zip"
             
             st.info(f"💡 전체 {len(st.session_state.evaluation_results)}명의 피드백 보고서를 한 번에 다운로드할 수 있습니다.")
             
-            st.download_button(
-                label=f"📦 전체 피드백 보고서 일괄 다운로드 (ZIP) - {len(st.session_state.evaluation_results)}개 파일",
-                data=all_reports_zip,
-                file_name=zip_filename,
-                mime="application/zip",
-                use_container_width=True,
-                type="primary"
-            )
+            reports_zip = st.session_state.reports_zip
+            if reports_zip is None or reports_zip['key'] != reports_zip_key or not os.path.exists(reports_zip['path']):
+                if st.button(f"📦 전체 피드백 보고서 ZIP 만들기 - {len(st.session_state.evaluation_results)}개 파일", use_container_width=True, key="build_reports_zip"):
+                    with st.spinner("피드백 보고서를 만드는 중..."):
+                        discard_reports_zip()
+                        st.session_state.reports_zip = {
+                            "key": reports_zip_key,
+                            "path": build_reports_zip_file(st.session_state.evaluation_results, st.session_state.evaluation_criteria, get_evaluation_info())
+                        }
+                    st.rerun()
+            else:
+                reports_zip_path = reports_zip['path']
+                
+                def read_reports_zip() -> bytes:
+                    # 다운로드 버튼을 누를 때만 ZIP 파일을 읽음 (다시 실행될 때마다 읽지 않음)
+                    with open(reports_zip_path, 'rb') as zip_file:
+                        return zip_file.read()
+                
+                st.download_button(
+                    label=f"📦 전체 피드백 보고서 일괄 다운로드 (ZIP) - {len(st.session_state.evaluation_results)}개 파일",
+                    data=read_reports_zip,
+                    file_name=zip_filename,
+                    mime="application/zip",
+                    use_container_width=True,
+                    type="primary"
+                )
             
             st.markdown("---")
             st.markdown("### 👤 개별 피드백 보고서")
             
-            for result in st.session_state.evaluation_results:
+            for result_idx, result in enumerate(st.session_state.evaluation_results):
                 # 파일명에서 확장자 제거
                 student_name = result["filename"].replace(".pdf", "").replace(".PDF", "")
                 
@@ -1875,28 +4098,51 @@ def main():
                         st.markdown(f"**{parsed_feedback['general']}**")
                         st.markdown("---")
                     
+                    # 표절 의심 구간 강조 표시
+                    shared_passages = result.get('plagiarism_check', {}).get('shared_passages', [])
+                    if shared_passages:
+                        st.markdown("#### 🔍 표절 의심 구간")
+                        st.caption(f"다른 에세이와 공백 제외 {PASSAGE_MIN_LENGTH}글자 이상 그대로 겹치는 구간 {len(shared_passages)}곳을 강조했습니다.")
+                        if len(st.session_state.evaluation_essays) == len(st.session_state.evaluation_results):
+                            essay_text = st.session_state.evaluation_essays[result_idx]['text']
+                        else:
+                            essay_text = next((essay['text'] for essay in st.session_state.evaluated_essays if essay['filename'] == result['filename']), None)
+                        if essay_text is not None:
+                            st.markdown(
+                                f"<div style='max-height: 400px; overflow-y: auto; padding: 0.5rem; border: 1px solid #ddd;'>{highlight_shared_passages_html(essay_text, shared_passages)}</div>",
+                                unsafe_allow_html=True
+                            )
+                        else:
+                            for passage in shared_passages:
+                                st.markdown(f"- **{passage['source']}**: {passage['text']}")
+                        st.markdown("---")
+                    
                     # 개별 다운로드 버튼
                     st.markdown("---")
                     st.markdown("#### 📄 개별 보고서 다운로드")
                     
-                    evaluation_info = {
-                        'year': st.session_state.evaluation_year,
-                        'semester': st.session_state.evaluation_semester,
-                        'subject': st.session_state.evaluation_subject,
-                        'title': st.session_state.evaluation_title
-                    }
-                    
-                    report_file = create_feedback_report(result, st.session_state.evaluation_criteria, evaluation_info)
+                    # 보고서는 요청할 때만 만들고, 이 학생의 결과/기준/평가 정보가 바뀔 때까지 재사용
+                    report_key = make_reports_cache_key([result], st.session_state.evaluation_criteria, get_evaluation_info())
+                    cached_report = st.session_state.student_reports.get(result_idx)
                     report_filename = f"{student_name}_피드백보고서.docx"
                     
-                    st.download_button(
-                        label=f"📥 {student_name} 피드백 보고서 다운로드",
-                        data=report_file.getvalue(),
-                        file_name=report_filename,
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                        key=f"download_{result['filename']}",
-                        use_container_width=True
-                    )
+                    if cached_report is None or cached_report['key'] != report_key:
+                        if st.button(f"📄 {student_name} 피드백 보고서 만들기", key=f"build_report_{result_idx}", use_container_width=True):
+                            with st.spinner("피드백 보고서를 만드는 중..."):
+                                st.session_state.student_reports[result_idx] = {
+                                    "key": report_key,
+                                    "data": create_feedback_report(result, st.session_state.evaluation_criteria, get_evaluation_info()).getvalue()
+                                }
+                            st.rerun()
+                    else:
+                        st.download_button(
+                            label=f"📥 {student_name} 피드백 보고서 다운로드",
+                            data=cached_report['data'],
+                            file_name=report_filename,
+                            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                            key=f"download_{result_idx}",
+                            use_container_width=True
+                        )
             
             st.markdown("---")
             
@@ -0,0 +1,360 @@
+"""학생별 피드백 보고서(DOCX) 생성
+
+보고서 뼈대 캐시(load_report_template)는 이 모듈에 두어, Streamlit이 app.py를 다시 실행할 때마다
+새로 만들어지지 않고 서버 프로세스가 살아 있는 동안 유지되도록 합니다.
+보고서 생성 프로세스 풀에 넘기는 작업(render_report_worker)도 이 모듈에 두어, 다시 실행될 때마다
+바뀌는 __main__이 아닌 항상 같은 이름으로 전달되도록 합니다.
+"""
+import copy
+import json
+import re
+import threading
+from functools import lru_cache
+from io import BytesIO
+from typing import List, Dict
+
+from docx import Document
+from docx.shared import Inches
+from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_COLOR_INDEX
+
+def parse_feedback(feedback_text: str, criteria: List[Dict]) -> Dict:
+    """피드백 텍스트를 파싱하여 구조화된 데이터로 변환합니다."""
+    feedback_lines = feedback_text.split('\n')
+    feedback_data = {}
+    general_feedback = []
+    
+    current_item = None
+    current_content = []
+    
+    for line in feedback_lines:
+        line = line.strip()
+        if not line:
+            continue
+        
+        # 항목명 패턴 찾기: "[항목명] (점수/최고점):" 형식
+        item_pattern = r'\[([^\]]+)\]\s*\(([^)]+)\)\s*:\s*(.+)'
+        match = re.match(item_pattern, line)
+        
+        if match:
+            # 이전 항목 저장
+            if current_item:
+                feedback_data[current_item] = '\n'.join(current_content)
+            
+            # 새 항목 시작
+            current_item = match.group(1)
+            score_info = match.group(2)
+            initial_content = match.group(3)
+            current_content = [initial_content] if initial_content else []
+        elif '종합' in line or '전체적으로' in line or '전체' in line:
+            # 이전 항목 저장
+            if current_item:
+                feedback_data[current_item] = '\n'.join(current_content)
+                current_item = None
+                current_content = []
+            general_feedback.append(line)
+        elif current_item:
+            # 현재 항목의 내용 추가
+            current_content.append(line)
+        else:
+            # 항목명 패턴이 없으면 종합 평가로 처리
+            if feedback_data:
+                general_feedback.append(line)
+    
+    # 마지막 항목 저장
+    if current_item:
+        feedback_data[current_item] = '\n'.join(current_content)
+    
+    # 각 항목별로 잘 작성한 점과 개선할 점 추출
+    structured_feedback = {}
+    for criterion in criteria:
+        criterion_name = criterion['name']
+        item_feedback = feedback_data.get(criterion_name, "")
+        
+        # ✨ 잘 작성한 점 추출
+        good_points = []
+        # ⚠️ 개선할 점 및 오류 추출
+        improvement_points = []
+        # 일반 평가 내용
+        general_item_feedback = []
+        
+        if item_feedback:
+            lines = item_feedback.split('\n')
+            current_section = None
+            good_section_started = False
+            improvement_section_started = False
+            seen_good_points = set()  # 중복 방지용
+            seen_improvement_points = set()  # 중복 방지용
+            
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                
+                # ✨ 잘 작성한 점 섹션 시작 감지
+                is_good_section_start = ('✨' in line or ('잘 작성한 점' in line and (':' in line or '：' in line)))
+                # ⚠️ 개선할 점 및 오류 섹션 시작 감지
+                is_improvement_section_start = ('⚠️' in line or (('개선할 점' in line or '오류' in line) and (':' in line or '：' in line)))
+                
+                # ✨ 잘 작성한 점 섹션 시작
+                if is_good_section_start:
+                    # 이미 good 섹션이 시작되었으면 이 줄은 무시 (중복 헤더 방지)
+                    if good_section_started:
+                        continue
+                    # 새 섹션 시작
+                    current_section = 'good'
+                    good_section_started = True
+                    improvement_section_started = False  # 다른 섹션 종료
+                    # ✨ 또는 "잘 작성한 점:" 제거
+                    clean_line = re.sub(r'^[✨\s]*잘\s*작성한\s*점\s*[:：]\s*', '', line, flags=re.IGNORECASE)
+                    clean_line = clean_line.replace('✨', '').strip()
+                    if clean_line and clean_line not in seen_good_points:
+                        good_points.append(clean_line)
+                        seen_good_points.add(clean_line)
+                # ⚠️ 개선할 점 및 오류 섹션 시작
+                elif is_improvement_section_start:
+                    # 이미 improvement 섹션이 시작되었으면 이 줄은 무시 (중복 헤더 방지)
+                    if improvement_section_started:
+                        continue
+                    # 새 섹션 시작
+                    current_section = 'improvement'
+                    improvement_section_started = True
+                    good_section_started = False  # 다른 섹션 종료
+                    # ⚠️ 또는 "개선할 점 및 오류:" 제거
+                    clean_line = re.sub(r'^[⚠️\s]*개선할\s*점\s*(및\s*오류)?\s*[:：]\s*', '', line, flags=re.IGNORECASE)
+                    clean_line = clean_line.replace('⚠️', '').strip()
+                    if clean_line and clean_line not in seen_improvement_points:
+                        improvement_points.append(clean_line)
+                        seen_improvement_points.add(clean_line)
+                # 현재 섹션에 내용 추가
+                elif current_section == 'good' and good_section_started:
+                    # 다른 섹션 시작 신호가 아니고, 중복이 아닌 경우만 추가
+                    if line and not is_improvement_section_start and line not in seen_good_points:
+                        good_points.append(line)
+                        seen_good_points.add(line)
+                elif current_section == 'improvement' and improvement_section_started:
+                    # 다른 섹션 시작 신호가 아니고, 중복이 아닌 경우만 추가
+                    if line and not is_good_section_start and line not in seen_improvement_points:
+                        improvement_points.append(line)
+                        seen_improvement_points.add(line)
+                # 일반 평가 내용 (섹션 시작 전 또는 섹션 외)
+                elif line and not is_good_section_start and not is_improvement_section_start:
+                    # 중복 제거
+                    if line not in general_item_feedback:
+                        general_item_feedback.append(line)
+        
+        structured_feedback[criterion_name] = {
+            'summary': '\n'.join(general_item_feedback) if general_item_feedback else item_feedback,
+            'good_points': '\n'.join(good_points) if good_points else '',
+            'improvement_points': '\n'.join(improvement_points) if improvement_points else ''
+        }
+    
+    return {
+        'items': structured_feedback,
+        'general': '\n'.join(general_feedback) if general_feedback else ''
+    }
+
+class FeedbackReportTemplate:
+    """평가 기준과 평가 정보가 같은 피드백 보고서들이 함께 쓰는 뼈대 문서입니다.
+
+    페이지 설정, 제목, 평가 정보, 표 머리글처럼 학생마다 같은 부분은 한 번만 만들어 두고,
+    학생별 보고서는 뼈대 XML을 복제한 뒤 학생명, 점수, 피드백 칸만 채워서 만듭니다.
+    """
+
+    def __init__(self, criteria: List[Dict], evaluation_info: Dict):
+        self.criteria = criteria
+        # 같은 문서 객체를 다시 쓰므로 여러 스레드에서 동시에 채우지 않도록 함
+        self.lock = threading.Lock()
+        
+        doc = Document()
+        
+        # 페이지 방향을 가로(landscape)로 설정
+        section = doc.sections[0]
+        # A4 가로: 너비 11.69인치, 높이 8.27인치
+        section.page_height = Inches(8.27)
+        section.page_width = Inches(11.69)
+        
+        # 제목
+        title = doc.add_heading('에세이 평가 보고서', 0)
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        
+        # 평가 정보
+        doc.add_heading('평가 정보', level=1)
+        info_para = doc.add_paragraph()
+        if evaluation_info.get('year'):
+            info_para.add_run(f"평가 년도: {evaluation_info['year']}\n").bold = True
+        if evaluation_info.get('semester'):
+            info_para.add_run(f"학기: {evaluation_info['semester']}\n").bold = True
+        if evaluation_info.get('subject'):
+            info_para.add_run(f"과목명: {evaluation_info['subject']}\n").bold = True
+        if evaluation_info.get('title'):
+            info_para.add_run(f"평가 제목: {evaluation_info['title']}\n").bold = True
+        
+        # 학생 정보 (학생명은 보고서마다 채움)
+        doc.add_heading('학생 정보', level=1)
+        student_para = doc.add_paragraph()
+        student_para.add_run().bold = True
+        self.student_paragraph_index = len(doc.paragraphs) - 1
+        
+        # 점수 요약 (가로형 표)
+        doc.add_heading('점수 요약', level=1)
+        
+        # 점수 테이블 생성 (가로형: 헤더 행 + 데이터 행)
+        table = doc.add_table(rows=2, cols=len(criteria) + 2)  # 평가 기준 열들 + 점수 열 + 총점 열
+        table.style = 'Light Grid Accent 1'
+        
+        # 첫 번째 행: 헤더
+        header_cells = table.rows[0].cells
+        header_cells[0].text = '평가 기준'
+        for idx, criterion in enumerate(criteria, 1):
+            header_cells[idx].text = criterion['name']
+        header_cells[-1].text = '총점'
+        
+        # 헤더 셀 굵게 표시
+        for cell in header_cells:
+            for paragraph in cell.paragraphs:
+                for run in paragraph.runs:
+                    run.font.bold = True
+        
+        # 두 번째 행: 점수 데이터 (점수 칸은 보고서마다 채움)
+        data_cells = table.rows[1].cells
+        data_cells[0].text = '점수'
+        data_cells[0].paragraphs[0].runs[0].font.bold = True
+        
+        # 상세 피드백
+        doc.add_heading('상세 피드백', level=1)
+        
+        # 헤더 + 기준 행 + 종합의견 행 (종합의견이 없는 보고서는 마지막 행을 지움)
+        feedback_table = doc.add_table(rows=len(criteria) + 2, cols=2)
+        feedback_table.style = 'Light Grid Accent 1'
+        
+        # 열 너비 설정 (평가 기준: 더 줄임, 상세 피드백: 넓게)
+        feedback_table.columns[0].width = Inches(0.75)  # 평가 기준 열 (절반으로 줄임)
+        feedback_table.columns[1].width = Inches(10.94)  # 상세 피드백 열 (넓게)
+        
+        # 헤더
+        header_cells = feedback_table.rows[0].cells
+        header_cells[0].text = '평가 기준'
+        header_cells[1].text = '상세 피드백'
+        for cell in header_cells:
+            for paragraph in cell.paragraphs:
+                for run in paragraph.runs:
+                    run.font.bold = True
+        
+        for row_idx, criterion in enumerate(criteria, 1):
+            feedback_table.rows[row_idx].cells[0].text = criterion['name']
+        
+        # 종합의견 셀을 굵게 표시
+        general_cells = feedback_table.rows[-1].cells
+        general_cells[0].text = '종합의견'
+        for paragraph in general_cells[0].paragraphs:
+            for run in paragraph.runs:
+                run.font.bold = True
+        
+        self.document = doc
+        self.skeleton = [copy.deepcopy(child) for child in doc.element.body]
+
+    def render(self, result: Dict) -> BytesIO:
+        """뼈대 문서를 복제해 한 학생의 피드백 보고서를 만듭니다."""
+        criteria = self.criteria
+        parsed_feedback = parse_feedback(result['feedback'], criteria)
+        output = BytesIO()
+        
+        with self.lock:
+            doc = self.document
+            # 본문 요소만 뼈대로 바꿔 끼움 (스타일, 설정 등 나머지 문서 구성은 그대로 재사용)
+            body = doc.element.body
+            for child in list(body):
+                body.remove(child)
+            for child in self.skeleton:
+                body.append(copy.deepcopy(child))
+            
+            # 학생 정보
+            student_name = result['filename'].replace('.pdf', '').replace('.PDF', '')
+            doc.paragraphs[self.student_paragraph_index].runs[0].text = f"학생명: {student_name}\n"
+            
+            score_table, feedback_table = doc.tables
+            
+            # 각 평가 기준별 점수 (가중치 반영)
+            data_cells = score_table.rows[1].cells
+            total_score = 0.0
+            total_max = 0.0
+            for idx, criterion in enumerate(criteria, 1):
+                score = result['scores'].get(criterion['name'], 0.0)
+                weight = criterion.get('weight', 1.0)
+                data_cells[idx].text = f"{score:.1f} / {criterion['max_score']:.1f}"
+                total_score += score * weight
+                total_max += criterion['max_score'] * weight
+            
+            # 총점
+            data_cells[-1].text = f"{total_score:.1f} / {total_max:.1f}"
+            data_cells[-1].paragraphs[0].runs[0].font.bold = True
+            
+            # 각 평가 기준별 피드백 추가
+            for row_idx, criterion in enumerate(criteria, 1):
+                # 해당 기준에 대한 구조화된 피드백 가져오기
+                item_feedback = parsed_feedback['items'].get(criterion['name'], {})
+                summary = item_feedback.get('summary', '')
+                good_points = item_feedback.get('good_points', '')
+                improvement_points = item_feedback.get('improvement_points', '')
+                
+                # 피드백 내용 구성
+                feedback_content = []
+                if summary:
+                    feedback_content.append(f"【평가 요약】\n{summary}")
+                if good_points:
+                    feedback_content.append(f"\n✨ 잘 작성한 점:\n{good_points}")
+                if improvement_points:
+                    feedback_content.append(f"\n⚠️ 개선할 점 및 오류:\n{improvement_points}")
+                
+                feedback_table.rows[row_idx].cells[1].text = '\n'.join(feedback_content) if feedback_content else "피드백 없음"
+            
+            # 종합의견 행
+            general_row = feedback_table.rows[-1]
+            if parsed_feedback['general']:
+                general_cell = general_row.cells[1]
+                general_cell.text = parsed_feedback['general']
+                # 종합의견 내용도 굵게 표시
+                for paragraph in general_cell.paragraphs:
+                    for run in paragraph.runs:
+                        run.font.bold = True
+            else:
+                feedback_table._tbl.remove(general_row._tr)
+            
+            # 표절 의심 구간 (다른 에세이와 그대로 겹치는 문장)
+            shared_passages = result.get('plagiarism_check', {}).get('shared_passages', [])
+            if shared_passages:
+                doc.add_heading('표절 의심 구간', level=1)
+                for passage in shared_passages:
+                    passage_para = doc.add_paragraph()
+                    passage_para.add_run(f"[유사 에세이: {passage['source']}] ").bold = True
+                    passage_para.add_run(passage['text']).font.highlight_color = WD_COLOR_INDEX.YELLOW
+            
+            # 문서를 BytesIO로 저장
+            doc.save(output)
+        
+        output.seek(0)
+        return output
+
+@lru_cache(maxsize=8)
+def load_report_template(template_key: str) -> FeedbackReportTemplate:
+    """캐시 키(평가 기준 + 평가 정보 JSON)에 해당하는 보고서 뼈대를 프로세스마다 한 번만 만듭니다."""
+    payload = json.loads(template_key)
+    return FeedbackReportTemplate(payload['criteria'], payload['info'])
+
+def get_report_template(criteria: List[Dict], evaluation_info: Dict) -> FeedbackReportTemplate:
+    """평가 기준과 평가 정보가 같은 보고서들이 공유하는 뼈대 문서를 반환합니다."""
+    template_key = json.dumps(
+        {"criteria": criteria, "info": evaluation_info},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str
+    )
+    return load_report_template(template_key)
+
+def create_feedback_report(result: Dict, criteria: List[Dict], evaluation_info: Dict) -> BytesIO:
+    """학생별 피드백 보고서를 Word 문서로 생성합니다."""
+    return get_report_template(criteria, evaluation_info).render(result)
+
+def render_report_worker(result: Dict, criteria: List[Dict], evaluation_info: Dict) -> bytes:
+    """프로세스 풀에서 실행되는 피드백 보고서(DOCX) 생성 작업입니다."""
+    return create_feedback_report(result, criteria, evaluation_info).getvalue()
@@ -0,0 +1,45 @@
+"""백그라운드 평가 작업 프로세스
+
+Streamlit 서버와 별도로 실행되어 평가 작업 대기열(EVALUATION_JOB_STORE_FILE)의 작업을 처리합니다.
+서버는 작업을 대기열에 넣기만 하므로, 서버가 다시 시작되거나 세션이 끊겨도 평가가 계속됩니다.
+서버와 같은 환경 변수(.env)와 작업 디렉터리에서 실행해야 같은 대기열과 캐시를 사용합니다.
+
+    python grading_worker.py [--workers N]
+"""
+import argparse
+import logging
+import threading
+
+from streamlit.logger import get_logger
+
+# app.py를 화면 없이(streamlit run 없이) 불러올 때 나오는 세션 관련 경고는 작업 프로세스에서 의미가 없으므로 숨김
+for logger_name in ("streamlit.runtime.scriptrunner_utils.script_run_context", "streamlit.runtime.state.session_state_proxy"):
+    get_logger(logger_name).setLevel(logging.ERROR)
+
+import app
+
+def main():
+    parser = argparse.ArgumentParser(description="평가 작업 대기열을 처리하는 백그라운드 작업 프로세스")
+    parser.add_argument("--workers", type=int, default=app.BACKGROUND_WORKER_COUNT,
+                        help="동시에 처리하는 작업 수 (기본값: BACKGROUND_WORKER_COUNT)")
+    args = parser.parse_args()
+
+    if not app.OPENAI_API_KEY:
+        raise SystemExit("OPENAI_API_KEY가 설정되지 않았습니다. .env 파일에 OPENAI_API_KEY를 설정해주세요.")
+
+    workers = []
+    for worker_idx in range(max(1, args.workers)):
+        worker = threading.Thread(target=app.run_background_worker, args=(app.OPENAI_API_KEY,), name=f"grading-worker-{worker_idx}", daemon=True)
+        worker.start()
+        workers.append(worker)
+    print(f"평가 작업 프로세스 시작: 작업 스레드 {len(workers)}개, 대기열 {app.EVALUATION_JOB_STORE_FILE}")
+
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        # 처리 중이던 작업은 임대가 만료되면 다른 작업 프로세스(또는 다시 시작한 이 프로세스)가 이어서 처리
+        pass
+
+if __name__ == "__main__":
+    main()
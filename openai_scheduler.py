@@ -0,0 +1,161 @@
+"""OpenAI 요청 사용량 한도 관리 (분당 요청/토큰 수 토큰 버킷, 429 백오프, 잔액 부족 감지)
+
+Streamlit 화면과 관계없이 OpenAI 클라이언트만으로 동작하므로, 가짜 엔드포인트에 연결해 시험할 수 있습니다.
+"""
+import random
+import re
+import threading
+import time
+from typing import List, Dict, Optional
+
+from openai import OpenAI, RateLimitError, APITimeoutError, APIConnectionError, InternalServerError
+
+class QuotaExceededError(Exception):
+    """OpenAI 계정 잔액 부족(insufficient_quota)으로 더 이상 평가를 진행할 수 없을 때 발생합니다."""
+
+class RateLimitScheduler:
+    """분당 요청 수(RPM)와 분당 토큰 수(TPM) 한도 안에서 API 요청을 내보내는 토큰 버킷입니다.
+    
+    응답의 x-ratelimit-* 헤더로 남은 한도를 갱신하고, 429 응답을 받으면
+    모든 요청 스레드를 Retry-After 시간만큼 함께 대기시킵니다.
+    """
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.lock = threading.Lock()
+        self.requests_per_minute = float(requests_per_minute)
+        self.tokens_per_minute = float(tokens_per_minute)
+        self.available_requests = self.requests_per_minute
+        self.available_tokens = self.tokens_per_minute
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+    
+    def refill(self, now: float):
+        """지난 시간만큼 요청/토큰 버킷을 채웁니다. (lock을 잡은 상태에서 호출)"""
+        elapsed = now - self.updated_at
+        self.available_requests = min(self.requests_per_minute, self.available_requests + elapsed * self.requests_per_minute / 60.0)
+        self.available_tokens = min(self.tokens_per_minute, self.available_tokens + elapsed * self.tokens_per_minute / 60.0)
+        self.updated_at = now
+    
+    def acquire(self, estimated_tokens: int):
+        """요청 1건과 예상 토큰 수만큼의 한도가 생길 때까지 기다린 뒤 차감합니다."""
+        estimated_tokens = min(float(estimated_tokens), self.tokens_per_minute)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.refill(now)
+                wait_seconds = self.paused_until - now
+                if wait_seconds <= 0:
+                    if self.available_requests >= 1 and self.available_tokens >= estimated_tokens:
+                        self.available_requests -= 1
+                        self.available_tokens -= estimated_tokens
+                        return
+                    wait_seconds = max(
+                        (1 - self.available_requests) * 60.0 / self.requests_per_minute,
+                        (estimated_tokens - self.available_tokens) * 60.0 / self.tokens_per_minute
+                    )
+            time.sleep(min(max(wait_seconds, 0.05), 5.0))
+    
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """예상 토큰 수와 실제 사용 토큰 수의 차이를 버킷에 반영합니다."""
+        with self.lock:
+            self.available_tokens = min(self.tokens_per_minute, self.available_tokens + estimated_tokens - actual_tokens)
+    
+    def pause(self, seconds: float):
+        """모든 요청을 지정한 시간 동안 멈춥니다."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+    
+    def update_from_headers(self, headers):
+        """OpenAI 응답의 x-ratelimit-* 헤더로 한도와 남은 양을 갱신합니다."""
+        limit_requests = parse_header_number(headers.get('x-ratelimit-limit-requests'))
+        limit_tokens = parse_header_number(headers.get('x-ratelimit-limit-tokens'))
+        remaining_requests = parse_header_number(headers.get('x-ratelimit-remaining-requests'))
+        remaining_tokens = parse_header_number(headers.get('x-ratelimit-remaining-tokens'))
+        with self.lock:
+            self.refill(time.monotonic())
+            if limit_requests:
+                self.requests_per_minute = limit_requests
+            if limit_tokens:
+                self.tokens_per_minute = limit_tokens
+            if remaining_requests is not None:
+                self.available_requests = min(self.available_requests, remaining_requests)
+            if remaining_tokens is not None:
+                self.available_tokens = min(self.available_tokens, remaining_tokens)
+
+def parse_header_number(value: Optional[str]) -> Optional[float]:
+    """숫자 헤더 값을 float으로 변환합니다. 없거나 형식이 잘못되면 None을 반환합니다."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """x-ratelimit-reset-* 헤더 값(예: "1s", "6m0s", "250ms")을 초 단위로 변환합니다."""
+    if not value:
+        return None
+    matches = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value)
+    if not matches:
+        return parse_header_number(value)
+    units = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+    return sum(float(amount) * units[unit] for amount, unit in matches)
+
+def get_retry_delay(headers, attempt: int) -> float:
+    """재시도 대기 시간을 계산합니다. Retry-After 헤더를 우선하고, 없으면 지수 백오프에 지터를 더합니다."""
+    headers = headers or {}
+    retry_after_ms = parse_header_number(headers.get('retry-after-ms'))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000.0 + random.uniform(0, 0.5)
+    retry_after = parse_header_number(headers.get('retry-after'))
+    if retry_after is not None:
+        return retry_after + random.uniform(0, 0.5)
+    reset_after = max(
+        parse_reset_duration(headers.get('x-ratelimit-reset-requests')) or 0.0,
+        parse_reset_duration(headers.get('x-ratelimit-reset-tokens')) or 0.0
+    )
+    if reset_after > 0:
+        return reset_after + random.uniform(0, 0.5)
+    # 전체 지터(full jitter) 지수 백오프: 1초, 2초, 4초 ... 최대 60초
+    return random.uniform(0, min(60.0, 2.0 ** attempt)) + 0.5
+
+def is_insufficient_quota(error: Exception) -> bool:
+    """429 오류가 일시적인 사용량 제한이 아니라 잔액 부족인지 확인합니다."""
+    code = getattr(error, 'code', None)
+    return code == 'insufficient_quota' or 'insufficient_quota' in str(error).lower()
+
+def estimate_request_tokens(messages: List[Dict], output_tokens: int = 2000) -> int:
+    """요청 메시지와 예상 응답 길이(output_tokens)로 사용할 토큰 수를 대략 추정합니다."""
+    # 한글은 대략 1~2글자당 1토큰이므로 보수적으로 글자 수의 절반 + 응답 토큰으로 계산
+    prompt_chars = sum(len(message['content']) for message in messages)
+    return prompt_chars // 2 + output_tokens
+
+def create_chat_completion_with_retry(client: OpenAI, scheduler: RateLimitScheduler, messages: List[Dict], max_retries: int = 6, output_tokens: int = 2000, **kwargs):
+    """사용량 한도를 지키며 채팅 완성 요청을 보내고, 일시적인 오류는 최대 max_retries번 백오프 후 재시도합니다.
+    
+    잔액 부족(insufficient_quota)은 재시도하지 않고 QuotaExceededError를 발생시킵니다.
+    output_tokens는 토큰 한도 계산에 쓰는 응답 토큰 수 추정치이고, 나머지 인자는 요청에 그대로 전달됩니다.
+    """
+    estimated_tokens = estimate_request_tokens(messages, output_tokens)
+    for attempt in range(max_retries + 1):
+        scheduler.acquire(estimated_tokens)
+        try:
+            raw_response = client.chat.completions.with_raw_response.create(messages=messages, **kwargs)
+            scheduler.update_from_headers(raw_response.headers)
+            response = raw_response.parse()
+            if response.usage:
+                scheduler.record_usage(estimated_tokens, response.usage.total_tokens)
+            return response
+        except RateLimitError as e:
+            if is_insufficient_quota(e):
+                raise QuotaExceededError(str(e)) from e
+            if attempt == max_retries:
+                raise
+            headers = e.response.headers if e.response is not None else {}
+            scheduler.update_from_headers(headers)
+            # 같은 한도를 공유하는 다른 요청들도 함께 대기
+            scheduler.pause(get_retry_delay(headers, attempt))
+        except (APITimeoutError, APIConnectionError, InternalServerError):
+            if attempt == max_retries:
+                raise
+            time.sleep(get_retry_delay(None, attempt))
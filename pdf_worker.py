@@ -0,0 +1,45 @@
+"""PDF 텍스트 추출 작업 (app.py의 프로세스 풀에서 실행)
+
+Streamlit은 다시 실행될 때마다 __main__ 모듈을 새로 만들기 때문에, 작업 프로세스로 넘기는 함수는
+app.py가 아닌 이 모듈에 두어 항상 같은 이름(pdf_worker.extract_pdf_text_worker)으로 전달되도록 합니다.
+"""
+import signal
+from typing import Tuple
+
+import pdfplumber
+
+def read_pdf_text(pdf_source) -> Tuple[str, int]:
+    """pdfplumber로 PDF의 모든 페이지 텍스트와 페이지 수를 추출합니다. (오류는 호출한 쪽에서 처리)"""
+    text = ""
+    with pdfplumber.open(pdf_source) as pdf:
+        page_count = len(pdf.pages)
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            # 텍스트를 얻은 페이지의 레이아웃 객체는 바로 해제하여 메모리 사용량을 줄임
+            if hasattr(page, 'close'):
+                page.close()
+            else:
+                page.flush_cache()
+            if page_text:
+                text += page_text + "\n\n"
+    return text, page_count
+
+def extract_pdf_text_worker(pdf_path: str, timeout_seconds: float) -> Tuple[str, int]:
+    """프로세스 풀에서 실행되는 PDF 텍스트 추출 작업입니다.
+    
+    제한 시간을 넘기면 작업 프로세스 안에서 TimeoutError를 발생시켜,
+    문제가 있는 PDF 하나가 다른 파일의 추출을 막지 않도록 합니다.
+    """
+    def on_timeout(signum, frame):
+        raise TimeoutError(f"{timeout_seconds:.0f}초 안에 텍스트 추출이 끝나지 않았습니다.")
+    
+    use_alarm = hasattr(signal, 'SIGALRM') and timeout_seconds > 0
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+    try:
+        return read_pdf_text(pdf_path)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+
+# 테스트에서 app.py 옆의 모듈(text_similarity 등)을 불러올 수 있도록 저장소 루트를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.py를 불러오는 테스트가 작업 디렉터리에 캐시/저장소 파일을 만들지 않도록 임시 디렉터리를 사용
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="essay-eval-test-")
+for name in ("GRADING_CACHE_FILE", "FINGERPRINT_STORE_FILE", "PDF_TEXT_CACHE_FILE", "EVALUATION_JOB_STORE_FILE"):
+    os.environ[name] = os.path.join(TEST_DATA_DIR, name.lower() + ".sqlite3")
+for name in ("REFERENCE_LIBRARY_DIR", "REFERENCE_INDEX_DIR", "UPLOAD_SPOOL_DIR"):
+    os.environ[name] = os.path.join(TEST_DATA_DIR, name.lower())
+    os.makedirs(os.environ[name], exist_ok=True)
+
+import pytest
+
+from fake_openai import FakeOpenAIServer
+
+@pytest.fixture
+def fake_openai():
+    """테스트마다 새로 띄우는 가짜 OpenAI 엔드포인트"""
+    with FakeOpenAIServer() as server:
+        yield server
@@ -0,0 +1,187 @@
+import json
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+Reply = Tuple[int, Dict[str, str], Dict]
+
+def chat_completion(content: str, total_tokens: int = 100) -> Dict:
+    """chat.completions 응답 본문을 만듭니다."""
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": total_tokens - 10, "completion_tokens": 10, "total_tokens": total_tokens}
+    }
+
+def api_error(code: str, message: str) -> Dict:
+    """OpenAI 오류 응답 본문을 만듭니다."""
+    return {"error": {"message": message, "type": code, "param": None, "code": code}}
+
+def parse_multipart(content_type: str, body: bytes) -> Dict[str, Tuple[Optional[str], bytes]]:
+    """multipart/form-data 본문을 {필드 이름: (파일 이름, 내용)}으로 나눕니다."""
+    message = BytesParser(policy=default_policy).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + body)
+    return {
+        part.get_param('name', header='content-disposition'): (part.get_filename(), part.get_payload(decode=True))
+        for part in message.iter_parts()
+    }
+
+class FakeOpenAIServer:
+    """OpenAI 호환 엔드포인트를 흉내 내는 로컬 HTTP 서버입니다.
+    
+    chat.completions 요청에는 script에 넣은 (상태 코드, 헤더, 본문)을 앞에서부터 차례로 응답하고,
+    비어 있으면 respond(요청 본문)의 반환값으로 응답합니다. 받은 요청 본문과 동시에 처리 중이던 요청 수의 최댓값을 기록합니다.
+    
+    Batch API용 파일 업로드(POST /files), 배치 생성(POST /batches), 상태 조회(GET /batches/{id}),
+    파일 내용(GET /files/{id}/content)도 처리합니다. 배치의 각 요청은 respond로 응답을 만들고,
+    상태 조회를 batch_polls_until_complete번 받으면 "completed"가 됩니다.
+    """
+    
+    def __init__(self):
+        self.script: List[Reply] = []
+        self.respond: Callable[[Dict], Reply] = lambda request: (200, {}, chat_completion("{}"))
+        self.requests: List[Dict] = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.files: Dict[str, Dict] = {}
+        self.batches: Dict[str, Dict] = {}
+        self.batch_polls_until_complete = 2
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                if self.path.endswith('/files'):
+                    self.send_json(200, {}, server.create_file(parse_multipart(self.headers['Content-Type'], body)))
+                elif self.path.endswith('/batches'):
+                    self.send_json(200, {}, server.create_batch(json.loads(body)))
+                else:
+                    self.send_json(*server.complete_chat(json.loads(body)))
+            
+            def do_GET(self):
+                parts = self.path.strip('/').split('/')
+                if len(parts) >= 3 and parts[-3] == 'files' and parts[-1] == 'content' and parts[-2] in server.files:
+                    content = server.files[parts[-2]]['content']
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/octet-stream')
+                    self.send_header('Content-Length', str(len(content)))
+                    self.end_headers()
+                    self.wfile.write(content)
+                elif len(parts) >= 2 and parts[-2] == 'batches' and parts[-1] in server.batches:
+                    self.send_json(200, {}, server.poll_batch(parts[-1]))
+                else:
+                    self.send_json(404, {}, api_error("not_found", f"{self.path} not found"))
+            
+            def send_json(self, status: int, headers: Dict[str, str], payload: Dict):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    def complete_chat(self, request: Dict) -> Reply:
+        with self.lock:
+            self.requests.append(request)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            scripted = self.script.pop(0) if self.script else None
+        try:
+            return scripted or self.respond(request)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+    
+    def store_file(self, filename: str, purpose: str, content: bytes) -> Dict:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        self.files[file_id] = {"filename": filename, "purpose": purpose, "content": content}
+        return {
+            "id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+            "filename": filename, "purpose": purpose, "status": "processed"
+        }
+    
+    def create_file(self, fields: Dict[str, Tuple[Optional[str], bytes]]) -> Dict:
+        filename, content = fields['file']
+        return self.store_file(filename, fields['purpose'][1].decode('utf-8'), content)
+    
+    def create_batch(self, request: Dict) -> Dict:
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        self.batches[batch_id] = {
+            "request": request,
+            "polls": 0,
+            "status": "validating",
+            "output_file_id": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0}
+        }
+        return self.batch_object(batch_id)
+    
+    def poll_batch(self, batch_id: str) -> Dict:
+        batch = self.batches[batch_id]
+        batch['polls'] += 1
+        if batch['status'] != "completed" and batch['polls'] >= self.batch_polls_until_complete:
+            self.run_batch(batch)
+        elif batch['status'] == "validating":
+            batch['status'] = "in_progress"
+        return self.batch_object(batch_id)
+    
+    def run_batch(self, batch: Dict):
+        """입력 파일의 요청마다 respond로 응답을 만들어 출력 파일을 저장하고 배치를 완료합니다."""
+        output_lines = []
+        counts = {"total": 0, "completed": 0, "failed": 0}
+        for line in self.files[batch['request']['input_file_id']]['content'].decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            status, _, payload = self.respond(request['body'])
+            counts["total"] += 1
+            counts["completed" if status == 200 else "failed"] += 1
+            output_lines.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": request['custom_id'],
+                "response": {"status_code": status, "request_id": uuid.uuid4().hex, "body": payload},
+                "error": None
+            }, ensure_ascii=False))
+        output_file = self.store_file("batch_output.jsonl", "batch_output", ("\n".join(output_lines) + "\n").encode('utf-8'))
+        batch.update({"status": "completed", "output_file_id": output_file['id'], "request_counts": counts})
+    
+    def batch_object(self, batch_id: str) -> Dict:
+        batch = self.batches[batch_id]
+        request = batch['request']
+        return {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": request['endpoint'],
+            "errors": None,
+            "input_file_id": request['input_file_id'],
+            "completion_window": request['completion_window'],
+            "status": batch['status'],
+            "output_file_id": batch['output_file_id'],
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "request_counts": batch['request_counts'],
+            "metadata": request.get('metadata')
+        }
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,91 @@
+import json
+import random
+import re
+import time
+
+import app
+
+CRITERIA = [
+    {"name": "논리성", "description": "", "min_score": 0.0, "max_score": 10.0, "weight": 2.0},
+    {"name": "표현력", "description": "", "min_score": 0.0, "max_score": 10.0, "weight": 1.0}
+]
+
+def batch_output_line(request: dict, status_code: int = 200, content: str = None) -> str:
+    body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+    return json.dumps({
+        "id": "batch_req_test",
+        "custom_id": request['custom_id'],
+        "response": {"status_code": status_code, "body": body},
+        "error": None
+    }, ensure_ascii=False)
+
+def test_batch_input_roundtrips_through_parse_batch_output():
+    essays = [{"filename": f"학생{idx}.pdf", "text": f"에세이 {idx}"} for idx in range(3)]
+    requests = [json.loads(line) for line in app.create_batch_input_file(essays, CRITERIA).decode('utf-8').splitlines()]
+
+    assert [request['custom_id'] for request in requests] == ["essay-0", "essay-1", "essay-2"]
+    assert all(request['url'] == "/v1/chat/completions" for request in requests)
+    assert requests[1]['body']['messages'] == app.build_evaluation_messages("에세이 1", CRITERIA)
+
+    output = "\n".join([
+        batch_output_line(requests[0], content=json.dumps({"scores": {"논리성": 12, "표현력": 4}, "feedback": "좋음"})),
+        batch_output_line(requests[1], status_code=500),
+        batch_output_line(requests[2], content="JSON이 아닌 응답"),
+        "잘린 줄"
+    ])
+    parsed = app.parse_batch_output(output, CRITERIA)
+
+    # 점수는 평가 기준 범위로 보정되고 가중치가 반영됨
+    assert parsed["essay-0"] == {"scores": {"논리성": 10.0, "표현력": 4.0}, "total_score": 24.0, "feedback": "좋음"}
+    assert parsed["essay-1"] is None
+    assert parsed["essay-2"] is None
+
+def test_submit_poll_and_ingest_through_fake_batch_endpoints(fake_openai, monkeypatch):
+    monkeypatch.setattr(app, "OPENAI_BASE_URL", fake_openai.base_url)
+    monkeypatch.setattr(app, "BATCH_POLL_INTERVAL_SECONDS", 0.05)
+    criteria = CRITERIA + [{"name": "윤리와 성실성", "description": "", "min_score": 15.0, "max_score": 25.0, "weight": 1.0}]
+    rng = random.Random(20)
+    original = ''.join(rng.choice("가나다라마바사아자차카타파하") for _ in range(600))
+    essays = [
+        {"filename": "원본.pdf", "text": "배치 에세이 0번. " + original},
+        {"filename": "사본.pdf", "text": "배치 에세이 1번. " + original},
+        {"filename": "실패.pdf", "text": "배치 에세이 2번. " + ''.join(rng.choice("가나다라마바사아자차카타파하") for _ in range(600))}
+    ]
+
+    def batch_reply(request):
+        idx = int(re.search(r"배치 에세이 (\d)번", request['messages'][-1]['content']).group(1))
+        if idx == 2:
+            return 500, {}, {"error": {"message": "server error", "type": "server_error", "param": None, "code": None}}
+        content = json.dumps({"scores": {"논리성": 8, "표현력": 6, "윤리와 성실성": 24}, "feedback": f"피드백 {idx}"}, ensure_ascii=False)
+        return 200, {}, {
+            "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 200, "completion_tokens": 20, "total_tokens": 220}
+        }
+
+    fake_openai.respond = batch_reply
+
+    batch_id = app.submit_grading_batch(essays, criteria, "test-key-batch")
+    registry = app.get_batch_status_registry()
+    deadline = time.monotonic() + 10
+    # 제출과 함께 시작된 폴링 스레드가 완료 상태를 기록할 때까지 대기
+    while registry.get(batch_id, {}).get('status') != "completed" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert registry[batch_id]['status'] == "completed"
+    assert (registry[batch_id]['completed'], registry[batch_id]['failed'], registry[batch_id]['total']) == (2, 1, 3)
+    assert fake_openai.files[fake_openai.batches[batch_id]['request']['input_file_id']]['purpose'] == "batch"
+
+    results = app.ingest_grading_batch(batch_id, essays, criteria, "test-key-batch", [])
+
+    assert [result['filename'] for result in results] == ["원본.pdf", "사본.pdf", "실패.pdf"]
+    assert results[0]['scores'] == {"논리성": 8.0, "표현력": 6.0, "윤리와 성실성": 24.0}
+    # 앞선 에세이와 거의 같은 사본은 실시간 평가와 같은 표절 검사로 윤리 점수가 조정됨
+    assert results[1]['scores']["윤리와 성실성"] == 0.0
+    assert results[1]['plagiarism_check']['similar_essay'] == "원본.pdf"
+    assert results[1]['total_score'] == 8.0 * 2 + 6.0 + 0.0
+    # 실패한 요청은 0점 기록으로 남고 캐시에 저장되지 않음
+    assert results[2]['total_score'] == 0.0 and 'plagiarism_check' not in results[2]
+
+    cached = [app.load_cached_evaluation(app.make_grading_cache_key(essay['text'], criteria)) for essay in essays]
+    assert cached[0]['scores'] == cached[1]['scores'] == {"논리성": 8.0, "표현력": 6.0, "윤리와 성실성": 24.0}
+    assert cached[2] is None
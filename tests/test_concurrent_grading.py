@@ -0,0 +1,80 @@
+import json
+import random
+import re
+import time
+
+import pytest
+
+import app
+import text_similarity
+
+CRITERIA = [
+    {"name": "논리성", "description": "", "min_score": 0.0, "max_score": 10.0, "weight": 1.0},
+    {"name": "표현력", "description": "", "min_score": 0.0, "max_score": 10.0, "weight": 1.0}
+]
+ESSAY_COUNT = 8
+
+def make_essays(seed: int):
+    rng = random.Random(seed)
+    return [
+        {"filename": f"학생{idx}.pdf", "text": f"에세이 번호 {idx}번. " + ''.join(rng.choice("가나다라마바사아자차카타파하") for _ in range(300))}
+        for idx in range(ESSAY_COUNT)
+    ]
+
+def graded_reply(request):
+    """앞 번호 에세이일수록 늦게 응답하고, 논리성 점수로 에세이 번호를 돌려줍니다."""
+    idx = int(re.search(r"에세이 번호 (\d+)번", request['messages'][-1]['content']).group(1))
+    time.sleep(0.05 * (ESSAY_COUNT - idx))
+    content = json.dumps({"scores": {"논리성": idx, "표현력": 5}, "feedback": f"피드백 {idx}"}, ensure_ascii=False)
+    return 200, {}, {
+        "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 200, "completion_tokens": 20, "total_tokens": 220}
+    }
+
+@pytest.fixture
+def grading_endpoint(fake_openai, monkeypatch):
+    monkeypatch.setattr(app, "OPENAI_BASE_URL", fake_openai.base_url)
+    fake_openai.respond = graded_reply
+    return fake_openai
+
+def test_bounded_concurrency_keeps_input_order(grading_endpoint):
+    essays = make_essays(0)
+    finished = []
+
+    results = app.evaluate_essays_concurrently(
+        essays, CRITERIA, "test-key-order", [],
+        max_in_flight=3,
+        progress_callback=lambda done, total, filename: finished.append(filename)
+    )
+
+    assert 1 < grading_endpoint.peak_in_flight <= 3
+    assert len(grading_endpoint.requests) == ESSAY_COUNT
+    # 응답은 뒤 번호부터 도착하지만 결과는 입력 순서대로 반환
+    assert finished != [essay['filename'] for essay in essays]
+    assert [result['filename'] for result in results] == [essay['filename'] for essay in essays]
+    assert [result['scores']['논리성'] for result in results] == list(range(ESSAY_COUNT))
+
+def test_insufficient_quota_stops_remaining_essays(fake_openai, monkeypatch):
+    monkeypatch.setattr(app, "OPENAI_BASE_URL", fake_openai.base_url)
+    fake_openai.respond = lambda request: (429, {}, {"error": {"message": "quota", "type": "insufficient_quota", "param": None, "code": "insufficient_quota"}})
+
+    results = app.evaluate_essays_concurrently(make_essays(1), CRITERIA, "test-key-quota", [], max_in_flight=2)
+
+    # 잔액 부족이 감지되면 아직 시작하지 않은 요청은 보내지 않고 중단된 결과로 채움
+    assert len(fake_openai.requests) < ESSAY_COUNT
+    assert len(results) == ESSAY_COUNT
+    assert all(result['feedback'] == "OpenAI API 잔액 부족으로 평가가 중단되었습니다." for result in results)
+
+def test_essay_features_are_prepared_once_per_essay(grading_endpoint, monkeypatch):
+    essays = make_essays(2)
+    normalized = []
+    original_normalize = text_similarity.normalize_essay_text
+    monkeypatch.setattr(text_similarity, "normalize_essay_text", lambda text: normalized.append(text) or original_normalize(text))
+    evaluated_essays = []
+
+    app.evaluate_essays_concurrently(essays, CRITERIA, "test-key-features", evaluated_essays, max_in_flight=3)
+
+    # 미리 계산한 표절 검사의 항목을 결과 확정과 비교 목록에 그대로 사용 (에세이마다 한 번만 계산)
+    assert sorted(normalized) == sorted(essay['text'] for essay in essays)
+    assert [essay['filename'] for essay in evaluated_essays] == [essay['filename'] for essay in essays]
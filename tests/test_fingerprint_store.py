@@ -0,0 +1,49 @@
+import random
+
+import app
+
+HANGUL = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허"
+
+def random_text(rng: random.Random, length: int) -> str:
+    return ''.join(rng.choice(HANGUL) for _ in range(length))
+
+def test_same_title_and_filename_from_other_users_do_not_collide():
+    rng = random.Random(10)
+    text1, text2 = random_text(rng, 400), random_text(rng, 400)
+    app.register_essay_fingerprints(text1, "1.pdf", app.make_fingerprint_scope("teacher-a", "run-1", "중간고사"))
+    app.register_essay_fingerprints(text2, "1.pdf", app.make_fingerprint_scope("teacher-b", "run-2", "중간고사"))
+
+    # 다른 사용자의 같은 이름 파일을 덮어쓰거나 검색에서 제외하지 않음
+    matches = app.find_fingerprint_matches(text1, "1.pdf", app.make_fingerprint_scope("teacher-b", "run-3", "중간고사"))
+    assert [match['coverage'] for match in matches] == [1.0]
+
+    # 같은 사용자가 같은 평가의 같은 파일을 다시 평가하면 자기 자신과 비교하지 않음
+    assert app.find_fingerprint_matches(text1, "1.pdf", app.make_fingerprint_scope("teacher-a", "run-4", "중간고사")) == []
+
+def test_split_fingerprint_scope_keeps_legacy_scopes():
+    assert app.split_fingerprint_scope(app.make_fingerprint_scope("hong123", "abc", "기말::보고서")) == ("hong123", "abc", "기말::보고서")
+    assert app.split_fingerprint_scope("2024 1학기 국어") == ("", "", "2024 1학기 국어")
+
+def test_fingerprint_coverage_is_reported_apart_from_similarity():
+    criteria = [{"name": "윤리와 성실성", "min_score": 0.0, "max_score": 20.0, "weight": 1.0}]
+    plagiarism_result = {"max_similarity": 0.1, "similar_essay": None, "plagiarism_detected": False, "similarity_percentage": 10.0}
+
+    app.record_fingerprint_coverage(plagiarism_result, app.FINGERPRINT_COVERAGE_THRESHOLD / 2, "이전.pdf (중간고사)")
+    assert plagiarism_result['plagiarism_detected'] is False
+    app.record_fingerprint_coverage(plagiarism_result, 0.9, "이전.pdf (중간고사)")
+    assert plagiarism_result['similarity_percentage'] == 10.0
+    assert plagiarism_result['plagiarism_detected'] is True
+
+    evaluation_result = app.apply_plagiarism_check({"scores": {"윤리와 성실성": 18.0}, "total_score": 18.0, "feedback": "좋음"}, plagiarism_result, criteria)
+    assert evaluation_result['scores']["윤리와 성실성"] == 10.0
+    assert "지문 공유 비율 90.0%" in evaluation_result['feedback']
+
+def test_history_check_ignores_essays_of_the_same_run():
+    rng = random.Random(11)
+    text = random_text(rng, 400)
+    app.register_essay_fingerprints(text, "앞.pdf", app.make_fingerprint_scope("teacher-c", "run-5", "기말고사"))
+
+    # 같은 실행의 앞선 에세이는 세션 비교 목록으로 비교하므로 지문 등록 시점과 관계없이 제외
+    assert app.find_fingerprint_matches(text, "뒤.pdf", app.make_fingerprint_scope("teacher-c", "run-5", "기말고사")) == []
+    matches = app.find_fingerprint_matches(text, "뒤.pdf", app.make_fingerprint_scope("teacher-c", "run-6", "기말고사"))
+    assert [match['filename'] for match in matches] == ["앞.pdf"]
@@ -0,0 +1,105 @@
+import json
+import time
+import uuid
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from fake_openai import chat_completion
+import app
+
+CRITERIA = [
+    {"name": "논리성", "description": "주장이 분명한가", "min_score": 0.0, "max_score": 10.0, "weight": 1.0},
+    {"name": "표현력", "description": "", "min_score": 0.0, "max_score": 10.0, "weight": 1.0}
+]
+
+def make_essays(count: int):
+    # 테스트마다 다른 본문을 사용하여 이전 테스트의 캐시 항목과 겹치지 않도록 함
+    run_id = uuid.uuid4().hex
+    return [{"filename": f"학생{idx}.pdf", "text": f"에세이 {run_id} {idx}번 본문입니다."} for idx in range(count)]
+
+@pytest.fixture
+def grading_endpoint(fake_openai, monkeypatch):
+    monkeypatch.setattr(app, "OPENAI_BASE_URL", fake_openai.base_url)
+    fake_openai.respond = lambda request: (200, {}, chat_completion(json.dumps({"scores": {"논리성": 7, "표현력": 6}, "feedback": "좋음"}, ensure_ascii=False)))
+    return fake_openai
+
+def test_cache_key_changes_with_grading_settings(monkeypatch):
+    essay_text = "같은 에세이 본문"
+    base_key = app.make_grading_cache_key(essay_text, CRITERIA)
+    # 결과에 영향을 주지 않는 공백과 숫자 표기 차이는 같은 키
+    assert app.make_grading_cache_key(essay_text, [dict(CRITERIA[0], name=" 논리성 ", max_score=10), CRITERIA[1]]) == base_key
+
+    changed_criteria = [
+        [dict(CRITERIA[0], description="근거가 충분한가"), CRITERIA[1]],
+        [dict(CRITERIA[0], max_score=20.0), CRITERIA[1]],
+        [dict(CRITERIA[0], weight=2.0), CRITERIA[1]],
+        CRITERIA[:1]
+    ]
+    for criteria in changed_criteria:
+        assert app.make_grading_cache_key(essay_text, criteria) != base_key
+    assert app.make_grading_cache_key(essay_text + ".", CRITERIA) != base_key
+
+    for setting, value in (("OPENAI_MODEL", "gpt-4o"), ("OPENAI_TEMPERATURE", 0.7), ("PROMPT_VERSION", "2")):
+        with monkeypatch.context() as patch:
+            patch.setattr(app, setting, value)
+            assert app.make_grading_cache_key(essay_text, CRITERIA) != base_key
+    assert app.make_grading_cache_key(essay_text, CRITERIA) == base_key
+
+def test_changed_settings_miss_the_cache(grading_endpoint, monkeypatch):
+    essays = make_essays(1)
+    app.evaluate_essays_concurrently(essays, CRITERIA, "test-key-cache-miss", [])
+    assert len(grading_endpoint.requests) == 1
+
+    monkeypatch.setattr(app, "PROMPT_VERSION", "다음 버전")
+    results = app.evaluate_essays_concurrently(essays, CRITERIA, "test-key-cache-miss", [])
+
+    assert len(grading_endpoint.requests) == 2
+    assert not results[0].get('cached')
+
+def test_repeat_run_is_served_from_cache_and_counted(grading_endpoint, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key-cache-apptest")
+    monkeypatch.setenv("OPENAI_BASE_URL", grading_endpoint.base_url)
+    essays = make_essays(3)
+
+    at = AppTest.from_file(app.__file__, default_timeout=120)
+    at.session_state['is_logged_in'] = True
+    at.session_state['logged_in_user'] = 'teacher'
+    at.session_state['evaluation_title'] = '캐시 테스트'
+    at.session_state['evaluation_criteria'] = CRITERIA
+    at.session_state['extracted_texts'] = essays
+    at.run()
+
+    def click_evaluate():
+        next(button for button in at.button if button.label == "🔍 평가하기").click().run()
+        assert not at.exception
+
+    click_evaluate()
+    assert len(grading_endpoint.requests) == 3
+    assert at.session_state['last_cache_hits'] == 0
+
+    # 같은 에세이와 평가 기준으로 다시 평가하면 API를 호출하지 않고 캐시에서 불러옴
+    click_evaluate()
+    assert len(grading_endpoint.requests) == 3
+    assert at.session_state['last_cache_hits'] == 3
+    assert all(result.get('cached') for result in at.session_state['evaluation_results'])
+    assert [result['total_score'] for result in at.session_state['evaluation_results']] == [13.0, 13.0, 13.0]
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "GRADING_CACHE_FILE", str(tmp_path / "grading_cache.sqlite3"))
+    evaluation_result = {"scores": {"논리성": 7.0}, "total_score": 7.0, "feedback": "가" * 100}
+    entry_size = len(json.dumps(evaluation_result, ensure_ascii=False).encode('utf-8'))
+    monkeypatch.setattr(app, "GRADING_CACHE_MAX_BYTES", entry_size * 3)
+
+    for key in ("a", "b", "c"):
+        app.save_cached_evaluation(key, evaluation_result)
+        time.sleep(0.01)
+    # a를 다시 사용하면 가장 오래 사용하지 않은 항목은 b가 됨
+    assert app.load_cached_evaluation("a") == evaluation_result
+    time.sleep(0.01)
+
+    app.save_cached_evaluation("d", evaluation_result)
+
+    assert app.load_cached_evaluation("b") is None
+    assert all(app.load_cached_evaluation(key) == evaluation_result for key in ("a", "c", "d"))
+    assert app.get_grading_cache_stats() == {"entries": 3, "bytes": entry_size * 3}
@@ -0,0 +1,94 @@
+import json
+import time
+
+import pytest
+
+from fake_openai import chat_completion
+import app
+
+ESSAYS = [{"filename": "1.pdf", "text": "에세이"}]
+
+@pytest.fixture(autouse=True)
+def job_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "EVALUATION_JOB_STORE_FILE", str(tmp_path / "jobs.sqlite3"))
+
+def set_job_column(job_id: str, column: str, value):
+    conn = app.connect_job_store()
+    try:
+        with conn:
+            conn.execute(f"UPDATE evaluation_jobs SET {column} = ? WHERE job_id = ?", (value, job_id))
+            if column == "finished_at":
+                conn.execute("UPDATE job_essays SET updated_at = ? WHERE job_id = ?", (value, job_id))
+    finally:
+        conn.close()
+
+def test_running_job_is_reclaimed_only_after_its_lease_expires():
+    job_id = app.create_evaluation_job(ESSAYS, [], "teacher", "과제")
+    app.enqueue_evaluation_job(job_id, 4)
+
+    assert app.claim_next_queued_job("worker-a") == (job_id, 4)
+    # 임대 중인 작업은 다른 작업 스레드가 가져가지 않음
+    assert app.claim_next_queued_job("worker-b") is None
+    assert app.renew_job_lease(job_id, "worker-a")
+
+    # 갱신이 끊긴 작업은 다른 작업 스레드가 다시 가져감
+    set_job_column(job_id, "claimed_at", time.time() - app.BACKGROUND_LEASE_SECONDS - 1)
+    assert app.claim_next_queued_job("worker-b") == (job_id, 4)
+    assert not app.renew_job_lease(job_id, "worker-a")
+
+    # 임대를 잃은 작업 스레드의 완료 기록은 무시됨
+    app.finish_queued_job(job_id, "worker-a", "중단됨")
+    assert app.list_background_jobs("teacher")[0]['queue_status'] == "running"
+    app.finish_queued_job(job_id, "worker-b")
+    assert app.list_background_jobs("teacher")[0]['queue_status'] == "finished"
+
+def test_running_job_without_lease_from_older_version_is_reclaimed():
+    job_id = app.create_evaluation_job(ESSAYS, [], "teacher", "과제")
+    set_job_column(job_id, "queue_status", "running")
+    assert app.claim_next_queued_job("worker-a") == (job_id, app.MAX_CONCURRENT_EVALUATIONS)
+
+def test_expired_jobs_are_deleted_when_a_new_job_is_created():
+    expired_at = time.time() - (app.JOB_RETENTION_DAYS + 1) * 86400
+    finished_job = app.create_evaluation_job(ESSAYS, [], "teacher", "완료된 작업")
+    set_job_column(finished_job, "created_at", expired_at)
+    set_job_column(finished_job, "finished_at", expired_at)
+    queued_job = app.create_evaluation_job(ESSAYS, [], "teacher", "대기 중인 작업")
+    set_job_column(queued_job, "created_at", expired_at)
+    set_job_column(queued_job, "finished_at", expired_at)
+    app.enqueue_evaluation_job(queued_job)
+    recent_job = app.create_evaluation_job(ESSAYS, [], "teacher", "최근 작업")
+
+    app.create_evaluation_job(ESSAYS, [], "teacher", "새 작업")
+
+    assert app.load_evaluation_job(finished_job) is None
+    # 대기열에 있는 작업과 보관 기간이 지나지 않은 작업은 유지
+    assert app.load_evaluation_job(queued_job) is not None
+    assert app.load_evaluation_job(recent_job) is not None
+
+def test_worker_records_essay_errors_as_the_job_error(fake_openai, monkeypatch):
+    monkeypatch.setattr(app, "OPENAI_BASE_URL", fake_openai.base_url)
+    criteria = [{"name": "논리성", "description": "", "min_score": 0.0, "max_score": 10.0, "weight": 1.0}]
+
+    def reply(request):
+        if "정상 에세이" in request['messages'][-1]['content']:
+            return 200, {}, chat_completion(json.dumps({"scores": {"논리성": 7}, "feedback": "좋음"}, ensure_ascii=False))
+        return 200, {}, chat_completion("JSON이 아닌 응답")
+    fake_openai.respond = reply
+
+    essays = [
+        {"filename": "정상.pdf", "text": f"정상 에세이 {time.time()}"},
+        {"filename": "오류.pdf", "text": f"오류 에세이 {time.time()}"}
+    ]
+    job_id = app.create_evaluation_job(essays, criteria, "teacher", "과제")
+    app.enqueue_evaluation_job(job_id, 2)
+
+    # 화면(ScriptRunContext)이 없는 작업 프로세스에서도 오류가 작업에 기록됨
+    assert app.process_next_queued_job("worker-a", "test-key-worker")
+    assert not app.process_next_queued_job("worker-a", "test-key-worker")
+
+    job = app.list_background_jobs("teacher")[0]
+    assert job['queue_status'] == "failed"
+    assert job['done_count'] == 1
+    assert job['queue_error'] == "1개 에세이 평가 실패 (오류.pdf: 평가 중 오류가 발생했습니다: AI 응답을 파싱하는 중 오류가 발생했습니다.)"
+    failed_result = app.load_evaluation_job(job_id)['essays'][1]['result']
+    assert failed_result['feedback'] == "평가 중 오류가 발생했습니다: AI 응답을 파싱하는 중 오류가 발생했습니다."
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+from openai import OpenAI, RateLimitError
+
+from fake_openai import chat_completion, api_error
+from openai_scheduler import (
+    QuotaExceededError, RateLimitScheduler, create_chat_completion_with_retry,
+    estimate_request_tokens, get_retry_delay, parse_reset_duration
+)
+
+MESSAGES = [{"role": "user", "content": "가" * 200}]
+
+def make_client(server) -> OpenAI:
+    return OpenAI(api_key="test-key", base_url=server.base_url, max_retries=0)
+
+def test_retries_rate_limit_after_retry_after(fake_openai):
+    fake_openai.script = [
+        (429, {"retry-after-ms": "100"}, api_error("rate_limit_exceeded", "Rate limit reached")),
+        (429, {"retry-after-ms": "100"}, api_error("rate_limit_exceeded", "Rate limit reached"))
+    ]
+    scheduler = RateLimitScheduler(600, 100000)
+
+    started = time.monotonic()
+    response = create_chat_completion_with_retry(make_client(fake_openai), scheduler, MESSAGES, model="gpt-4o-mini")
+
+    assert response.choices[0].message.content == "{}"
+    assert len(fake_openai.requests) == 3
+    # 429마다 Retry-After(0.1초) 이상 모든 요청을 멈춤
+    assert time.monotonic() - started >= 0.2
+
+def test_gives_up_after_max_retries(fake_openai):
+    fake_openai.respond = lambda request: (429, {"retry-after-ms": "10"}, api_error("rate_limit_exceeded", "Rate limit reached"))
+
+    with pytest.raises(RateLimitError):
+        create_chat_completion_with_retry(make_client(fake_openai), RateLimitScheduler(600, 100000), MESSAGES, max_retries=2, model="gpt-4o-mini")
+    assert len(fake_openai.requests) == 3
+
+def test_insufficient_quota_aborts_without_retry(fake_openai):
+    fake_openai.respond = lambda request: (429, {}, api_error("insufficient_quota", "You exceeded your current quota"))
+
+    with pytest.raises(QuotaExceededError):
+        create_chat_completion_with_retry(make_client(fake_openai), RateLimitScheduler(600, 100000), MESSAGES, model="gpt-4o-mini")
+    assert len(fake_openai.requests) == 1
+
+def test_token_accounting_uses_headers_and_actual_usage(fake_openai):
+    fake_openai.respond = lambda request: (200, {"x-ratelimit-remaining-tokens": "5000"}, chat_completion("{}", total_tokens=300))
+    scheduler = RateLimitScheduler(600, 10000)
+    estimated_tokens = estimate_request_tokens(MESSAGES, output_tokens=1000)
+    assert estimated_tokens == 1100
+
+    create_chat_completion_with_retry(make_client(fake_openai), scheduler, MESSAGES, output_tokens=1000, model="gpt-4o-mini")
+
+    # 헤더의 남은 토큰(5000)에서 예상보다 적게 쓴 만큼(1100 - 300)을 돌려받음
+    assert scheduler.available_tokens == pytest.approx(5800)
+
+def test_headers_update_limits():
+    scheduler = RateLimitScheduler(500, 200000)
+    scheduler.update_from_headers({
+        "x-ratelimit-limit-requests": "60",
+        "x-ratelimit-limit-tokens": "1000",
+        "x-ratelimit-remaining-requests": "3"
+    })
+    assert scheduler.requests_per_minute == 60
+    assert scheduler.tokens_per_minute == 1000
+    assert scheduler.available_requests == pytest.approx(3, abs=0.01)
+
+def test_acquire_waits_when_request_bucket_is_empty():
+    scheduler = RateLimitScheduler(120, 100000)
+    scheduler.available_requests = 0
+    started = time.monotonic()
+    scheduler.acquire(10)
+    # 분당 120건 = 0.5초마다 1건
+    assert 0.4 <= time.monotonic() - started < 2.0
+
+def test_retry_delay_prefers_server_hints():
+    assert 2.0 <= get_retry_delay({"retry-after": "2"}, 0) <= 2.5
+    assert 0.25 <= get_retry_delay({"retry-after-ms": "250"}, 0) <= 0.75
+    assert 360.0 <= get_retry_delay({"x-ratelimit-reset-tokens": "6m0s"}, 0) <= 360.5
+    assert 0.5 <= get_retry_delay({}, 3) <= 8.5
+
+def test_parse_reset_duration():
+    assert parse_reset_duration("1s") == 1.0
+    assert parse_reset_duration("6m0s") == 360.0
+    assert parse_reset_duration("250ms") == 0.25
+    assert parse_reset_duration("1.5") == 1.5
+    assert parse_reset_duration("") is None
@@ -0,0 +1,72 @@
+import hashlib
+import io
+import os
+import time
+import uuid
+
+import app
+
+def stuck_or_quick_worker(pdf_path: str, timeout_seconds: float):
+    """제한 시간 신호를 무시하고 멈춘 작업 프로세스를 흉내 냅니다. (파일명에 stuck이 있으면 멈춤)"""
+    if "stuck" in os.path.basename(pdf_path):
+        while True:
+            time.sleep(1)
+    return f"{os.path.basename(pdf_path)} 본문", 1
+
+def spool(tmp_path, names):
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(b"%PDF")
+        yield name, str(path), uuid.uuid4().hex
+
+def test_unresponsive_worker_is_failed_after_deadline(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "extract_pdf_text_worker", stuck_or_quick_worker)
+    monkeypatch.setattr(app, "PDF_EXTRACT_WORKERS", 1)
+    monkeypatch.setattr(app, "PDF_EXTRACT_DEADLINE_SECONDS", 1.0)
+    names = ["stuck.pdf", "a.pdf", "b.pdf"]
+
+    started = time.monotonic()
+    results = app.extract_spooled_pdfs(spool(tmp_path, names), len(names))
+
+    # 멈춘 파일만 실패로 기록되고, 뒤에 있던 파일은 새 프로세스 풀에서 추출됨
+    assert time.monotonic() - started < 30
+    assert results[0]['text'] == "" and "시간 초과" in results[0]['error']
+    assert [(result['text'], result['error']) for result in results[1:]] == [("a.pdf 본문", None), ("b.pdf 본문", None)]
+    assert not any(path.exists() for path in tmp_path.iterdir())
+
+def test_pdf_text_cache_is_keyed_by_content_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "PDF_TEXT_CACHE_FILE", str(tmp_path / "pdf_text_cache.sqlite3"))
+    monkeypatch.setattr(app, "extract_pdf_text_worker", stuck_or_quick_worker)
+    content = f"%PDF {uuid.uuid4().hex}".encode()
+
+    def extract(data: bytes):
+        spooled_path, content_hash = app.spool_upload_to_tempfile(io.BytesIO(data))
+        assert content_hash == hashlib.sha256(data).hexdigest()
+        return app.extract_spooled_pdfs(iter([("학생.pdf", spooled_path, content_hash)]), 1)[0], spooled_path
+
+    first, first_path = extract(content)
+    assert first['text'] == f"{os.path.basename(first_path)} 본문"
+    # 같은 내용은 임시 파일 이름이 달라도 다시 추출하지 않고 캐시의 텍스트를 사용
+    repeated, repeated_path = extract(content)
+    assert repeated_path != first_path
+    assert (repeated['text'], repeated['page_count']) == (first['text'], 1)
+    assert not os.path.exists(repeated_path)
+    # 내용이 다르면 캐시에 없으므로 새로 추출
+    changed, changed_path = extract(content + b" ")
+    assert changed['text'] == f"{os.path.basename(changed_path)} 본문"
+
+def test_pdf_text_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "PDF_TEXT_CACHE_FILE", str(tmp_path / "pdf_text_cache.sqlite3"))
+    text = "가" * 100
+    monkeypatch.setattr(app, "PDF_TEXT_CACHE_MAX_BYTES", len(text.encode('utf-8')) * 3)
+
+    for key in ("a", "b", "c"):
+        app.save_cached_pdf_text(key, text, 2)
+        time.sleep(0.01)
+    # a를 다시 사용하면 가장 오래 사용하지 않은 항목은 b가 됨
+    assert app.load_cached_pdf_texts(["a"]) == {"a": (text, 2)}
+    time.sleep(0.01)
+
+    app.save_cached_pdf_text("d", text, 2)
+
+    assert app.load_cached_pdf_texts(["a", "b", "c", "d"]) == {key: (text, 2) for key in ("a", "c", "d")}
@@ -0,0 +1,30 @@
+import os
+import time
+
+import app
+
+def touch(path: str, age_hours: float):
+    with open(path, 'wb') as f:
+        f.write(b"data")
+    mtime = time.time() - age_hours * 3600
+    os.utime(path, (mtime, mtime))
+
+def test_cleanup_removes_only_stale_app_files():
+    spool_dir = app.UPLOAD_SPOOL_DIR
+    old_zip = os.path.join(spool_dir, f"{app.SPOOL_FILE_PREFIX}old.zip")
+    old_pdf = os.path.join(spool_dir, f"{app.SPOOL_FILE_PREFIX}old.pdf")
+    new_zip = os.path.join(spool_dir, f"{app.SPOOL_FILE_PREFIX}new.zip")
+    other_zip = os.path.join(spool_dir, "other-old.zip")
+    touch(old_zip, app.SPOOL_FILE_MAX_AGE_HOURS + 1)
+    touch(old_pdf, app.SPOOL_FILE_MAX_AGE_HOURS + 1)
+    touch(new_zip, 0)
+    touch(other_zip, app.SPOOL_FILE_MAX_AGE_HOURS + 1)
+
+    app.cleanup_stale_spool_files.clear()
+    assert app.cleanup_stale_spool_files() == 2
+    assert not os.path.exists(old_zip) and not os.path.exists(old_pdf)
+    assert os.path.exists(new_zip) and os.path.exists(other_zip)
+
+    # 이미 지운 파일은 건너뛰므로 다시 실행해도 안전
+    app.cleanup_stale_spool_files.clear()
+    assert app.cleanup_stale_spool_files() == 0
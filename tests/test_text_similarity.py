@@ -0,0 +1,148 @@
+import random
+
+import numpy as np
+
+from text_similarity import (
+    MINHASH_NUM_PERM, MINHASH_PRIME, WINNOW_K, WINNOW_WINDOW,
+    normalize_essay_text, make_shingle_hashes, compute_minhash, MinHashLSHIndex, shingle_jaccard,
+    prepare_essay_features, winnow_fingerprints, SuffixAutomaton, find_shared_passages,
+    locate_shared_passages, highlight_shared_passages_html, UnionFind
+)
+
+HANGUL = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허"
+
+def random_text(rng: random.Random, length: int) -> str:
+    return ''.join(rng.choice(HANGUL) for _ in range(length))
+
+def test_normalize_essay_text_removes_whitespace():
+    assert normalize_essay_text(" 가 나\n다\t라 ") == "가나다라"
+
+def test_make_shingle_hashes_is_unique_and_deterministic():
+    hashes = make_shingle_hashes("가나다라마가나다라마")
+    assert hashes.dtype == np.uint64
+    assert len(set(hashes.tolist())) == hashes.size == 5
+    assert np.array_equal(np.sort(hashes), np.sort(make_shingle_hashes("가나다라마가나다라마")))
+    assert make_shingle_hashes("").size == 0
+    assert make_shingle_hashes("가나").size == 1
+
+def test_shingle_jaccard():
+    hashes = make_shingle_hashes("가나다라마바사")
+    assert shingle_jaccard(hashes, hashes) == 1.0
+    assert shingle_jaccard(hashes, make_shingle_hashes("")) == 0.0
+    assert shingle_jaccard(make_shingle_hashes("가나다라마바"), make_shingle_hashes("나다라마바사")) == 1 / 3
+
+def test_compute_minhash_estimates_jaccard():
+    rng = random.Random(0)
+    shared = random_text(rng, 1500)
+    hashes1 = make_shingle_hashes(shared + random_text(rng, 1500))
+    hashes2 = make_shingle_hashes(shared + random_text(rng, 1500))
+    agreement = np.mean(compute_minhash(hashes1) == compute_minhash(hashes2))
+    assert abs(agreement - shingle_jaccard(hashes1, hashes2)) < 0.15
+
+def test_compute_minhash_of_empty_text():
+    signature = compute_minhash(make_shingle_hashes(""))
+    assert signature.shape == (MINHASH_NUM_PERM,)
+    assert (signature == MINHASH_PRIME).all()
+
+def test_lsh_index_returns_near_duplicates_only():
+    rng = random.Random(1)
+    original = random_text(rng, 2000)
+    essays = [
+        {"filename": "원본.pdf", "text": original},
+        {"filename": "무관.pdf", "text": random_text(rng, 2000)}
+    ]
+    index = MinHashLSHIndex()
+    index.sync(essays)
+    assert index.query(original[:1900] + random_text(rng, 100)) == [0]
+
+    # 새 에세이만 추가로 색인하고, 목록이 바뀌면 처음부터 다시 만듦
+    essays.append({"filename": "사본.pdf", "text": original})
+    index.sync(essays)
+    assert index.query(original) == [0, 2]
+    index.sync([prepare_essay_features({"filename": "다른 목록.pdf", "text": original})])
+    assert index.query(original) == [0]
+
+def test_lsh_index_rebuilds_for_a_new_list_of_the_same_length():
+    rng = random.Random(3)
+    first_text, second_text = random_text(rng, 2000), random_text(rng, 2000)
+    index = MinHashLSHIndex()
+    # 임시 목록은 sync 직후 해제되므로 다음 목록이 같은 id()를 받을 수 있음
+    index.sync([prepare_essay_features({"filename": "이전.pdf", "text": first_text})])
+    replacement = [prepare_essay_features({"filename": "새 목록.pdf", "text": second_text})]
+    index.sync(replacement)
+    assert index.query(second_text) == [0]
+    assert index.query(first_text) == []
+
+    index.reset()
+    index.sync(replacement)
+    assert index.query(second_text) == [0]
+
+def test_winnow_fingerprints_share_long_common_substring():
+    rng = random.Random(2)
+    common = random_text(rng, WINNOW_K + WINNOW_WINDOW - 1)
+    for _ in range(20):
+        text1 = random_text(rng, 200) + common + random_text(rng, 200)
+        text2 = random_text(rng, 150) + common + random_text(rng, 250)
+        # k + window - 1글자 이상 겹치면 반드시 지문을 하나 이상 공유
+        assert winnow_fingerprints(text1) & winnow_fingerprints(text2)
+
+def test_winnow_fingerprints_edge_cases():
+    assert winnow_fingerprints("") == set()
+    assert len(winnow_fingerprints("가나")) == 1
+    text = random_text(random.Random(3), 500)
+    fingerprints = winnow_fingerprints(text)
+    assert fingerprints == winnow_fingerprints(text)
+    # 모든 k-gram을 저장하는 것보다 훨씬 적은 수만 선택
+    assert len(fingerprints) < (len(text) - WINNOW_K + 1) / 2
+
+def test_suffix_automaton_matches_brute_force():
+    rng = random.Random(4)
+    for _ in range(30):
+        source = ''.join(rng.choice("가나다") for _ in range(rng.randint(1, 30)))
+        text = ''.join(rng.choice("가나다") for _ in range(rng.randint(1, 30)))
+        automaton = SuffixAutomaton(source)
+        for end, (length, source_end) in enumerate(automaton.longest_matches(text)):
+            expected = max(
+                (size for size in range(1, end + 2) if text[end - size + 1:end + 1] in source),
+                default=0
+            )
+            assert length == expected
+            if length:
+                assert source[source_end - length + 1:source_end + 1] == text[end - length + 1:end + 1]
+
+def test_find_shared_passages_reports_original_positions():
+    rng = random.Random(5)
+    copied = "표절된 문장은 이렇게 " + random_text(rng, 40)
+    text = random_text(rng, 100) + "\n" + copied + " " + random_text(rng, 100)
+    source = random_text(rng, 300) + copied + random_text(rng, 50)
+
+    for passages in (find_shared_passages(text, source), find_shared_passages(text, source * 3)):
+        assert len(passages) == 1
+        passage = passages[0]
+        assert normalize_essay_text(copied) in normalize_essay_text(passage['text'])
+        assert text[passage['start']:passage['end']] == passage['text']
+        assert normalize_essay_text(source[passage['source_start']:passage['source_end']]) == normalize_essay_text(passage['text'])
+
+    assert find_shared_passages(text, random_text(rng, 300)) == []
+
+def test_locate_and_highlight_shared_passages():
+    rng = random.Random(6)
+    copied = random_text(rng, 30)
+    text = "<b>" + random_text(rng, 50) + copied + random_text(rng, 50)
+    passages = locate_shared_passages(text, [{"filename": "출처.pdf", "text": copied + random_text(rng, 20)}])
+    assert [passage['source'] for passage in passages] == ["출처.pdf"]
+
+    highlighted = highlight_shared_passages_html(text, passages)
+    assert highlighted.startswith("&lt;b&gt;")
+    assert f'<mark title="출처.pdf">{copied}</mark>' in highlighted
+
+def test_union_find_groups_connected_items():
+    groups = UnionFind(6)
+    groups.union(0, 1)
+    groups.union(1, 2)
+    groups.union(4, 5)
+    groups.union(2, 0)
+    assert groups.find(0) == groups.find(1) == groups.find(2)
+    assert groups.find(4) == groups.find(5)
+    assert len({groups.find(item) for item in range(6)}) == 3
+    assert groups.size[groups.find(0)] == 3
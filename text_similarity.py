@@ -0,0 +1,330 @@
+"""표절 검사에 쓰는 텍스트 유사도 도구
+
+문자 n-gram(shingle)과 MinHash LSH 색인, winnowing 지문, 접미사 오토마톤으로 겹치는 구간 찾기,
+유사 에세이 묶기(union-find)처럼 Streamlit 화면과 관계없는 순수 함수와 자료 구조를 모아 둡니다.
+접미사 오토마톤 캐시(get_suffix_automaton)도 이 모듈에 두어, Streamlit이 app.py를 다시 실행해도
+서버 프로세스가 살아 있는 동안 유지되도록 합니다.
+"""
+import html
+import re
+import zlib
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import List, Dict, Tuple
+
+import numpy as np
+
+# 문자 n-gram 길이, MinHash 서명 길이, LSH 밴드 수
+# 밴드 64개 x 2행: shingle Jaccard 유사도 0.2 이상인 에세이는 약 93%, 0.3 이상은 99% 이상 후보로 선택됨
+SHINGLE_SIZE = 5
+MINHASH_NUM_PERM = 128
+LSH_BANDS = 64
+# MinHash 해시 함수 (a * x + b) mod p 의 계수 (곱셈은 uint64 범위에서 넘쳐 섞이도록 61비트 계수 사용)
+MINHASH_PRIME = np.uint64((1 << 61) - 1)
+MINHASH_PERM_A = np.random.default_rng(1).integers(1, (1 << 61) - 1, size=MINHASH_NUM_PERM, dtype=np.uint64)
+MINHASH_PERM_B = np.random.default_rng(2).integers(0, (1 << 61) - 1, size=MINHASH_NUM_PERM, dtype=np.uint64)
+
+# 지문(winnowing): k글자 해시를 window개씩 묶어 최솟값만 지문으로 선택
+# (k + window - 1 = 9글자 이상 겹치는 구간은 반드시 지문이 공유됨)
+WINNOW_K = 6
+WINNOW_WINDOW = 4
+
+# 표절 의심 구간: 공백 제외 이 글자 수 이상 연속으로 같은 구간만 표시, 유사 에세이는 상위 몇 편까지 대조
+PASSAGE_MIN_LENGTH = 20
+PASSAGE_MAX_SOURCES = 3
+
+def calculate_similarity(text1: str, text2: str) -> float:
+    """두 텍스트 간의 유사도를 계산합니다 (0.0 ~ 1.0)."""
+    # 공백과 줄바꿈 제거하여 비교
+    return calculate_clean_similarity(normalize_essay_text(text1), normalize_essay_text(text2))
+
+def calculate_clean_similarity(text1_clean: str, text2_clean: str) -> float:
+    """공백을 이미 제거한 두 텍스트의 유사도를 계산합니다 (0.0 ~ 1.0)."""
+    if not text1_clean or not text2_clean:
+        return 0.0
+    
+    # SequenceMatcher를 사용하여 유사도 계산
+    return SequenceMatcher(None, text1_clean, text2_clean).ratio()
+
+def normalize_essay_text(text: str) -> str:
+    """유사도 비교를 위해 공백과 줄바꿈을 제거합니다."""
+    return re.sub(r'\s+', '', text)
+
+def prepare_essay_features(essay: Dict) -> Dict:
+    """에세이 항목(filename, text)에 공백을 제거한 텍스트(clean), 그 길이(clean_length),
+    shingle 해시 배열(shingles)을 추가합니다. 이미 계산된 항목은 그대로 반환합니다."""
+    if 'clean' not in essay:
+        clean_text = normalize_essay_text(essay.get('text', ''))
+        essay['clean'] = clean_text
+        essay['clean_length'] = len(clean_text)
+        essay['shingles'] = make_shingle_hashes(clean_text)
+    return essay
+
+def make_shingle_hashes(clean_text: str, shingle_size: int = SHINGLE_SIZE) -> np.ndarray:
+    """공백을 제거한 텍스트의 문자 n-gram(shingle)을 32비트 해시 배열(중복 제거)로 변환합니다."""
+    if not clean_text:
+        return np.empty(0, dtype=np.uint64)
+    if len(clean_text) <= shingle_size:
+        shingles = {clean_text}
+    else:
+        shingles = {clean_text[i:i + shingle_size] for i in range(len(clean_text) - shingle_size + 1)}
+    # 세션/프로세스가 달라도 같은 값이 나오도록 crc32 사용 (Python hash()는 실행마다 달라짐)
+    return np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+
+def compute_minhash(shingle_hashes: np.ndarray) -> np.ndarray:
+    """shingle 해시 배열의 MinHash 서명(MINHASH_NUM_PERM개)을 계산합니다."""
+    if shingle_hashes.size == 0:
+        return np.full(MINHASH_NUM_PERM, MINHASH_PRIME, dtype=np.uint64)
+    permuted = (np.outer(shingle_hashes, MINHASH_PERM_A) + MINHASH_PERM_B) % MINHASH_PRIME
+    return permuted.min(axis=0)
+
+class MinHashLSHIndex:
+    """MinHash 서명을 밴드로 나누어 버킷에 저장하는 LSH 색인입니다.
+    
+    같은 밴드 값을 하나라도 공유하는 에세이만 후보로 반환하므로, 전체 에세이와
+    일일이 비교하지 않고도 유사한 에세이 후보를 찾을 수 있습니다.
+    """
+    
+    def __init__(self, bands: int = LSH_BANDS):
+        self.bands = bands
+        self.rows = MINHASH_NUM_PERM // bands
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        # 색인한 목록 자체를 참조하여 비교 (id()는 목록이 해제된 뒤 새 목록에 다시 쓰일 수 있음)
+        self.indexed_essays = None
+        self.indexed_count = 0
+    
+    def reset(self):
+        """색인을 비웁니다. 다음 sync에서 목록 전체를 다시 색인합니다."""
+        self.buckets = [{} for _ in range(self.bands)]
+        self.indexed_essays = None
+        self.indexed_count = 0
+    
+    def band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+    
+    def add(self, essay_idx: int, shingle_hashes: np.ndarray):
+        """에세이 하나(shingle 해시 배열)를 색인에 추가합니다."""
+        if shingle_hashes.size == 0:
+            return
+        for band, key in enumerate(self.band_keys(compute_minhash(shingle_hashes))):
+            self.buckets[band].setdefault(key, []).append(essay_idx)
+    
+    def sync(self, evaluated_essays: List[Dict]):
+        """evaluated_essays에 새로 추가된 에세이만 색인에 반영합니다. 목록이 바뀌었으면 다시 만듭니다."""
+        if self.indexed_essays is not evaluated_essays or len(evaluated_essays) < self.indexed_count:
+            self.reset()
+            self.indexed_essays = evaluated_essays
+        for essay_idx in range(self.indexed_count, len(evaluated_essays)):
+            self.add(essay_idx, prepare_essay_features(evaluated_essays[essay_idx])['shingles'])
+        self.indexed_count = len(evaluated_essays)
+    
+    def query(self, text: str) -> List[int]:
+        """주어진 텍스트와 유사할 가능성이 있는 에세이 번호 목록을 반환합니다."""
+        return self.query_shingles(make_shingle_hashes(normalize_essay_text(text)))
+    
+    def query_shingles(self, shingle_hashes: np.ndarray) -> List[int]:
+        """shingle 해시 배열과 유사할 가능성이 있는 에세이 번호 목록을 반환합니다."""
+        if shingle_hashes.size == 0:
+            return []
+        candidates = set()
+        for band, key in enumerate(self.band_keys(compute_minhash(shingle_hashes))):
+            candidates.update(self.buckets[band].get(key, ()))
+        return sorted(candidates)
+
+def shingle_jaccard(hashes1: np.ndarray, hashes2: np.ndarray) -> float:
+    """중복 없는 두 shingle 해시 배열의 Jaccard 유사도를 계산합니다."""
+    if hashes1.size == 0 or hashes2.size == 0:
+        return 0.0
+    shared = np.intersect1d(hashes1, hashes2, assume_unique=True).size
+    return shared / (hashes1.size + hashes2.size - shared)
+
+def winnow_fingerprints(clean_text: str, k: int = WINNOW_K, window: int = WINNOW_WINDOW) -> set:
+    """공백을 제거한 텍스트에서 winnowing(MOSS) 방식으로 지문(k글자 해시) 집합을 선택합니다."""
+    if not clean_text:
+        return set()
+    if len(clean_text) < k:
+        return {zlib.crc32(clean_text.encode('utf-8'))}
+    hashes = [zlib.crc32(clean_text[i:i + k].encode('utf-8')) for i in range(len(clean_text) - k + 1)]
+    if len(hashes) <= window:
+        return {min(hashes)}
+    
+    fingerprints = set()
+    selected_position = -1
+    for start in range(len(hashes) - window + 1):
+        window_hashes = hashes[start:start + window]
+        min_hash = min(window_hashes)
+        # 같은 값이 여러 개면 가장 오른쪽 위치를 선택 (winnowing 규칙)
+        position = start + window - 1 - window_hashes[::-1].index(min_hash)
+        if position != selected_position:
+            fingerprints.add(min_hash)
+            selected_position = position
+    return fingerprints
+
+class UnionFind:
+    """원소들을 서로소 집합으로 묶는 union-find (경로 압축 + 크기 기준 합치기)입니다."""
+    
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+    
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+    
+    def union(self, item1: int, item2: int):
+        root1, root2 = self.find(item1), self.find(item2)
+        if root1 == root2:
+            return
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+
+class SuffixAutomaton:
+    """텍스트의 모든 부분 문자열을 인식하는 접미사 오토마톤입니다.
+    
+    원문 길이에 비례하는 시간에 만들어지고, 다른 텍스트를 한 번 훑으면서
+    각 위치에서 끝나는 가장 긴 공통 부분 문자열을 찾을 수 있습니다.
+    """
+    
+    def __init__(self, text: str):
+        self.transitions: List[Dict[str, int]] = [{}]
+        self.link = [-1]
+        self.length = [0]
+        self.first_end = [-1]  # 상태에 속한 문자열이 원문에서 처음 끝나는 위치
+        last = 0
+        for pos, char in enumerate(text):
+            current = self.new_state(self.length[last] + 1, pos)
+            state = last
+            while state != -1 and char not in self.transitions[state]:
+                self.transitions[state][char] = current
+                state = self.link[state]
+            if state == -1:
+                self.link[current] = 0
+            else:
+                target = self.transitions[state][char]
+                if self.length[state] + 1 == self.length[target]:
+                    self.link[current] = target
+                else:
+                    clone = self.new_state(self.length[state] + 1, self.first_end[target])
+                    self.transitions[clone] = dict(self.transitions[target])
+                    self.link[clone] = self.link[target]
+                    while state != -1 and self.transitions[state].get(char) == target:
+                        self.transitions[state][char] = clone
+                        state = self.link[state]
+                    self.link[target] = clone
+                    self.link[current] = clone
+            last = current
+    
+    def new_state(self, length: int, first_end: int) -> int:
+        self.transitions.append({})
+        self.link.append(-1)
+        self.length.append(length)
+        self.first_end.append(first_end)
+        return len(self.length) - 1
+    
+    def longest_matches(self, text: str) -> List[Tuple[int, int]]:
+        """text의 각 위치에서 끝나는 가장 긴 공통 부분 문자열의 (길이, 원문에서 끝나는 위치) 목록을 반환합니다."""
+        matches = []
+        state = 0
+        matched = 0
+        for char in text:
+            while state and char not in self.transitions[state]:
+                state = self.link[state]
+                matched = self.length[state]
+            if char in self.transitions[state]:
+                state = self.transitions[state][char]
+                matched += 1
+            else:
+                state = 0
+                matched = 0
+            matches.append((matched, self.first_end[state]))
+        return matches
+
+@lru_cache(maxsize=256)
+def get_suffix_automaton(clean_text: str) -> SuffixAutomaton:
+    """같은 에세이를 여러 번 대조할 때 다시 만들지 않도록 접미사 오토마톤을 캐시합니다."""
+    return SuffixAutomaton(clean_text)
+
+def find_shared_passages(text: str, source_text: str, min_length: int = PASSAGE_MIN_LENGTH) -> List[Dict]:
+    """두 에세이가 공유하는 구간(공백 제외 min_length글자 이상 연속 일치)을 찾습니다.
+    
+    반환값의 start/end, source_start/source_end는 공백을 포함한 원문 기준 문자 위치입니다.
+    """
+    # 공백을 제거한 텍스트의 각 글자가 원문 어디에 있는지 기록
+    positions = [match.start() for match in re.finditer(r'\S', text)]
+    source_positions = [match.start() for match in re.finditer(r'\S', source_text)]
+    clean = ''.join(text[pos] for pos in positions)
+    source_clean = ''.join(source_text[pos] for pos in source_positions)
+    if len(clean) < min_length or len(source_clean) < min_length:
+        return []
+    
+    # 접미사 오토마톤은 짧은 쪽(보통 현재 에세이)으로 만들고 긴 쪽을 훑음 (교재처럼 긴 원문으로 만들지 않음)
+    scan_source = len(source_clean) > len(clean)
+    if scan_source:
+        matches = get_suffix_automaton(clean).longest_matches(source_clean)
+    else:
+        matches = get_suffix_automaton(source_clean).longest_matches(clean)
+    spans = []
+    for end, (length, matched_end) in enumerate(matches):
+        # 다음 글자까지 이어지지 않는 (오른쪽으로 더 늘릴 수 없는) 일치 구간만 기록
+        extends = end + 1 < len(matches) and matches[end + 1][0] == length + 1
+        if length >= min_length and not extends:
+            if scan_source:
+                spans.append([matched_end - length + 1, matched_end + 1, end - length + 1, end + 1])
+            else:
+                spans.append([end - length + 1, end + 1, matched_end - length + 1, matched_end + 1])
+    spans.sort()
+    
+    # 겹치는 구간은 하나로 합침 (원문 위치는 원문에서도 이어지는 경우에만 넓히고,
+    # 같은 구간이 원문 여러 곳에 있으면 처음 나오는 위치를 사용)
+    merged = []
+    for span in spans:
+        if merged and span[0] <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], span[1])
+            if span[2] <= merged[-1][3] and span[3] >= merged[-1][2]:
+                merged[-1][2] = min(merged[-1][2], span[2])
+                merged[-1][3] = max(merged[-1][3], span[3])
+        else:
+            merged.append(span)
+    
+    passages = []
+    for start, end, source_start, source_end in merged:
+        original_start, original_end = positions[start], positions[end - 1] + 1
+        passages.append({
+            "start": original_start,
+            "end": original_end,
+            "source_start": source_positions[source_start],
+            "source_end": source_positions[source_end - 1] + 1,
+            "length": end - start,
+            "text": text[original_start:original_end]
+        })
+    return passages
+
+def locate_shared_passages(text: str, sources: List[Dict]) -> List[Dict]:
+    """유사 에세이 목록(filename, text)과 공유하는 구간을 모두 찾아 원문 위치 순으로 반환합니다."""
+    passages = []
+    for source in sources[:PASSAGE_MAX_SOURCES]:
+        for passage in find_shared_passages(text, source.get('text', '')):
+            passage['source'] = source.get('filename', '알 수 없음')
+            passages.append(passage)
+    passages.sort(key=lambda passage: (passage['start'], -passage['length']))
+    return passages
+
+def highlight_shared_passages_html(text: str, passages: List[Dict]) -> str:
+    """에세이 원문에서 표절 의심 구간을 <mark>로 강조한 HTML을 만듭니다."""
+    parts = []
+    cursor = 0
+    for passage in passages:
+        start = max(passage['start'], cursor)
+        if start >= passage['end']:
+            continue
+        parts.append(html.escape(text[cursor:start]))
+        parts.append(f"<mark title=\"{html.escape(passage['source'])}\">{html.escape(text[start:passage['end']])}</mark>")
+        cursor = passage['end']
+    parts.append(html.escape(text[cursor:]))
+    return ''.join(parts).replace('\n', '<br>')